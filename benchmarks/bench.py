@@ -0,0 +1,220 @@
+"""
+Benchmarks the translators against the local stand-in services (see `mock_services`).
+
+For each service, reports the throughput, the latency percentiles, the memory allocated
+and the CPU time used per translation. No network access is needed.
+
+Usage:
+
+    python -m benchmarks.bench --requests 500 --concurrency 8 --latency 0.02 --error-rate 0.01
+"""
+import argparse
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from json import dump
+from time import perf_counter, process_time
+
+from translatepy.translators import (
+    BingTranslator,
+    DeepLTranslator,
+    GoogleBatchExecuteTranslator,
+    GoogleTranslator,
+    GoogleV2Translator,
+    ReversoTranslator,
+    Translator,
+)
+from translatepy.utils.ratelimit import RateLimiter, set_rate_limiter
+from translatepy.utils.utils import percentile
+
+from benchmarks.mock_services import MockServer, MockSession
+
+SERVICES = {
+    "google": GoogleTranslator,
+    "googlev2": GoogleV2Translator,
+    "batchexecute": GoogleBatchExecuteTranslator,
+    "bing": BingTranslator,
+    "deepl": DeepLTranslator,
+    "reverso": ReversoTranslator,
+    "translator": Translator,
+}
+
+SENTENCES = [
+    "Hello, how are you?",
+    "The weather is nice today, so we are going for a walk in the park.",
+    "Could you tell me where the nearest train station is?",
+    "This library aggregates multiple translation services behind a single interface.",
+    "Thank you very much for your help!",
+]
+
+# The number of translations made to measure the allocations
+ALLOCATION_SAMPLES = 100
+
+# The maximum median duration (in seconds) of a request to the mock server without latency:
+# above it, the mock server itself would hide the performance of the translators
+MAX_MOCK_OVERHEAD = 0.01
+
+
+def texts(count: int) -> list[str]:
+    """
+    Returns `count` distinct texts
+    """
+    return ["{} ({})".format(SENTENCES[index % len(SENTENCES)], index) for index in range(count)]
+
+
+def make_translator(service: str, server: MockServer, concurrency: int):
+    """
+    Returns the translator of `service`, sending its requests to `server`, without cache
+    """
+    translator = SERVICES[service]()
+    translators = translator.translators if isinstance(translator, Translator) else [translator]
+    for child in [translator] + translators:
+        child.cache = None
+        child.session = MockSession(server, pool_maxsize=concurrency)
+        # Retry the throttled requests right away, as told by the mock server
+        set_rate_limiter(str(child), RateLimiter(max_retries=3))
+    return translator
+
+
+def measure_allocations(translator, count: int) -> dict:
+    """
+    Returns the memory allocated (at its peak) by a translation, in bytes
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for text in texts(count):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            try:
+                translator.translate(text, "fr", "en")
+            except Exception:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+    finally:
+        tracemalloc.stop()
+    return {"mean": sum(peaks) / len(peaks), "max": max(peaks)}
+
+
+def check_overhead(requests: int = 50) -> float:
+    """
+    Returns the median duration of a request to a mock server without latency,
+    raising a `RuntimeError` if it's above `MAX_MOCK_OVERHEAD`
+    """
+    with MockServer(latency=0) as server:
+        session = MockSession(server)
+        durations = []
+        for index in range(requests):
+            start = perf_counter()
+            session.get(
+                "https://translate.googleapis.com/translate_a/single",
+                params={"client": "gtx", "dt": "t", "sl": "en", "tl": "fr", "q": "Hello ({})".format(index)},
+            ).raise_for_status()
+            durations.append(perf_counter() - start)
+    overhead = percentile(durations, 50)
+    if overhead > MAX_MOCK_OVERHEAD:
+        raise RuntimeError(
+            "The mock server takes {:.1f} ms per request without latency (more than {:.1f} ms)".format(
+                overhead * 1000, MAX_MOCK_OVERHEAD * 1000
+            )
+        )
+    return overhead
+
+
+def run(service: str, server: MockServer, requests: int, concurrency: int) -> dict:
+    """
+    Makes `requests` translations with `service`, `concurrency` at a time, and returns the measurements
+    """
+    translator = make_translator(service, server, concurrency)
+    # Warm up the connections (and the WIZ globals of batchexecute)
+    for text in texts(concurrency):
+        try:
+            translator.translate(text, "fr", "en")
+        except Exception:
+            pass
+
+    def timed_translate(text):
+        start = perf_counter()
+        try:
+            translator.translate(text, "fr", "en")
+            success = True
+        except Exception:
+            success = False
+        return success, perf_counter() - start
+
+    cpu_start, wall_start = process_time(), perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_translate, texts(requests)))
+    cpu, wall = process_time() - cpu_start, perf_counter() - wall_start
+
+    latencies = [latency for success, latency in results if success]
+    allocations = measure_allocations(translator, min(ALLOCATION_SAMPLES, requests))
+    return {
+        "service": service,
+        "requests": requests,
+        "errors": sum(1 for success, latency in results if not success),
+        "throughput": requests / wall,
+        "p50": percentile(latencies, 50) if latencies else None,
+        "p95": percentile(latencies, 95) if latencies else None,
+        "p99": percentile(latencies, 99) if latencies else None,
+        "cpu_per_translation": cpu / requests,
+        "allocated_per_translation": allocations["mean"],
+        "max_allocated_per_translation": allocations["max"],
+    }
+
+
+def milliseconds(value) -> str:
+    return "-" if value is None else "{:.1f}".format(value * 1000)
+
+
+def print_results(results: list) -> None:
+    columns = "{:<13} {:>8} {:>7} {:>9} {:>8} {:>8} {:>8} {:>9} {:>10}"
+    print(columns.format("service", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "CPU ms", "alloc KiB"))
+    for result in results:
+        print(
+            columns.format(
+                result["service"],
+                result["requests"],
+                result["errors"],
+                "{:.1f}".format(result["throughput"]),
+                milliseconds(result["p50"]),
+                milliseconds(result["p95"]),
+                milliseconds(result["p99"]),
+                milliseconds(result["cpu_per_translation"]),
+                "{:.1f}".format(result["allocated_per_translation"] / 1024),
+            )
+        )
+
+
+def main(arguments=None) -> list:
+    parser = argparse.ArgumentParser(description="Benchmarks the translators against local stand-in services.")
+    parser.add_argument("--services", default=",".join(SERVICES), help="comma separated services to benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="number of translations per service")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of simultaneous translations")
+    parser.add_argument("--latency", type=float, default=0.01, help="latency of the services, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random variation of the latency, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="ratio of requests failing with HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="ratio of requests throttled with HTTP 429")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(arguments)
+
+    # Make sure that the measurements are not dominated by the mock server
+    overhead = check_overhead()
+    print("Mock server overhead: {:.1f} ms per request".format(overhead * 1000))
+
+    results = []
+    with MockServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate
+    ) as server:
+        for service in args.services.split(","):
+            results.append(run(service.strip(), server, args.requests, args.concurrency))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            dump(results, f, indent=4)
+    return results
+
+
+if __name__ == "__main__":
+    main()
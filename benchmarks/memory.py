@@ -0,0 +1,54 @@
+"""
+Measures the memory used by the results kept by the translators:
+a `Translation` (from `translate`) and a `LanguageSearch` (from `get_language`).
+
+Usage:
+
+    python -m benchmarks.memory --count 100000
+"""
+import argparse
+import pickle
+import tracemalloc
+
+from translatepy.models import LanguageSearch, Translation
+from translatepy.translators.google import GoogleTranslator
+
+
+def measure(factory, count: int) -> float:
+    """
+    Returns the number of bytes allocated per object made by `factory(index)`,
+    not counting the objects (like the texts) created beforehand.
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [factory(index) for index in range(count)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The list itself
+    return (after - before) / count - 8
+
+
+def main(arguments=None) -> dict:
+    parser = argparse.ArgumentParser(description="Measures the memory used by the translation results.")
+    parser.add_argument("--count", type=int, default=100000, help="number of objects created")
+    args = parser.parse_args(arguments)
+
+    texts = ["Translated text {}".format(index) for index in range(args.count)]
+    translator = GoogleTranslator()
+    translator.get_language("French")
+    translation = Translation("Google", "en", "fr", texts[0])
+
+    results = {
+        "Translation": measure(lambda index: Translation("Google", "en", "fr", texts[index]), args.count),
+        "LanguageSearch": measure(lambda index: translator.get_language("French"), args.count),
+        "pickled Translation": len(pickle.dumps(translation, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+    for name, size in results.items():
+        print("{:<20} {:>8.1f} bytes".format(name, size))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Local stand-ins for the translation services, imitating the shape of their requests and responses.
+
+The server runs in a separate process (so that it doesn't weigh on the CPU measurements of the
+translators), and can add latency, errors (HTTP 500) and throttling (HTTP 429 with `Retry-After`).
+
+The translators are pointed to it with a `MockSession`, which sends every request to the local
+server instead of the real host, without changing the translators.
+"""
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from random import random, uniform
+from time import sleep
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+from translatepy.utils.request import Session
+
+# The header carrying the host the request was meant for
+ORIGINAL_HOST_HEADER = "X-Original-Host"
+
+
+def fake_translation(text: str, destination_language: str) -> str:
+    return "[{}] {}".format(destination_language, text)
+
+
+def google(query: dict, body: bytes):
+    text, destination = query["q"][0], query["tl"][0]
+    return "application/json", dumps(
+        [[[fake_translation(text, destination), text, None, None, 1]], None, query["sl"][0]]
+    )
+
+
+def google_v2(query: dict, body: bytes):
+    text, destination = query["q"][0], query["tl"][0]
+    return "application/json", dumps(
+        {"sentences": [{"trans": fake_translation(text, destination), "orig": text}], "src": query["sl"][0]}
+    )
+
+
+def bing(query: dict, body: bytes):
+    form = parse_qs(body.decode("utf-8"))
+    text, destination = form["text"][0], form["to"][0]
+    return "application/json", dumps(
+        [
+            {
+                "detectedLanguage": {"language": "en", "score": 1.0},
+                "translations": [{"text": fake_translation(text, destination), "to": destination}],
+            }
+        ]
+    )
+
+
+def deepl(query: dict, body: bytes):
+    request = loads(body)
+    destination = request["params"]["lang"]["target_lang"]
+    return "application/json", dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": request["id"],
+            "result": {
+                "translations": [
+                    {"beams": [{"postprocessed_sentence": fake_translation(job["raw_en_sentence"], destination)}]}
+                    for job in request["params"]["jobs"]
+                ]
+            },
+        }
+    )
+
+
+def reverso(query: dict, body: bytes):
+    request = loads(body)
+    return "application/json", dumps(
+        {
+            "from": request["from"],
+            "to": request["to"],
+            "input": [request["input"]],
+            "translation": [fake_translation(request["input"], request["to"])],
+            "languageDetection": {"detectedLanguage": "eng", "isDirectionChanged": False},
+        }
+    )
+
+
+def google_web(query: dict, body: bytes):
+    wiz = {"qwAQke": "TranslateWebserverUi", "FdrFJe": "-1234567890", "cfb2h": "boq_translate-webserver"}
+    return "text/html", "<html><script>window.WIZ_global_data = {};</script></html>".format(dumps(wiz))
+
+
+def batchexecute(query: dict, body: bytes):
+    rpcs = loads(parse_qs(body.decode("utf-8"))["f.req"][0])[0]
+    response = ")]}'\n\n"
+    for rpc_id, arguments, _, identifier in rpcs:
+        (text, source, destination, _), _ = loads(arguments)
+        payload = [None, [[[None, None, None, True, None, [[fake_translation(text, destination), None]]]]]]
+        envelope = dumps([["wrb.fr", rpc_id, dumps(payload), None, None, None, identifier]])
+        response += "{}\n{}\n".format(len(envelope), envelope)
+    envelope = dumps([["e", 4, None, None, len(response)]])
+    response += "{}\n{}\n".format(len(envelope), envelope)
+    return "application/json", response
+
+
+# (host, path) -> endpoint
+ENDPOINTS = {
+    ("translate.googleapis.com", "/translate_a/single"): google,
+    ("clients5.google.com", "/translate_a/t"): google_v2,
+    ("www.bing.com", "/ttranslatev3"): bing,
+    ("www2.deepl.com", "/jsonrpc"): deepl,
+    ("api.reverso.net", "/translate/v1/translation"): reverso,
+    ("translate.google.com", "/"): google_web,
+    ("translate.google.com", "/_/TranslateWebserverUi/data/batchexecute"): batchexecute,
+}
+
+
+class MockServiceHandler(BaseHTTPRequestHandler):
+    # Keep the connections alive, like the real services
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are written separately: with Nagle's algorithm, the body
+    # would wait for the client's delayed ACK, adding ~40 ms to every request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        config = self.server.config
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        url = urlsplit(self.path)
+        endpoint = ENDPOINTS.get((self.headers.get(ORIGINAL_HOST_HEADER), url.path))
+
+        if config["latency"]:
+            sleep(max(0.0, uniform(config["latency"] - config["jitter"], config["latency"] + config["jitter"])))
+        if endpoint is None:
+            return self._respond(404, "text/plain", "Unknown endpoint")
+        if random() < config["throttle_rate"]:
+            return self._respond(
+                429, "text/plain", "Too Many Requests", {"Retry-After": str(config["retry_after"])}
+            )
+        if random() < config["error_rate"]:
+            return self._respond(500, "text/plain", "Internal Server Error")
+
+        content_type, content = endpoint(parse_qs(url.query), body)
+        self._respond(200, content_type, content)
+
+    def _respond(self, status: int, content_type: str, content: str, headers: dict = None):
+        content = content.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type + "; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(config: dict, ready) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockServiceHandler)
+    server.daemon_threads = True
+    server.config = config
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class MockServer:
+    """
+    Runs the stand-in services in a separate process.
+
+    Usage:
+
+        with MockServer(latency=0.05, error_rate=0.01) as server:
+            translator.session = MockSession(server)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.01,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        latency: float
+            The number of seconds each request takes.
+        jitter: float
+            The maximum number of seconds added to or removed from `latency`.
+        error_rate: float
+            The ratio of requests answered with "500 Internal Server Error".
+        throttle_rate: float
+            The ratio of requests answered with "429 Too Many Requests".
+        retry_after: float
+            The `Retry-After` header (in seconds) of the throttled requests.
+        """
+        self.config = {
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "throttle_rate": throttle_rate,
+            "retry_after": retry_after,
+        }
+        self.port = None
+        self._process = None
+
+    def start(self) -> None:
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=serve, args=(self.config, ready), daemon=True)
+        self._process.start()
+        self.port = ready.get(timeout=10)
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    @property
+    def address(self) -> str:
+        return "127.0.0.1:{}".format(self.port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class RedirectAdapter(HTTPAdapter):
+    """
+    Sends the requests to the mock server, keeping their path and query.
+    """
+
+    def __init__(self, address: str, **kwargs) -> None:
+        self.address = address
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        request.headers[ORIGINAL_HOST_HEADER] = url.netloc
+        request.url = urlunsplit(("http", self.address, url.path, url.query, ""))
+        return super().send(request, **kwargs)
+
+
+class MockSession(Session):
+    """
+    A `Session` sending all the requests to a `MockServer`.
+    """
+
+    def __init__(self, server: MockServer, pool_maxsize: int = 10) -> None:
+        super().__init__(pool_maxsize=pool_maxsize)
+        adapter = RedirectAdapter(server.address, pool_connections=1, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
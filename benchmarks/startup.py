@@ -0,0 +1,69 @@
+"""
+Measures the startup time of translatepy: importing it and creating the default `Translator`,
+in fresh interpreters, and checks it against `STARTUP_BUDGET`.
+
+Also checks that the heavy dependencies are not imported before they are needed.
+
+Usage:
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import subprocess
+import sys
+from json import loads
+
+from translatepy.utils.utils import percentile
+
+# The maximum median startup time, in seconds
+STARTUP_BUDGET = 0.05
+
+# The modules which should only be imported when they are used
+LAZY_MODULES = ["requests", "Levenshtein", "aiohttp", "asyncio", "sqlite3", "concurrent.futures"]
+
+SCRIPT = """
+import sys
+from json import dumps
+from time import perf_counter
+
+start = perf_counter()
+import translatepy
+translatepy.Translator()
+duration = perf_counter() - start
+print(dumps({{"duration": duration, "imported": [name for name in {lazy_modules!r} if name in sys.modules]}}))
+"""
+
+
+def measure(runs: int) -> dict:
+    """
+    Returns the startup times of `runs` fresh interpreters, and the lazy modules imported anyway
+    """
+    durations = []
+    imported = set()
+    script = SCRIPT.format(lazy_modules=LAZY_MODULES)
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        result = loads(output)
+        durations.append(result["duration"])
+        imported.update(result["imported"])
+    return {"durations": durations, "imported": sorted(imported)}
+
+
+def main(arguments=None) -> bool:
+    parser = argparse.ArgumentParser(description="Measures the startup time of translatepy.")
+    parser.add_argument("--runs", type=int, default=10, help="number of interpreters started")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="maximum median startup time, in seconds")
+    args = parser.parse_args(arguments)
+
+    result = measure(args.runs)
+    median = percentile(result["durations"], 50)
+    print("startup: median {:.1f} ms, max {:.1f} ms (budget: {:.1f} ms)".format(
+        median * 1000, max(result["durations"]) * 1000, args.budget * 1000
+    ))
+    if result["imported"]:
+        print("imported too early: {}".format(", ".join(result["imported"])))
+    return median <= args.budget and not result["imported"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,7 +1,36 @@
 from translatepy.translators import *
+from translatepy.translators.base import BaseTranslator
+from translatepy.exceptions import ServiceUnavailable, TranslationError, UnknownLanguage
 from translatepy.models import Translation
 
 
+class FakeTranslator(BaseTranslator):
+    """
+    A translator which doesn't make any request, used by the tests.
+
+    Translates with `function(text, destination_language, source_language)` (upper-casing the text by default),
+    raising the result if it's an exception. The texts received are recorded in `requests`.
+    """
+
+    supported_languages = property(lambda self: super().supported_languages)
+    cache = None
+
+    def __init__(self, function=None, name: str = "Fake") -> None:
+        self.function = function or (lambda text, destination_language, source_language: text.upper())
+        self.name = name
+        self.requests = []
+
+    def _translate(self, text, destination_language, source_language):
+        self.requests.append(text)
+        result = self.function(text, destination_language, source_language)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def __str__(self) -> str:
+        return self.name
+
+
 def test_translators_translation():
     """
     Tests that all `Translators` are correctly translating.
@@ -42,4 +71,947 @@ def test_translators_translation():
             assert result.destination_language == lang
 
 
+def test_translate_batch():
+    """
+    Tests that `translate_batch` keeps the order of the texts, with an error for each text which failed,
+    and that DeepL translates each group of texts in a single request.
+    """
+    translator = FakeTranslator(lambda text, *args: ValueError("Failed") if text == "fail" else text.upper())
+    results = translator.translate_batch(["a", "fail", "b"], "fr", "en", workers=3)
+    assert [result.translation for result in results[::2]] == ["A", "B"]
+    assert isinstance(results[1], TranslationError)
+
+    class Response:
+        status_code = 200
+        headers = {}
+
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.data
+
+    class DeepLSession:
+        def __init__(self):
+            self.jobs = []
+
+        def post(self, url, json):
+            texts = [job["raw_en_sentence"] for job in json["params"]["jobs"]]
+            self.jobs.append(texts)
+            translations = [{"beams": [{"postprocessed_sentence": text.upper()}]} for text in texts]
+            if "short" in texts:
+                # A response missing a translation
+                translations.pop()
+            return Response({"result": {"translations": translations}})
+
+    deepl = DeepLTranslator()
+    deepl.session = DeepLSession()
+    deepl.cache = None
+    texts = ["text {}".format(index) for index in range(30)]
+    results = deepl.translate_batch(texts, "fr", "en")
+    assert sorted(len(jobs) for jobs in deepl.session.jobs) == [5, 25]
+    assert [result.translation for result in results] == [text.upper() for text in texts]
+
+    # The translations of a group can't be matched with its texts: the whole group fails
+    results = deepl.translate_batch(texts[:25] + ["short"] + texts[26:], "fr", "en")
+    assert [result.translation for result in results[:25]] == [text.upper() for text in texts[:25]]
+    assert all(isinstance(result, TranslationError) for result in results[25:])
+
+    # The requests of the groups are measured
+    from translatepy.utils.metrics import METRICS, REQUESTS, FAILURES
+
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        deepl.translate_batch(texts[:25] + ["short"] + texts[26:], "fr", "en")
+    finally:
+        METRICS.disable()
+    assert [sample["value"] for sample in REQUESTS.samples() if sample["labels"]["service"] == "DeepL"] == [2]
+    assert [sample["labels"]["exception"] for sample in FAILURES.samples()] == ["ValueError"]
+
+    # A long text is segmented, and the requests of its segments are in its attempts
+    deepl.record_attempts = True
+    result = deepl.translate("{}\n\n{}".format("a" * 3000, "b" * 3000), "fr", "en")
+    assert result.translation == "{}\n\n{}".format("A" * 3000, "B" * 3000)
+    assert [(attempt.service, attempt.exception) for attempt in result.attempts] == [("DeepL", None)] * 2
+
+    # The texts of a request add up to `_max_text_length` at most
+    deepl.session.jobs.clear()
+    texts = ["{} {}".format(index, "x" * 1500) for index in range(10)]
+    results = deepl.translate_batch(texts, "fr", "en")
+    # (the groups are sent concurrently)
+    assert sorted(len(jobs) for jobs in deepl.session.jobs) == [1, 3, 3, 3]
+    assert all(sum(len(text) for text in jobs) <= deepl._max_text_length for jobs in deepl.session.jobs)
+    assert [result.translation for result in results] == [text.upper() for text in texts]
+
+
+def test_translate_iter():
+    """
+    Tests that `translate_iter` reads its input lazily, keeps the order (unless asked not to),
+    and carries on after a failed text.
+    """
+    from time import sleep
+
+    translator = FakeTranslator(lambda text, *args: ValueError("Failed") if text == "fail" else text.upper())
+    translator.cache = None
+    pulled = []
+
+    def texts():
+        for index in range(20):
+            pulled.append(index)
+            yield "fail" if index == 5 else "text {}".format(index)
+
+    results = []
+    for result in translator.translate_iter(texts(), "fr", "en", window=4):
+        results.append(result)
+        # At most `window` texts are read ahead of the results
+        assert len(pulled) - len(results) < 4
+    assert len(results) == 20
+    assert isinstance(results[5], TranslationError)
+    assert [result.translation for index, result in enumerate(results) if index != 5] == [
+        "TEXT {}".format(index) for index in range(20) if index != 5
+    ]
+
+    # Unordered: the fastest first, with their index
+    slow_first = FakeTranslator(lambda text, *args: sleep(0.05 * (3 - int(text))) or text)
+    slow_first.cache = None
+    pairs = list(slow_first.translate_iter(["0", "1", "2"], "fr", "en", window=3, ordered=False))
+    assert [index for index, result in pairs] == [2, 1, 0]
+    assert all(result.translation == str(index) for index, result in pairs)
+
+
+def test_race_and_hedge():
+    """
+    Tests that `race` takes the first success, and that `hedge` only launches the next translator
+    when the current one is slow or failed.
+    """
+    from time import perf_counter, sleep
+
+    slow = FakeTranslator(lambda text, *args: sleep(0.5) or "slow", name="Slow")
+    fast = FakeTranslator(lambda text, *args: "fast", name="Fast")
+    failing = FakeTranslator(lambda *args: ValueError("Failed"), name="Failing")
+
+    def translate(translators, strategy, text):
+        translator = Translator(translators, strategy=strategy, hedge_delay=0.05, reorder=False)
+        translator.cache = None
+        start = perf_counter()
+        translation = translator.translate(text, "fr", "en").translation
+        return translation, perf_counter() - start
+
+    # The slow translator is not waited for
+    translation, duration = translate([slow, failing, fast], "race", "race")
+    assert translation == "fast" and duration < 0.4
+
+    # The next translator is launched once the delay expired
+    translation, duration = translate([slow, fast], "hedge", "hedge slow")
+    assert translation == "fast" and duration < 0.4
+    # ...or as soon as the current one failed
+    translation, duration = translate([failing, fast], "hedge", "hedge failing")
+    assert translation == "fast" and duration < 0.4
+    # ...but not when the current one is fast enough
+    translation, duration = translate([fast, slow], "hedge", "hedge fast")
+    assert translation == "fast"
+    assert "hedge fast" not in slow.requests
+
+
+def test_circuit_breaker():
+    """
+    Tests that a failing service is left out (open), probed again after `recovery_time` (half-open),
+    and used again once the probe succeeded (closed), and that the healthiest services are tried first.
+    """
+    from time import sleep
+
+    from translatepy.utils.health import CLOSED, HALF_OPEN, OPEN
+
+    down = [True]
+    flaky = FakeTranslator(lambda *args: ValueError("Down") if down[0] else "flaky", name="Flaky")
+    backup = FakeTranslator(lambda *args: "backup", name="Backup")
+    translator = Translator([flaky, backup], reorder=False, failure_threshold=2, recovery_time=0.1)
+    translator.cache = None
+    health = translator.health[flaky]
+
+    for index in range(2):
+        assert translator.translate("breaker {}".format(index), "fr", "en").translation == "backup"
+    assert health.state == OPEN
+    assert translator.translate("breaker open", "fr", "en").translation == "backup"
+    assert "breaker open" not in flaky.requests
+
+    # The probe fails: the circuit opens again
+    sleep(0.1)
+    assert health.state == HALF_OPEN
+    assert translator.translate("breaker probe", "fr", "en").translation == "backup"
+    assert "breaker probe" in flaky.requests
+    assert health.state == OPEN
+
+    # Routing doesn't use up the probe request
+    sleep(0.1)
+    down[0] = False
+    translator._route("fr", "en")
+    translator._route("fr", "en")
+    assert health.state == HALF_OPEN
+    assert translator.translate("breaker recovered", "fr", "en").translation == "flaky"
+    assert health.state == CLOSED
+
+    # The translators are reordered by health
+    flaky = FakeTranslator(lambda *args: ValueError("Down"), name="Flaky")
+    translator = Translator([flaky, backup])
+    translator.cache = None
+    translator.translate("reorder 1", "fr", "en")
+    translator.translate("reorder 2", "fr", "en")
+    assert flaky.requests == ["reorder 1"]
+
+
+def test_all_translators_failed():
+    """
+    Tests that a `Translator` whose services all failed, or couldn't be tried, raises instead of returning no translation.
+    """
+    import asyncio
+
+    from translatepy.translators.translator import HEDGE, RACE
+
+    down = FakeTranslator(lambda *args: ValueError("Down"), name="Down")
+    for strategy in ("sequential", RACE, HEDGE):
+        translator = Translator([down], strategy=strategy, failure_threshold=2)
+        translator.cache = None
+        try:
+            translator.translate("all failed", "fr", "en")
+            assert False, "The translation should have failed"
+        except TranslationError as exc:
+            assert isinstance(exc.__cause__, TranslationError)
+            assert isinstance(exc.__cause__.__cause__, ValueError)
+        try:
+            asyncio.run(translator.translate_async("all failed", "fr", "en"))
+            assert False, "The translation should have failed"
+        except TranslationError:
+            pass
+
+        # The circuit breaker is now open: no service is tried
+        results = translator.translate_batch(["breaker 1", "breaker 2"], "fr", "en")
+        assert all(isinstance(result, TranslationError) for result in results)
+        assert isinstance(results[0].__cause__, ServiceUnavailable)
+        assert "breaker 1" not in down.requests
+
+    # The languages are not supported by any service
+    class FrenchOnly(FakeTranslator):
+        supported_languages = property(lambda self: ["english", "french"])
+
+    try:
+        Translator([FrenchOnly()]).translate("unsupported", "ja", "en")
+        assert False, "The translation should have failed"
+    except TranslationError as exc:
+        assert isinstance(exc.__cause__, UnknownLanguage)
+
+
+def test_lru_cache():
+    """
+    Tests that `LRUCache` evicts the least recently used entries to stay under its size limit.
+    """
+    from translatepy.utils.cache import LRUCache
+
+    cache = LRUCache(max_size=2000)
+    for index in range(100):
+        cache.set(("key", index), "value" * 10)
+        # Keep the first entry recently used
+        assert cache.get(("key", 0)) is not None
+
+    assert cache.size <= cache.max_size
+    assert cache.get(("key", 1)) is None
+    assert cache.get(("key", 99)) == "value" * 10
+    assert cache.stats["evictions"] > 0
+
+
+def test_sqlite_cache():
+    """
+    Tests that `SQLiteCache` keeps its entries when reopened, and evicts the least recently used ones.
+    """
+    import os
+    from tempfile import TemporaryDirectory
+    from time import sleep
+
+    from translatepy.utils.cache import SQLiteCache
+
+    with TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "cache", "translations.sqlite3")
+        cache = SQLiteCache(filename)
+        cache.set(("Google", "en", "fr", "short"), "court")
+        # Compressed
+        cache.set(("Google", "en", "fr", "long"), "long " * 100)
+        cache.close()
+
+        cache = SQLiteCache(filename, max_size=1000)
+        assert cache.get(("Google", "en", "fr", "short")) == "court"
+        assert cache.get(("Google", "en", "fr", "long")) == "long " * 100
+        assert cache.get(("Google", "en", "de", "short")) is None
+
+        # Every `EVICTION_INTERVAL` writes, the least recently used entries are removed
+        for index in range(cache.EVICTION_INTERVAL):
+            cache.set(("key", index), "value {:04}".format(index))
+        assert cache.stats["size"] <= cache.max_size
+        assert cache.stats["evictions"] > 0
+        assert cache.get(("Google", "en", "fr", "long")) is None
+        assert cache.get(("key", cache.EVICTION_INTERVAL - 1)) == "value {:04}".format(cache.EVICTION_INTERVAL - 1)
+        cache.close()
+
+        cache = SQLiteCache(filename, ttl=0.05)
+        cache.set("expiring", "value")
+        sleep(0.1)
+        assert cache.get("expiring") is None
+        cache.close()
+
+
+def test_reverso_detection():
+    """
+    Tests that Reverso translates again when its guess of the source language was wrong,
+    and that the detected languages are remembered.
+    """
+    from translatepy.utils.cache import LRUCache
+
+    class FakeResponse:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.data
+
+    class FakeSession:
+        def __init__(self):
+            self.requests = []
+
+        def post(self, url, json):
+            self.requests.append(json)
+            return FakeResponse(
+                {
+                    "translation": ["[{}] {}".format(json["from"], json["input"])],
+                    "languageDetection": {"detectedLanguage": "fra"},
+                }
+            )
+
+    translator = ReversoTranslator()
+    translator.session = session = FakeSession()
+    translator.detection_cache = LRUCache()
+    translator._last_detected_language = "eng"
+
+    # Guessed English: translated again from French
+    assert translator._translate("Bonjour", "ger", "auto") == "[fra] Bonjour"
+    assert [request["from"] for request in session.requests] == ["eng", "fra"]
+
+    # Already detected: a single request
+    session.requests.clear()
+    assert translator._translate("Bonjour", "ger", "auto") == "[fra] Bonjour"
+    assert [request["from"] for request in session.requests] == ["fra"]
+    assert translator.detect_language("Bonjour") == "fra"
+    assert len(session.requests) == 1
+
+    # The next texts are guessed to be in the last detected language
+    session.requests.clear()
+    assert translator._translate("Merci", "ger", "auto") == "[fra] Merci"
+    assert [request["from"] for request in session.requests] == ["fra"]
+
+
+def test_rate_limiter_retry_after():
+    """
+    Tests that a throttled request pauses the service for the `Retry-After` delay, then is retried.
+    """
+    from email.utils import formatdate
+    from time import monotonic, time
+
+    from requests import HTTPError, Response
+
+    from translatepy.utils.ratelimit import RateLimiter, parse_retry_after
+
+    assert parse_retry_after("2") == 2.0
+    assert 8 <= parse_retry_after(formatdate(time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after("soon") is None
+
+    def throttled(retry_after=None):
+        response = Response()
+        response.status_code = 429
+        if retry_after is not None:
+            response.headers["Retry-After"] = retry_after
+        return HTTPError(response=response)
+
+    attempts = []
+    retries = []
+
+    def request():
+        attempts.append(monotonic())
+        if len(attempts) == 1:
+            raise throttled("0.2")
+        return "done"
+
+    limiter = RateLimiter(max_retries=2)
+    assert limiter.call(request, on_retry=lambda exception, delay: retries.append(delay)) == "done"
+    assert retries == [0.2]
+    assert attempts[1] - attempts[0] >= 0.19
+
+    # The whole service is paused, not only the throttled request
+    assert limiter.retry_delay(throttled("0.5"), 0) == 0.5
+    assert 0.4 < limiter.reserve() <= 0.5
+
+    # A longer `Retry-After` than `backoff_max` is not shortened: the request fails right away
+    limiter = RateLimiter(max_retries=2, backoff_max=30)
+    attempts.clear()
+
+    def throttled_for_long():
+        attempts.append(monotonic())
+        raise throttled("120")
+
+    try:
+        limiter.call(throttled_for_long)
+        assert False, "The request should have failed"
+    except HTTPError:
+        pass
+    assert len(attempts) == 1
+    # The next requests still wait for the service
+    assert limiter.reserve() > 100
+
+    # Without `Retry-After`: exponential backoff, up to `max_retries` retries
+    limiter = RateLimiter(max_retries=1, backoff_base=0.01)
+    attempts.clear()
+
+    def always_throttled():
+        attempts.append(monotonic())
+        raise throttled()
+
+    try:
+        limiter.call(always_throttled)
+        assert False, "The request should have failed"
+    except HTTPError:
+        pass
+    assert len(attempts) == 2
+    # The other errors are not retried
+    assert limiter.retry_delay(ValueError(), 0) is None
+
+
+def test_cache_namespace():
+    """
+    Tests that `Translator` instances built with different services don't share their cached translations.
+    """
+    first = Translator([FakeTranslator(lambda text, *args: "A:" + text, name="A")])
+    second = Translator([FakeTranslator(lambda text, *args: "B:" + text, name="B")])
+    assert first.translate("cache namespace", "fr", "en").translation == "A:cache namespace"
+    assert second.translate("cache namespace", "fr", "en").translation == "B:cache namespace"
+
+
+def test_get_language():
+    """
+    Tests that `get_language` finds the closest supported languages.
+    """
+    translator = DeepLTranslator()
+
+    assert translator.get_language("japnese").language.code == "ja"
+    assert translator.get_language("fr").language.name == "french"
+
+    results = translator.get_language("chines", top_k=3)
+    assert len(results) == 3
+    assert results[0].language.code == "zh-CN"
+    assert results[0].similarity >= results[1].similarity >= results[2].similarity
+
+
+def test_split_text():
+    """
+    Tests that long texts are split under the size limit, keeping their whitespace.
+    """
+    from translatepy.utils.segment import join_segments, split_text
+
+    text = "First sentence. Second sentence!\n\n  Another paragraph, with a clause.\n" * 20
+    segments = split_text(text, 60)
+
+    assert all(len(segment) <= 60 for leading, segment, trailing in segments)
+    assert join_segments(segments, [segment for leading, segment, trailing in segments if segment]) == text
+
+    # The Google translators measure the percent-encoded text, which is sent in the URL
+    from urllib.parse import quote
+
+    translator = GoogleTranslator()
+    text = "東京は日本の首都です。人口は約千四百万人です。" * 75
+    assert len(text) < translator._max_text_length < len(quote(text))
+    assert translator._is_long(text)
+    segments = split_text(text, translator._max_text_length, translator._text_length)
+    assert all(len(quote(segment)) <= translator._max_text_length for leading, segment, trailing in segments)
+    assert "".join(segment for leading, segment, trailing in segments) == text
+    assert not GoogleBatchExecuteTranslator()._is_long(text)
+
+
+def test_batchexecute_parser():
+    """
+    Tests that the batchexecute frames are parsed whatever the chunks the response is fed in.
+    """
+    from translatepy.translators.batchexecute import BatchExecuteParser
+
+    response = ')]}\'\n\n55\n[["wrb.fr","MkEWBc","[1]",null,null,null,"2"]]\n25\n[["e",4,null,null,187]]\n'
+    parser = BatchExecuteParser()
+    frames = []
+    for char in response:
+        frames.extend(parser.feed(char))
+    parser.close()
+
+    assert frames == [["wrb.fr", "MkEWBc", "[1]", None, None, None, "2"]]
+
+
+def test_batchexecute_async_wiz():
+    """
+    Tests that the async translation loads the WIZ globals without the blocking session.
+    """
+    import asyncio
+    import json
+
+    from translatepy.translators.batchexecute import GoogleBatchExecuteTranslator
+    from translatepy.utils.request import AsyncResponse
+
+    payload = [None, [[["Bonjour", None, None, True, None, [["Bonjour"]]]]]]
+    frames = json.dumps([["wrb.fr", "MkEWBc", json.dumps(payload), None, None, None, "1"]])
+    body = ")]}'\n\n" + str(len(frames) + 1) + "\n" + frames + "\n"
+    page = 'window.WIZ_global_data = {"FdrFJe": "123", "cfb2h": "build"};'
+
+    class BlockingSession:
+        def get(self, *args, **kwargs):
+            raise AssertionError("The blocking session was used in the event loop")
+
+        post = get
+
+    class FakeAsyncSession:
+        async def get(self, url, **kwargs):
+            return AsyncResponse(url, 200, {}, page.encode())
+
+        async def post(self, url, **kwargs):
+            return AsyncResponse(url, 200, {}, body.encode())
+
+    translator = GoogleBatchExecuteTranslator()
+    translator.session = BlockingSession()
+    translator.async_session = FakeAsyncSession()
+    GoogleBatchExecuteTranslator._wiz = None
+    try:
+        assert asyncio.run(translator._translate_async("Hello", "fr", "en")) == "Bonjour"
+        assert GoogleBatchExecuteTranslator._wiz["f.sid"] == "123"
+    finally:
+        GoogleBatchExecuteTranslator._wiz = None
+
+
+def test_tkk_cache_file():
+    """
+    Tests that the TKK is shared through a private file, written atomically.
+    """
+    import os
+    import tempfile
+
+    from translatepy.utils import gtoken
+
+    default = gtoken.TKK_CACHE_FILE
+    assert not default.startswith(tempfile.gettempdir())
+    with tempfile.TemporaryDirectory() as directory:
+        gtoken.TKK_CACHE_FILE = os.path.join(directory, "cache", "google_tkk.json")
+        try:
+            acquirer = gtoken.TokenAcquirer()
+            acquirer._write_shared_tkk("123.456")
+            assert acquirer._read_shared_tkk() == "123.456"
+            # No temporary file left behind
+            assert os.listdir(os.path.dirname(gtoken.TKK_CACHE_FILE)) == ["google_tkk.json"]
+            if os.name == "posix":
+                assert os.stat(gtoken.TKK_CACHE_FILE).st_mode & 0o077 == 0
+        finally:
+            gtoken.TKK_CACHE_FILE = default
+
+
+def test_translate_async():
+    """
+    Tests the asynchronous translation of each service, with a fake `AsyncSession`,
+    and that `race` and `hedge` cancel the slower requests once one succeeded.
+    """
+    import asyncio
+    from json import dumps
+    from urllib.parse import parse_qs, urlsplit
+
+    from translatepy.translators.translator import HEDGE, RACE
+    from translatepy.utils.request import AsyncResponse
+
+    class FakeAsyncSession:
+        def __init__(self):
+            self.requests = []
+
+        async def get(self, url, **kwargs):
+            self.requests.append(url)
+            text = parse_qs(urlsplit(url).query)["q"][0].upper()
+            if "clients5" in url:
+                data = {"sentences": [{"trans": text[:3]}, {"trans": text[3:]}, {"src": "ignored"}]}
+            else:
+                data = [[[text[:3], None], [text[3:], None]]]
+            return AsyncResponse(url, 200, {}, dumps(data).encode())
+
+        async def post(self, url, data=None, json=None, **kwargs):
+            self.requests.append(url)
+            if "bing" in url:
+                data = [{"translations": [{"text": data["text"].upper()}]}]
+            elif "deepl" in url:
+                data = {
+                    "result": {
+                        "translations": [
+                            {"beams": [{"postprocessed_sentence": job["raw_en_sentence"].upper()}]}
+                            for job in json["params"]["jobs"]
+                        ]
+                    }
+                }
+            else:
+                data = {"translation": [json["input"].upper()], "languageDetection": {"detectedLanguage": "eng"}}
+            return AsyncResponse(url, 200, {}, dumps(data).encode())
+
+    async def translate_all():
+        results = {}
+        for service in (GoogleTranslator, GoogleV2Translator, BingTranslator, DeepLTranslator, ReversoTranslator):
+            translator = service()
+            translator.cache = None
+            translator.async_session = session = FakeAsyncSession()
+            result = await translator.translate_async("Hello world", "fr", "en")
+            results[str(translator)] = (result.translation, len(session.requests))
+        return results
+
+    for service, (translation, requests) in asyncio.run(translate_all()).items():
+        assert (translation, requests) == ("HELLO WORLD", 1), service
+
+    class AsyncFake(FakeTranslator):
+        def __init__(self, delay: float, name: str) -> None:
+            super().__init__(name=name)
+            self.delay = delay
+            self.cancelled = False
+
+        async def _translate_async(self, text, destination_language, source_language):
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            return "{}: {}".format(self, text)
+
+    async def race(strategy):
+        slow = AsyncFake(5, "Slow")
+        translator = Translator([slow, AsyncFake(0.01, "Fast")], strategy=strategy, hedge_delay=0.05, reorder=False)
+        translator.cache = None
+        result = await asyncio.wait_for(translator.translate_async("Hello", "fr", "en"), 1)
+        # Let the cancellation reach the slow request
+        await asyncio.sleep(0)
+        return result.translation, slow.cancelled
+
+    for strategy in (RACE, HEDGE):
+        assert asyncio.run(race(strategy)) == ("Fast: Hello", True), strategy
+
+
+def test_detect_language():
+    """
+    Tests the offline language detection.
+    """
+    from translatepy.utils.detect import LanguageDetector, detect, detect_many
+
+    # The scripts used by a single language
+    assert detect_many(["こんにちは", "안녕", "Καλημέρα", "1234"]) == ["ja", "ko", "el", None]
+
+    # The languages the model doesn't know are not given the closest one it knows
+    assert detect_many(
+        [
+            "माझे नाव राहुल आहे आणि मी पुण्यात राहतो",  # Marathi (not Hindi)
+            "איך האב ליב צו לייענען ביכער אין דער פרי",  # Yiddish (not Hebrew)
+            "我們今天晚上一起去吃飯吧",  # Traditional Chinese
+            "Здраво, како си? Данас је веома леп дан за шетњу са децом у парку.",  # Serbian
+            "Bon dia, com estàs? Avui fa un dia molt bonic per passejar pel parc amb els nens.",  # Catalan
+            "Habari ya asubuhi, leo ni siku nzuri sana ya kutembea pamoja na watoto wetu.",  # Swahili
+            "صبح بخیر، آپ کیسے ہیں؟ آج بچوں کے ساتھ پارک میں سیر کے لیے بہت اچھا دن ہے۔",  # Urdu
+        ]
+    ) == [None] * 7
+
+    # With only languages of the model, the model is used
+    detector = LanguageDetector(languages=["en", "fr", "de", "es", "it", "ru", "uk", "bg"])
+    assert detector.detect("Le chat est sur la table de la cuisine") == "fr"
+    assert detector.detect_many(["The weather is nice today", "Где находится железнодорожный вокзал?"]) == ["en", "ru"]
+    # Belarusian doesn't fit any language of the model
+    belarusian = "Добрай раніцы, як справы? Сёння вельмі добры дзень для шпацыру з дзецьмі ў парку."
+    assert detector.detect(belarusian) is None
+
+    # The short texts are left to the services, instead of being guessed wrong
+    assert detector.detect_many(["Cancel", "I love Paris", "Open file"]) == [None] * 3
+    assert detector.detect("Cancel", min_letters=0, min_confidence=0) is not None
+
+def test_metrics_export():
+    """
+    Tests that the metrics are exported in the Prometheus text format.
+    """
+    from translatepy.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry(enabled=True)
+    requests = registry.counter("requests_total", "Number of requests.", ("service",))
+    duration = registry.histogram("duration_seconds", "Duration.", ("service",), buckets=(0.1, 1))
+    requests.inc("Google")
+    requests.inc("Google")
+    duration.observe(0.5, "Google")
+
+    exported = registry.export()
+    assert 'requests_total{service="Google"} 2' in exported
+    assert 'duration_seconds_bucket{service="Google",le="0.1"} 0' in exported
+    assert 'duration_seconds_bucket{service="Google",le="+Inf"} 1' in exported
+    assert registry.snapshot()["duration_seconds"]["samples"][0]["count"] == 1
+
+
+def test_sent_bytes():
+    """
+    Tests that the bytes sent in the query string of the GET requests are measured.
+    """
+    from urllib.parse import quote
+
+    from requests import Response
+    from requests.adapters import BaseAdapter
+
+    from translatepy.utils.metrics import METRICS, SENT_BYTES
+    from translatepy.utils.request import Session
+
+    class OfflineAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            response = Response()
+            response.status_code = 200
+            response._content = b"{}"
+            response.request = request
+            response.url = request.url
+            return response
+
+        def close(self):
+            pass
+
+    session = Session()
+    session.mount("https://", OfflineAdapter())
+    text = quote("東京は日本の首都です。" * 10)
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        session.get("https://translate.example.com/translate_a/single?q=" + text)
+    finally:
+        METRICS.disable()
+    [sample] = SENT_BYTES.samples()
+    assert sample["labels"]["host"] == "translate.example.com"
+    assert sample["value"] > len(text)
+
+    # The same for the asynchronous requests, whose query parameters are given apart
+    from translatepy.utils.request import _request_size
+
+    assert _request_size("GET", "https://translate.example.com/translate_a/single", {"params": {"q": text}}) > len(text)
+
+
+def test_attempts_timeline():
+    """
+    Tests that the attempts of a call are emitted to the hooks and attached to its result.
+    """
+    from translatepy.utils.hooks import HOOKS
+
+    failing = FakeTranslator(lambda *args: ValueError("Service unavailable"), name="Failing")
+    echo = FakeTranslator(lambda text, *args: text, name="Echo")
+    translator = Translator([failing, echo], reorder=False)
+    translator.cache = None
+    translator.record_attempts = True
+    events = []
+    HOOKS.add(events.append)
+    try:
+        result = translator.translate("Hello", "fr", "en")
+    finally:
+        HOOKS.remove(events.append)
+
+    assert [(attempt.service, type(attempt.exception)) for attempt in result.attempts] == [
+        ("Failing", ValueError),
+        ("Echo", type(None)),
+    ]
+    assert [event.type for event in events] == ["start", "attempt", "attempt", "success"]
+
+    # The segments of a long text are translated in other threads, within the same call
+    segmented = FakeTranslator(name="Segmented")
+    segmented._max_text_length = 20
+    segmented.cache = None
+    segmented.record_attempts = True
+    result = segmented.translate("One sentence here. Another one there. And a third.", "fr", "en")
+    assert len(segmented.requests) == 3
+    assert [attempt.service for attempt in result.attempts] == ["Segmented"] * 3
+
+
+def test_lazy_imports():
+    """
+    Tests that the translators and their heavy dependencies are only imported when used.
+    """
+    import subprocess
+    import sys
+
+    script = (
+        "import sys\n"
+        "from translatepy.translators import GoogleTranslator\n"
+        "print(sorted(name for name in ('requests', 'Levenshtein', 'translatepy.translators.bing') if name in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+    from translatepy.translators import get_translator
+
+    assert get_translator("google") is get_translator("GoogleTranslator") is GoogleTranslator
+
+
+def test_models():
+    """
+    Tests that the languages are interned, and that the results survive pickling.
+    """
+    import pickle
+
+    from translatepy.models import Language
+
+    search = GoogleTranslator().get_language("French")
+    assert search.language is Language(search.language.name, "fr")
+    assert pickle.loads(pickle.dumps(search)).language is search.language
+
+    translation = Translation("Google", "en", "fr", "Bonjour")
+    assert not hasattr(translation, "__dict__")
+    assert pickle.loads(pickle.dumps(translation)).as_dict() == translation.as_dict()
+
+
+def test_single_flight():
+    """
+    Tests that identical translations requested at the same time make a single request.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Event
+    from time import sleep
+
+    from translatepy.utils.singleflight import SingleFlight
+
+    release = Event()
+    translator = FakeTranslator(lambda text, *args: release.wait(5) and text.upper())
+    translator.single_flight = SingleFlight()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(translator.translate, "hello", "fr", "en") for _ in range(8)]
+        # Wait for the 7 other callers to wait for the first one
+        while translator.single_flight.stats["coalesced"] < 7:
+            sleep(0.001)
+        release.set()
+        results = [future.result().translation for future in futures]
+
+    assert results == ["HELLO"] * 8
+    assert translator.requests == ["hello"]
+
+    # Translators built with different services are not coalesced
+    single_flight = SingleFlight()
+    release.clear()
+    first = FakeTranslator(lambda text, *args: release.wait(5) and "A:" + text, name="A")
+    second = FakeTranslator(lambda text, *args: release.wait(5) and "B:" + text, name="B")
+    translators = [Translator([first]), Translator([second])]
+    for translator in translators:
+        translator.cache = None
+        translator.single_flight = single_flight
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(translator.translate, "hello", "fr", "en") for translator in translators]
+        while not (first.requests and second.requests) and single_flight.stats["coalesced"] == 0:
+            sleep(0.001)
+        release.set()
+        results = [future.result().translation for future in futures]
+
+    assert results == ["A:hello", "B:hello"]
+    assert single_flight.stats["coalesced"] == 0
+
+
+def test_translate_multi():
+    """
+    Tests the translation of a text to multiple languages, with the fallback of the `Translator` class.
+    """
+    failing = FakeTranslator(
+        lambda text, destination_language, source_language: ValueError("Unsupported")
+        if destination_language == "ja"
+        else "[{}] {}".format(destination_language, text),
+        name="Failing",
+    )
+    translator = Translator([failing, FakeTranslator()], reorder=False)
+    translator.cache = None
+    results = translator.translate_multi("hello", ["fr", "ja", "de"], "en")
+    assert list(results) == ["fr", "ja", "de"]
+    assert results["fr"].translation == "[fr] hello"
+    assert results["ja"].translation == "HELLO"
+    assert results["de"].destination_language == "de"
+
+    # A destination which no translator supports gets an error, not an empty translation
+    class FrenchOnly(FakeTranslator):
+        supported_languages = property(lambda self: ["english", "french"])
+
+    translator = Translator([FrenchOnly()], reorder=False)
+    translator.cache = None
+    results = translator.translate_multi("hello", ["fr", "ja"], "en")
+    assert results["fr"].translation == "HELLO"
+    assert isinstance(results["ja"], TranslationError)
+    assert isinstance(results["ja"].__cause__, UnknownLanguage)
+
+
+def test_jobs_resume():
+    """
+    Tests that a bulk job which was interrupted resumes where it stopped.
+    """
+    import json
+    import os
+    from tempfile import TemporaryDirectory
+
+    from translatepy.jobs import run_job
+
+    translator = FakeTranslator()
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(stats):
+        if stats["rows"] >= 4:
+            raise Interrupted()
+
+    with TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "input.jsonl")
+        output_path = os.path.join(directory, "output.jsonl")
+        with open(input_path, "w") as file:
+            for index in range(10):
+                file.write(json.dumps({"id": index, "text": "row {}".format(index)}) + "\n")
+
+        try:
+            run_job(
+                input_path, output_path, "fr", services=[translator], processes=0, chunk_size=2, progress=interrupt
+            )
+        except Interrupted:
+            pass
+        # A row partially written when the job was killed
+        with open(output_path, "a") as file:
+            file.write('{"id": 4, "te')
+
+        stats = run_job(input_path, output_path, "fr", services=[translator], processes=0, chunk_size=2)
+        with open(output_path) as file:
+            rows = [json.loads(line) for line in file]
+
+        assert stats["rows"] == 10
+        assert [row["translation"] for row in rows] == ["ROW {}".format(index) for index in range(10)]
+        assert len(translator.requests) == 10
+        assert not os.path.exists(output_path + ".checkpoint")
+
+
+def test_cli_records():
+    """
+    Tests that the command line keeps the order of the records, and reports the ones which failed.
+    """
+    import io
+    from random import random
+    from time import sleep
+
+    from translatepy.cli import read_records, translate_records
+
+    # Answers in a random order
+    translator = FakeTranslator(
+        lambda text, *args: sleep(random() / 100) or (ValueError("Failed") if text == "fail" else text.upper())
+    )
+
+    stream = io.BytesIO(b"a\0b\nc\0fail\0" + b"\0".join(str(index).encode() for index in range(20)))
+    records = list(read_records(stream, b"\0"))
+    assert records[:3] == ["a", "b\nc", "fail"]
+
+    results = list(translate_records(translator, records, "fr", window=4))
+    assert [record for record, result in results] == records
+    assert isinstance(results[2][1], Exception)
+    assert [result.translation for record, result in results[3:]] == [str(index) for index in range(20)]
+
+
 test_translators_translation()
\ No newline at end of file
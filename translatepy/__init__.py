@@ -14,3 +14,14 @@ __version__ = "translatepy v1.5.2"
 __maintainer__ = "Anime no Sekai"
 __email__ = "niichannomail@gmail.com"
 __status__ = "Stable"
+
+
+def __getattr__(name: str):
+    # The translators are imported on first use (see `translatepy.translators`)
+    from importlib import import_module
+
+    translators = import_module("translatepy.translators")
+
+    if name in translators.__all__:
+        return getattr(translators, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,8 @@
+"""
+Runs the `translatepy` command (see `translatepy.cli`).
+"""
+import sys
+
+from translatepy.cli import main
+
+sys.exit(main())
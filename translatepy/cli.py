@@ -0,0 +1,211 @@
+"""
+The `translatepy` command: translates the lines (or NUL-delimited records) of the standard input,
+and writes their translations to the standard output, in order, as soon as they are ready.
+
+    $ printf 'Hello\\nGood morning\\n' | translatepy --to fr
+    Bonjour
+    Bonjour
+
+Up to `--window` records are translated at the same time, while the next ones are read.
+Each result is written (and flushed) as soon as it and the ones before it are ready.
+"""
+import argparse
+import json
+import os
+import sys
+
+from translatepy.translators.base import DEFAULT_BATCH_WORKERS
+
+MEMORY = "memory"
+SQLITE = "sqlite"
+NONE = "none"
+
+# The number of bytes read from the standard input at once (at most)
+READ_SIZE = 64 * 1024
+
+
+def read_records(stream, delimiter: bytes = b"\n"):
+    """
+    Yields the records of a binary `stream` separated by `delimiter`, as soon as they are complete.
+    """
+    # `read1` returns what is available instead of waiting for `READ_SIZE` bytes
+    read = getattr(stream, "read1", stream.read)
+    pending = []
+    while True:
+        chunk = read(READ_SIZE)
+        if not chunk:
+            break
+        parts = chunk.split(delimiter)
+        if len(parts) == 1:
+            pending.append(chunk)
+            continue
+        pending.append(parts[0])
+        yield _decode(b"".join(pending), delimiter)
+        for part in parts[1:-1]:
+            yield _decode(part, delimiter)
+        pending = [parts[-1]]
+    if any(pending):
+        # The last record doesn't need to be terminated
+        yield _decode(b"".join(pending), delimiter)
+
+
+def _decode(record: bytes, delimiter: bytes) -> str:
+    if delimiter == b"\n" and record.endswith(b"\r"):
+        record = record[:-1]
+    return record.decode("utf-8", errors="replace")
+
+
+def make_translator(services: list = None, cache: str = MEMORY, cache_file: str = None):
+    """
+    Returns the translator of the `services` (names like 'Google'), with the given cache backend.
+    """
+    from translatepy.translators import Translator
+    from translatepy.translators.registry import get_translator
+
+    if not services:
+        translator = Translator()
+    elif len(services) == 1:
+        translator = get_translator(services[0])()
+    else:
+        translator = Translator(services)
+
+    if cache == NONE:
+        translator.cache = None
+    elif cache == SQLITE:
+        from translatepy.utils.cache import SQLiteCache
+
+        translator.cache = SQLiteCache(cache_file)
+    elif cache != MEMORY:
+        raise ValueError("Unknown cache backend '{}'".format(cache))
+    return translator
+
+
+def translate_records(
+    translator, records, destination_language: str, source_language: str = "auto", window: int = DEFAULT_BATCH_WORKERS
+):
+    """
+    Yields `(record, result)` for each record, in order, the result being a `Translation` or the exception raised.
+
+    The records are read in a separate thread, with at most `window` of them being translated at the same time:
+    each result is yielded as soon as it is ready, even while reading the next record blocks.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from queue import Queue
+    from threading import BoundedSemaphore, Thread
+
+    slots = BoundedSemaphore(window)
+    # (record, future) in the input order, then `None` once all the records are read
+    futures = Queue()
+    reader_errors = []
+
+    def translate(record):
+        try:
+            return translator.translate(record, destination_language, source_language)
+        except Exception as exc:
+            return exc
+
+    def read():
+        try:
+            for record in records:
+                slots.acquire()
+                futures.put((record, executor.submit(translate, record)))
+        except Exception as exc:
+            reader_errors.append(exc)
+        finally:
+            futures.put(None)
+
+    executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix="translatepy")
+    # A daemon: it might still be waiting for the input when the consumer stops
+    Thread(target=read, name="translatepy-reader", daemon=True).start()
+    try:
+        while True:
+            item = futures.get()
+            if item is None:
+                break
+            record, future = item
+            yield record, future.result()
+            slots.release()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if reader_errors:
+        raise reader_errors[0]
+
+
+def _language_code(translator, language: str) -> str:
+    """
+    Returns the code of `language`, which can also be a name like 'French'.
+    """
+    if language == "auto" or language in translator._language_index.code_to_name:
+        return language
+    return translator.get_language(language).language.code
+
+
+def _parse_args(args: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="translatepy",
+        description="Translates the lines (or NUL-delimited records) of the standard input to the standard output.",
+    )
+    parser.add_argument("-t", "--to", required=True, help="The destination language (code or name)")
+    parser.add_argument("-f", "--from", dest="source", default="auto", help="The source language (default: auto)")
+    parser.add_argument(
+        "-s", "--services", help="The comma-separated translators to use, like 'Google,DeepL' (tried in order)"
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        type=int,
+        default=DEFAULT_BATCH_WORKERS,
+        help="The maximum number of records translated at the same time (default: {})".format(DEFAULT_BATCH_WORKERS),
+    )
+    parser.add_argument(
+        "--cache", choices=(MEMORY, SQLITE, NONE), default=MEMORY, help="The cache of the translations (default: memory)"
+    )
+    parser.add_argument("--cache-file", help="The database of the sqlite cache (default: ~/.cache/translatepy)")
+    parser.add_argument(
+        "-0", "--null", action="store_true", help="The records (input and output) are separated by NUL characters"
+    )
+    parser.add_argument(
+        "-j", "--json", action="store_true", help="Write each result as a JSON object, with the fields of the Translation"
+    )
+    return parser.parse_args(args)
+
+
+def main(args: list = None) -> int:
+    """
+    Runs the `translatepy` command, and returns its exit status: 1 if a record couldn't be translated.
+    """
+    options = _parse_args(args)
+    translator = make_translator(
+        options.services.split(",") if options.services else None, options.cache, options.cache_file
+    )
+
+    delimiter = "\0" if options.null else "\n"
+    destination_language = _language_code(translator, options.to)
+    source_language = _language_code(translator, options.source)
+
+    records = read_records(sys.stdin.buffer, delimiter.encode())
+    output = sys.stdout.buffer
+    failed = 0
+    try:
+        for index, (text, result) in enumerate(
+            translate_records(translator, records, destination_language, source_language, options.window)
+        ):
+            if isinstance(result, Exception):
+                failed += 1
+                error = repr(result.__cause__ or result)
+                print("translatepy: could not translate record {}: {}".format(index + 1, error), file=sys.stderr)
+                line = json.dumps({"text": text, "error": error}, ensure_ascii=False) if options.json else ""
+            elif options.json:
+                line = json.dumps(dict(text=text, **result.as_dict()), ensure_ascii=False)
+            else:
+                line = result.translation or ""
+            output.write((line + delimiter).encode("utf-8"))
+            # The next command of the pipeline gets each result as soon as it is ready
+            output.flush()
+    except BrokenPipeError:
+        # The next command stopped reading (like `head`)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 1 if failed else 0
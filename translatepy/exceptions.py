@@ -8,4 +8,13 @@ class TranslationError(Exception):
 
 
 class UnknownLanguage(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class UnknownTranslator(Exception):
+    pass
+
+
+class ServiceUnavailable(Exception):
+    """
+    Raised when the circuit breaker of a translation service doesn't let a request through
+    """
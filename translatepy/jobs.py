@@ -0,0 +1,335 @@
+"""
+Resumable bulk translation of large corpora (JSONL or CSV files).
+
+The rows are streamed from the input, translated in chunks by a pool of processes (each one holding
+its own translators), and written in the input order as soon as they are ready. After each chunk,
+the offsets reached in the input and in the output are saved in a checkpoint file (`<output>.checkpoint`),
+so that a job which was killed resumes where it stopped. The checkpoint is deleted once the job is finished.
+
+    python -m translatepy.jobs corpus.jsonl corpus.fr.jsonl --to fr --processes 4
+
+Each output row is the input row, with the translation (and the error, if the row couldn't be translated).
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from time import monotonic
+
+from translatepy.translators.base import DEFAULT_BATCH_WORKERS
+
+JSONL = "jsonl"
+CSV = "csv"
+
+# The number of rows sent to a worker process at once
+DEFAULT_CHUNK_SIZE = 100
+
+# The translator of the current worker process
+_translator = None
+
+
+def _init_worker(services) -> None:
+    """
+    Creates the translator of a worker process, from the names (or classes, or instances) of the `services`.
+    """
+    global _translator
+    from translatepy.translators import Translator
+    from translatepy.translators.registry import get_translator
+
+    if not services:
+        _translator = Translator()
+        return
+    translators = [get_translator(service) if isinstance(service, str) else service for service in services]
+    if len(translators) > 1:
+        _translator = Translator(translators)
+    else:
+        _translator = translators[0]() if isinstance(translators[0], type) else translators[0]
+
+
+def _translate_chunk(texts: list, destination_language: str, source_language: str, workers: int) -> list:
+    """
+    Translates the texts of a chunk with the translator of the worker process, and returns,
+    for each text, `(translation, None)` or `(None, error)`.
+    """
+    results = [(None, "Missing text")] * len(texts)
+    indices = [index for index, text in enumerate(texts) if isinstance(text, str)]
+    translations = _translator.translate_batch(
+        [texts[index] for index in indices], destination_language, source_language, workers
+    )
+    for index, translation in zip(indices, translations):
+        if isinstance(translation, Exception):
+            results[index] = (None, repr(translation.__cause__ or translation))
+        else:
+            results[index] = (translation.translation, None)
+    return results
+
+
+def _read_rows(file, format: str):
+    """
+    Yields the rows of `file` (opened in binary mode, at the start of a row), with the offset of their end.
+
+    The JSONL rows are decoded from JSON, the CSV rows are lists of values.
+    """
+    # The offset of the end of the last line read
+    offset = file.tell()
+
+    def lines():
+        nonlocal offset
+        for line in iter(file.readline, b""):
+            offset += len(line)
+            yield line
+
+    if format == JSONL:
+        for line in lines():
+            if line.strip():
+                yield json.loads(line), offset
+    else:
+        # The CSV reader only reads the lines of the row it returns
+        for values in csv.reader(line.decode("utf-8") for line in lines()):
+            yield values, offset
+
+
+def _chunks(rows, size: int):
+    """
+    Yields the rows by chunks of `size`, with the offset of the end of the chunk.
+    """
+    chunk = []
+    offset = None
+    for row, offset in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk, offset
+            chunk = []
+    if chunk:
+        yield chunk, offset
+
+
+def _guess_format(path: str) -> str:
+    return CSV if path.lower().endswith(".csv") else JSONL
+
+
+def _load_checkpoint(path: str):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(path: str, checkpoint: dict) -> None:
+    # Replaced atomically: a killed job never leaves a partial checkpoint
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+    os.replace(path + ".tmp", path)
+
+
+def _format_rows(rows: list, results: list, format: str, field: str, output_field: str) -> bytes:
+    """
+    Returns the output of a chunk: each row with its translation, and its error if it failed.
+    """
+    if format == JSONL:
+        lines = []
+        for row, (translation, error) in zip(rows, results):
+            record = dict(row) if isinstance(row, dict) else {field: row}
+            record[output_field] = translation
+            if error is not None:
+                record["error"] = error
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        return "".join(lines).encode("utf-8")
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for row, (translation, error) in zip(rows, results):
+        writer.writerow(row + [translation or "", error or ""])
+    return output.getvalue().encode("utf-8")
+
+
+def run_job(
+    input_path: str,
+    output_path: str,
+    destination_language: str,
+    source_language: str = "auto",
+    services: list = None,
+    field: str = "text",
+    output_field: str = "translation",
+    format: str = None,
+    processes: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_BATCH_WORKERS,
+    resume: bool = True,
+    progress=None,
+) -> dict:
+    """
+    Translates the `field` of each row of a JSONL or CSV file, and writes the rows with their translation
+    (as `output_field`) to `output_path`, in the same format.
+
+    Parameters
+    ----------
+    input_path: str
+        The input file. A JSONL row can also be a string, which is then the text.
+    output_path: str
+        The output file.
+    destination_language: str
+        The language that the texts should be translated to.
+    source_language: str, optional, default='auto'
+        The language that the texts are written in.
+    services: list of str, optional
+        The names (or classes, or instances) of the translators used, tried in order. Defaults to the `Translator` class' defaults.
+    field: str, optional
+        The key (JSONL) or column (CSV) of the texts.
+    output_field: str, optional
+        The key (JSONL) or column (CSV) of the translations. The rows which couldn't be translated also get an `error`.
+    format: str, optional
+        'jsonl' or 'csv'. Guessed from the extension of `input_path` by default.
+    processes: int, optional
+        The number of worker processes. Defaults to the number of CPUs; 0 translates in the current process.
+    chunk_size: int, optional
+        The number of rows sent to a worker at once, and written between two checkpoints.
+    workers: int, optional
+        The maximum number of simultaneous requests of each worker process.
+    resume: bool, optional
+        Whether to resume from the checkpoint of a previous run, if any. Otherwise the output is overwritten.
+    progress: callable, optional
+        Called with the statistics (see the returned value) after each chunk.
+
+    Returns
+    -------
+    dict
+        `rows` (the number of rows written, including the previous runs), `failed` (the number of rows
+        which couldn't be translated), `seconds` (the duration of this run) and `rows_per_second` (of this run).
+    """
+    format = format or _guess_format(input_path)
+    if format not in (JSONL, CSV):
+        raise ValueError("Unknown format '{}'".format(format))
+    checkpoint_path = output_path + ".checkpoint"
+    checkpoint = _load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None and checkpoint["input"] != os.path.abspath(input_path):
+        raise ValueError("The checkpoint '{}' belongs to another input file".format(checkpoint_path))
+
+    stats = {"rows": 0, "failed": 0, "seconds": 0.0, "rows_per_second": 0.0}
+    started_at = monotonic()
+    with open(input_path, "rb") as input_file, open(output_path, "r+b" if checkpoint else "wb") as output_file:
+        rows = _read_rows(input_file, format)
+        text_index = None
+        if format == CSV:
+            header = next(rows, ([], 0))[0]
+            if field not in header:
+                raise ValueError("The column '{}' is not in the header of '{}'".format(field, input_path))
+            text_index = header.index(field)
+
+        if checkpoint is None:
+            checkpoint = {"input": os.path.abspath(input_path), "input_offset": input_file.tell(), "output_offset": 0}
+            if format == CSV:
+                output_file.write(_format_rows([header], [(output_field, "error")], CSV, field, output_field))
+        else:
+            # Drop what was written after the last checkpoint
+            input_file.seek(checkpoint["input_offset"])
+            rows = _read_rows(input_file, format)
+            output_file.truncate(checkpoint["output_offset"])
+            output_file.seek(checkpoint["output_offset"])
+            stats["rows"] = checkpoint.get("rows", 0)
+            stats["failed"] = checkpoint.get("failed", 0)
+        done_before = stats["rows"]
+
+        def texts(chunk):
+            if format == CSV:
+                return [row[text_index] if text_index < len(row) else None for row in chunk]
+            return [row.get(field) if isinstance(row, dict) else row for row in chunk]
+
+        def write(chunk, offset, results):
+            output_file.write(_format_rows(chunk, results, format, field, output_field))
+            # The output must be written before the checkpoint pointing after it
+            output_file.flush()
+            checkpoint["input_offset"] = offset
+            checkpoint["output_offset"] = output_file.tell()
+            stats["rows"] += len(chunk)
+            stats["failed"] += sum(1 for translation, error in results if error is not None)
+            checkpoint["rows"] = stats["rows"]
+            checkpoint["failed"] = stats["failed"]
+            _save_checkpoint(checkpoint_path, checkpoint)
+            stats["seconds"] = monotonic() - started_at
+            stats["rows_per_second"] = (stats["rows"] - done_before) / stats["seconds"] if stats["seconds"] else 0.0
+            if progress is not None:
+                progress(dict(stats))
+
+        chunks = _chunks(rows, chunk_size)
+        if processes == 0:
+            _init_worker(services)
+            for chunk, offset in chunks:
+                write(chunk, offset, _translate_chunk(texts(chunk), destination_language, source_language, workers))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            processes = processes or os.cpu_count() or 1
+            executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(services,))
+            try:
+                # Keep every worker busy, without reading the whole input ahead
+                pending = deque()
+                for chunk, offset in chunks:
+                    future = executor.submit(
+                        _translate_chunk, texts(chunk), destination_language, source_language, workers
+                    )
+                    pending.append((chunk, offset, future))
+                    if len(pending) >= 2 * processes:
+                        chunk, offset, future = pending.popleft()
+                        write(chunk, offset, future.result())
+                while pending:
+                    chunk, offset, future = pending.popleft()
+                    write(chunk, offset, future.result())
+            finally:
+                executor.shutdown(cancel_futures=True)
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    stats["seconds"] = monotonic() - started_at
+    stats["rows_per_second"] = (stats["rows"] - done_before) / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(args: list = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m translatepy.jobs", description="Translates a JSONL or CSV corpus, resuming where a previous run stopped."
+    )
+    parser.add_argument("input", help="The JSONL or CSV file to translate")
+    parser.add_argument("output", help="The file where the rows are written with their translation")
+    parser.add_argument("--to", required=True, help="The destination language")
+    parser.add_argument("--from", dest="source", default="auto", help="The source language (default: auto)")
+    parser.add_argument("--services", help="The comma-separated translators to use, like 'Google,DeepL'")
+    parser.add_argument("--field", default="text", help="The key or column of the texts (default: text)")
+    parser.add_argument("--output-field", default="translation", help="The key or column of the translations")
+    parser.add_argument("--format", choices=(JSONL, CSV), help="The format of the files (guessed from the extension)")
+    parser.add_argument("--processes", type=int, help="The number of worker processes (default: the number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="The number of rows per chunk")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="The simultaneous requests per process")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of a previous run")
+    options = parser.parse_args(args)
+
+    def progress(stats):
+        print("\r{rows} rows ({failed} failed), {rows_per_second:.1f} rows/s".format(**stats), end="", file=sys.stderr)
+
+    stats = run_job(
+        options.input,
+        options.output,
+        options.to,
+        options.source,
+        services=options.services.split(",") if options.services else None,
+        field=options.field,
+        output_field=options.output_field,
+        format=options.format,
+        processes=options.processes,
+        chunk_size=options.chunk_size,
+        workers=options.workers,
+        resume=not options.restart,
+        progress=progress,
+    )
+    print(
+        "\r{rows} rows ({failed} failed) in {seconds:.1f}s, {rows_per_second:.1f} rows/s".format(**stats),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,95 @@
 """
 Module containing various models for holding informations.
+
+The models use `__slots__` (no per-instance `__dict__`), as bulk jobs keep a lot of them in memory.
 """
+from threading import Lock
 
 
 class Translation:
     """
     Class that holds the result of a Translation.
+
+    `attempts` is the timeline of the requests made (a list of `translatepy.utils.hooks.Event`),
+    when the translator records it (see `BaseTranslator.record_attempts`).
     """
 
-    def __init__(self, translator, source_language, destination_language, translation):
+    __slots__ = ("translator", "source_language", "destination_language", "translation", "attempts")
+
+    def __init__(self, translator, source_language, destination_language, translation, attempts=None):
         self.translator = str(translator)
         self.source_language = source_language
         self.destination_language = destination_language
         self.translation = translation
+        self.attempts = attempts
+
+    def as_dict(self) -> dict:
+        """
+        Returns the result as a dict (the attempts are only included when they were recorded).
+        """
+        result = {
+            "translator": self.translator,
+            "source_language": self.source_language,
+            "destination_language": self.destination_language,
+            "translation": self.translation,
+        }
+        if self.attempts is not None:
+            result["attempts"] = [attempt.as_dict() for attempt in self.attempts]
+        return result
+
+    def __reduce__(self):
+        # Pickled as its constructor arguments
+        return (
+            Translation,
+            (self.translator, self.source_language, self.destination_language, self.translation, self.attempts),
+        )
 
     def __str__(self) -> str:
-        return str(self.__dict__)
+        return str(self.as_dict())
 
 
 class Language:
     """
     Class that holds information about a Language.
+
+    The instances are immutable and interned: there is a single `Language` object
+    for each (name, code) pair, shared by all the results.
     """
 
-    def __init__(self, name: str, code: str) -> None:
-        self.name = name
-        self.code = code
+    __slots__ = ("name", "code")
+
+    # (code, name) -> Language
+    _instances = {}
+    _instances_lock = Lock()
+
+    def __new__(cls, name: str, code: str) -> "Language":
+        key = (code, name)
+        language = cls._instances.get(key)
+        if language is None:
+            with cls._instances_lock:
+                language = cls._instances.get(key)
+                if language is None:
+                    language = object.__new__(cls)
+                    object.__setattr__(language, "name", name)
+                    object.__setattr__(language, "code", code)
+                    cls._instances[key] = language
+        return language
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("Language objects are immutable")
+
+    def __delattr__(self, name) -> None:
+        raise AttributeError("Language objects are immutable")
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "code": self.code}
+
+    def __reduce__(self):
+        # Interned again when unpickled
+        return (Language, (self.name, self.code))
 
     def __str__(self) -> str:
-        return str(self.__dict__)
+        return str(self.as_dict())
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -44,6 +105,8 @@ class LanguageSearch:
         - `similarity`: Level of similarity between `input` and `language.name`.
     """
 
+    __slots__ = ("input", "language", "similarity")
+
     def __init__(
         self,
         input: str,
@@ -55,5 +118,11 @@ class LanguageSearch:
         self.language = Language(name, code)
         self.similarity = similarity
 
+    def as_dict(self) -> dict:
+        return {"input": self.input, "language": self.language.as_dict(), "similarity": self.similarity}
+
+    def __reduce__(self):
+        return (LanguageSearch, (self.input, self.language.name, self.language.code, self.similarity))
+
     def __str__(self) -> str:
-        return str(self.__dict__)
\ No newline at end of file
+        return str(self.as_dict())
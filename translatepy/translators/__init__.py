@@ -1,6 +1,19 @@
-from .bing import BingTranslator
-from .deepl import DeepLTranslator
-from .google import GoogleTranslator, GoogleV2Translator
-from .reverso import ReversoTranslator
-from .translator import Translator
-from .yandex import YandexTranslator
\ No newline at end of file
+"""
+The translators, each one imported on first use:
+
+    from translatepy.translators import GoogleTranslator  # only imports the Google translators
+"""
+from .registry import BUILTIN_TRANSLATORS, available_translators, get_translator, load_builtin
+
+__all__ = list(BUILTIN_TRANSLATORS) + ["available_translators", "get_translator"]
+
+
+def __getattr__(name: str):
+    if name in BUILTIN_TRANSLATORS:
+        translator = globals()[name] = load_builtin(name)
+        return translator
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -1,18 +1,129 @@
 from abc import ABC, abstractmethod, abstractproperty
+from collections import deque
+from time import monotonic
+from typing import TYPE_CHECKING
 
-import Levenshtein
-
-from translatepy.utils.utils import get_key
+from translatepy.utils.cache import TRANSLATION_CACHE
+from translatepy.utils.detect import detect_many
+from translatepy.utils.hooks import ATTEMPT, RETRY, emit, trace_call, tracing
+from translatepy.utils.languages import LANGUAGE_CODES, LanguageIndex
+from translatepy.utils.metrics import METRICS, record_cache_lookups, record_request
+from translatepy.utils.ratelimit import RateLimiter, get_rate_limiter
+from translatepy.utils.utils import concurrent_map
+from translatepy.utils.segment import join_segments, split_text
+from translatepy.utils.singleflight import SINGLE_FLIGHT
 from translatepy.exceptions import TranslationError, UnknownLanguage
 
 from ..models import Translation, LanguageSearch, Language
 
+if TYPE_CHECKING:
+    from translatepy.utils.request import AsyncSession, Session
+
+
+# The default number of simultaneous requests made by `translate_batch`
+DEFAULT_BATCH_WORKERS = 8
+
 
 class BaseTranslator(ABC):
     """
     Base abstract class for a translator
     """
 
+    # The maximum length (see `_text_length`) of the text sent in a single request.
+    # Longer texts are split into segments, translated concurrently. `None` means no limit.
+    _max_text_length = None
+    # The maximum number of texts sent in a single request, by the services translating
+    # multiple texts at once (see `_batch_groups`). `None` means no limit.
+    _max_batch_size = None
+
+    # The cache of the translations.
+    # Shared by all the translators by default: give an instance its own `LRUCache`
+    # for a per-instance cache, or set it to `None` to disable caching.
+    cache = TRANSLATION_CACHE
+
+    # Coalesces the identical translations requested at the same time:
+    # the first caller makes the request, the others wait for its result.
+    # Shared by all the translators by default, set it to `None` to disable it.
+    single_flight = SINGLE_FLIGHT
+
+    # Whether to detect the language of the texts locally (see `translatepy.utils.detect`)
+    # when the source language is 'auto', instead of leaving it to the service.
+    # The texts whose language can't be detected are still sent with 'auto'.
+    detect_locally = False
+
+    # Whether the service remembers the languages it detected (like Reverso), so that the
+    # following requests for the same text don't detect it again: `translate_multi` then
+    # translates to the first destination alone, before the others.
+    _remembers_detection = False
+
+    # Whether to attach the timeline of the requests made (see `translatepy.utils.hooks`)
+    # to the results of `translate`, as their `attempts`.
+    record_attempts = False
+
+    # The HTTP session used by this translator.
+    # `None` means the session shared by all the translators.
+    _session = None
+
+    @property
+    def session(self) -> "Session":
+        """
+        The HTTP `Session` used to make the requests.
+
+        Defaults to a keep-alive session shared by all the translators, so that
+        repeated calls to the same service reuse warm connections.
+        """
+        if self._session is None:
+            # `requests` is only imported when the first request is made
+            from translatepy.utils.request import get_session
+
+            return get_session()
+        return self._session
+
+    @session.setter
+    def session(self, session: "Session") -> None:
+        self._session = session
+
+    # The non-blocking HTTP session used by this translator.
+    # `None` means the session shared by all the translators in the running event loop.
+    _async_session = None
+
+    @property
+    def async_session(self) -> "AsyncSession":
+        """
+        The non-blocking HTTP `AsyncSession` used by `translate_async`.
+
+        Defaults to a keep-alive session shared by all the translators in the running event loop.
+        """
+        if self._async_session is None:
+            from translatepy.utils.request import get_async_session
+
+            return get_async_session()
+        return self._async_session
+
+    @async_session.setter
+    def async_session(self, session: "AsyncSession") -> None:
+        self._async_session = session
+
+    # The rate limiter used by this translator.
+    # `None` means the one shared by all the translators of the same service.
+    _rate_limiter = None
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        The `RateLimiter` throttling the requests of this translator.
+
+        Defaults to the one shared by all the translators of the same service
+        (see `translatepy.utils.ratelimit.set_rate_limiter`).
+        """
+        if self._rate_limiter is None:
+            return get_rate_limiter(str(self))
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter: RateLimiter) -> None:
+        self._rate_limiter = limiter
+
     def translate(
         self, text: str, destination_language: str, source_language: str = "auto"
     ) -> Translation:
@@ -38,31 +149,288 @@ class BaseTranslator(ABC):
 
         """
 
-        # Validate the languages
-        # We save the values in new variables, so at the end
-        # of this method, we still have acess to the original codes.
-        # With this we can use the original codes to build the response,
-        # this makes the code transformation transparent to the user.
+        with trace_call(str(self), self.record_attempts) as call:
+            # Validate the languages
+            # We save the values in new variables, so at the end
+            # of this method, we still have acess to the original codes.
+            # With this we can use the original codes to build the response,
+            # this makes the code transformation transparent to the user.
+            dest_code = self._validate_and_fix_lang(destination_language)
+            source_code = self._validate_and_fix_lang(source_language)
+            source_code = self._detect_source_languages([text], dest_code, source_code)[0]
+
+            try:
+                # Call the private concrete implementation of the Translator to get the translation
+                translation = self._cached_translate(
+                    text,
+                    dest_code,
+                    source_code,
+                )
+                # Return a `Translation` object
+                return call.attach(
+                    Translation(
+                        translator=str(self),
+                        source_language=source_language,
+                        destination_language=destination_language,
+                        translation=translation,
+                    )
+                )
+
+            except Exception as exc:
+                raise TranslationError from exc
+
+    async def translate_async(
+        self, text: str, destination_language: str, source_language: str = "auto"
+    ) -> Translation:
+        """
+        Translates text from a given language to another specific language, without blocking the event loop.
+
+        Takes the same parameters, and returns the same `Translation`, as `translate`.
+        """
+
+        with trace_call(str(self), self.record_attempts) as call:
+            # Validate the languages
+            dest_code = self._validate_and_fix_lang(destination_language)
+            source_code = self._validate_and_fix_lang(source_language)
+            source_code = self._detect_source_languages([text], dest_code, source_code)[0]
+
+            try:
+                # Call the private concrete implementation of the Translator to get the translation
+                translation = await self._cached_translate_async(
+                    text,
+                    dest_code,
+                    source_code,
+                )
+                # Return a `Translation` object
+                return call.attach(
+                    Translation(
+                        translator=str(self),
+                        source_language=source_language,
+                        destination_language=destination_language,
+                        translation=translation,
+                    )
+                )
+
+            except Exception as exc:
+                raise TranslationError from exc
+
+    def translate_batch(
+        self,
+        texts: list[str],
+        destination_language: str,
+        source_language: str = "auto",
+        workers: int = DEFAULT_BATCH_WORKERS,
+    ) -> list[Translation]:
+        """
+        Translates multiple texts from a given language to another specific language.
+
+        Parameters
+        ----------
+        texts: list of str
+            The texts to be translated.
+        destination_language: str or `Language`
+            The language that the `texts` should be translated to. (see `translate`)
+        source_language: str or `Language`, optional, default='auto'
+            The language that the `texts` are written in. (see `translate`)
+        workers: int, optional
+            The maximum number of simultaneous requests.
+
+        Returns
+        -------
+        list of Translation
+            The results, in the same order as `texts`. A text which couldn't be translated
+            gets a `TranslationError` instead of a `Translation`.
+        """
+
+        # Validate the languages once for all the texts
         dest_code = self._validate_and_fix_lang(destination_language)
         source_code = self._validate_and_fix_lang(source_language)
 
-        try:
-            # Call the private concrete implementation of the Translator to get the translation
-            translation = self._translate(
-                text,
-                dest_code,
-                source_code,
+        texts = list(texts)
+        source_codes = self._detect_source_languages(texts, dest_code, source_code)
+
+        # Translate the texts of each source language together
+        translations = [None] * len(texts)
+        for code in set(source_codes):
+            indices = [index for index, text_code in enumerate(source_codes) if text_code == code]
+            results = self._cached_translate_batch(
+                [texts[index] for index in indices], dest_code, code, workers
             )
-            # Return a `Translation` object
-            return Translation(
-                translator=str(self),
-                source_language=source_language,
-                destination_language=destination_language,
-                translation=translation,
+            for index, translation in zip(indices, results):
+                translations[index] = translation
+
+        return [
+            self._make_result(translation, destination_language, source_language)
+            for translation in translations
+        ]
+
+    def translate_multi(
+        self,
+        text: str,
+        destination_languages: list[str],
+        source_language: str = "auto",
+        workers: int = DEFAULT_BATCH_WORKERS,
+    ) -> dict:
+        """
+        Translates a text to multiple languages.
+
+        The source language is detected once for all the destinations, which are translated
+        concurrently (in a single request when the service supports it).
+
+        Parameters
+        ----------
+        text: str
+            The text to be translated.
+        destination_languages: list of str or `Language`
+            The languages that the `text` should be translated to. (see `translate`)
+        source_language: str or `Language`, optional, default='auto'
+            The language that the `text` is written in. (see `translate`)
+        workers: int, optional
+            The maximum number of simultaneous requests.
+
+        Returns
+        -------
+        dict
+            The result for each of the `destination_languages`, keyed by its code. A language which
+            the text couldn't be translated to gets a `TranslationError` instead of a `Translation`.
+        """
+
+        # Validate the languages once for all the destinations
+        destination_languages = list(dict.fromkeys(destination_languages))
+        dest_codes = [self._validate_and_fix_lang(language) for language in destination_languages]
+        source_code = self._validate_and_fix_lang(source_language)
+        source_code = self._detect_source_languages([text], None, source_code)[0]
+
+        # A destination which is the detected language is left to the service
+        source_codes = ["auto" if code == source_code else source_code for code in dest_codes]
+
+        translations = [None] * len(dest_codes)
+        for code in set(source_codes):
+            indices = [index for index, dest_source_code in enumerate(source_codes) if dest_source_code == code]
+            results = self._cached_translate_multi(text, [dest_codes[index] for index in indices], code, workers)
+            for index, translation in zip(indices, results):
+                translations[index] = translation
+
+        return {
+            (language.code if isinstance(language, Language) else language): self._make_result(
+                translation, language, source_language
             )
+            for language, translation in zip(destination_languages, translations)
+        }
 
-        except Exception as exc:
-            raise TranslationError from exc
+    def translate_iter(
+        self,
+        texts,
+        destination_language: str,
+        source_language: str = "auto",
+        window: int = DEFAULT_BATCH_WORKERS,
+        ordered: bool = True,
+    ):
+        """
+        Lazily translates the texts of an iterable (which can be unbounded) from a given language
+        to another specific language.
+
+        At most `window` texts are read ahead and translated simultaneously: the next texts are
+        only read once the results are consumed, so the memory use doesn't depend on the input size.
+
+        Parameters
+        ----------
+        texts: iterable of str
+            The texts to be translated.
+        destination_language: str or `Language`
+            The language that the `texts` should be translated to. (see `translate`)
+        source_language: str or `Language`, optional, default='auto'
+            The language that the `texts` are written in. (see `translate`)
+        window: int, optional
+            The maximum number of texts being translated at the same time.
+        ordered: bool, optional, default=True
+            If `True`, the results are yielded in the order of `texts`. Otherwise they are yielded
+            as soon as they are ready, as `(index, result)` pairs, `index` being the position of the text.
+
+        Yields
+        ------
+        Translation
+            The result of each text. A text which couldn't be translated gets a `TranslationError`
+            instead of a `Translation`.
+        """
+
+        # Validate the languages once for all the texts
+        dest_code = self._validate_and_fix_lang(destination_language)
+        source_code = self._validate_and_fix_lang(source_language)
+
+        def translate(text):
+            try:
+                text_source_code = self._detect_source_languages([text], dest_code, source_code)[0]
+                translation = self._cached_translate(text, dest_code, text_source_code)
+            except Exception as exc:
+                translation = exc
+            return self._make_result(translation, destination_language, source_language)
+
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix="translatepy") as executor:
+            if ordered:
+                pending = deque()
+                try:
+                    for text in texts:
+                        pending.append(executor.submit(translate, text))
+                        if len(pending) >= window:
+                            yield pending.popleft().result()
+                    while pending:
+                        yield pending.popleft().result()
+                finally:
+                    # The consumer might have stopped early
+                    for future in pending:
+                        future.cancel()
+            else:
+                pending = {}
+                try:
+                    for index, text in enumerate(texts):
+                        pending[executor.submit(translate, text)] = index
+                        if len(pending) >= window:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                yield pending.pop(future), future.result()
+                    for future in as_completed(list(pending)):
+                        yield pending.pop(future), future.result()
+                finally:
+                    for future in pending:
+                        future.cancel()
+
+    def _detect_source_languages(
+        self, texts: list[str], destination_language: str, source_language: str
+    ) -> list[str]:
+        """
+        Returns the source language of each text: if `detect_locally` is set and `source_language` is 'auto',
+        the language detected locally (converted to the code of the service), `source_language` otherwise.
+        """
+        if source_language != "auto" or not self.detect_locally:
+            return [source_language] * len(texts)
+        service_codes = self._language_index.service_codes
+        results = []
+        for code in detect_many(texts):
+            code = service_codes.get(code, "auto")
+            # Leave the languages which can't be detected or aren't supported,
+            # and the texts already in the destination language, to the service
+            results.append("auto" if code == destination_language else code)
+        return results
+
+    def _make_result(self, translation, destination_language, source_language):
+        """
+        Returns the `Translation` of a translation (str), or the `TranslationError` of an exception.
+        """
+        if isinstance(translation, Exception):
+            if isinstance(translation, TranslationError):
+                return translation
+            error = TranslationError()
+            error.__cause__ = translation
+            return error
+        return Translation(
+            translator=str(self),
+            source_language=source_language,
+            destination_language=destination_language,
+            translation=translation,
+        )
 
     @abstractmethod
     def _translate(
@@ -74,6 +442,372 @@ class BaseTranslator(ABC):
         return a translation (str).
         """
 
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Private method that concrete Translators can implement to translate
+        without blocking the event loop, usually with `self.async_session`.
+
+        Defaults to running `_translate` in the event loop's default executor.
+        """
+        from asyncio import get_running_loop
+
+        return await get_running_loop().run_in_executor(
+            None, self._translate, text, destination_language, source_language
+        )
+
+    def _translate_batch(
+        self, texts: list[str], destination_language: str, source_language: str, workers: int
+    ) -> list:
+        """
+        Private method that concrete Translators can implement to translate multiple texts at once,
+        for example with a native bulk request. Receives the validated parameters and must return,
+        for each text, either its translation (str) or the exception that occurred.
+
+        Defaults to calling `_translate` for each text, with up to `workers` threads.
+        """
+        return concurrent_map(
+            lambda text: self._limited_translate(text, destination_language, source_language),
+            texts,
+            workers,
+        )
+
+    def _translate_multi(
+        self, text: str, destination_languages: list[str], source_language: str, workers: int
+    ) -> list:
+        """
+        Private method that concrete Translators can implement to translate a text to multiple languages
+        at once, for example with a native multi-target request. Receives the validated parameters and
+        must return, for each destination language, either the translation (str) or the exception that occurred.
+
+        Defaults to calling `_translate` (segmented) for each destination, with up to `workers` threads.
+        """
+        results = []
+        if source_language == "auto" and self._remembers_detection and len(destination_languages) > 1:
+            # Let the service detect the language once: the other requests reuse its detection
+            try:
+                results.append(self._segmented_translate(text, destination_languages[0], source_language))
+            except Exception as exc:
+                results.append(exc)
+            destination_languages = destination_languages[1:]
+        return results + concurrent_map(
+            lambda destination_language: self._segmented_translate(text, destination_language, source_language),
+            destination_languages,
+            workers,
+        )
+
+    def _text_length(self, text: str) -> int:
+        """
+        Returns the length of `text` compared to `_max_text_length`: its number of characters by default.
+        Must be additive (the length of a concatenation is the sum of the lengths), to split the texts.
+        """
+        return len(text)
+
+    def _batch_groups(self, texts: list[str]) -> list[list[str]]:
+        """
+        Splits `texts` (in order) into the groups sent in a single request: at most `_max_batch_size` texts,
+        whose lengths add up to at most `_max_text_length` (a longer text being alone in its group).
+        """
+        groups = []
+        group = []
+        group_length = 0
+        for text in texts:
+            length = self._text_length(text)
+            if group and (
+                (self._max_batch_size is not None and len(group) >= self._max_batch_size)
+                or (self._max_text_length is not None and group_length + length > self._max_text_length)
+            ):
+                groups.append(group)
+                group = []
+                group_length = 0
+            group.append(text)
+            group_length += length
+        if group:
+            groups.append(group)
+        return groups
+
+    def _is_long(self, text: str) -> bool:
+        """
+        Returns whether `text` is longer than `_max_text_length`, and has to be split
+        """
+        return self._max_text_length is not None and self._text_length(text) > self._max_text_length
+
+    def _segmented_translate(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Calls `_translate` (rate limited), splitting the texts longer than `_max_text_length`
+        on paragraph and sentence boundaries, and translating the segments concurrently.
+        """
+        if not self._is_long(text):
+            return self._limited_translate(text, destination_language, source_language)
+
+        segments = split_text(text, self._max_text_length, self._text_length)
+        translations = self._translate_batch(
+            [segment for leading, segment, trailing in segments if segment],
+            destination_language,
+            source_language,
+            DEFAULT_BATCH_WORKERS,
+        )
+        for translation in translations:
+            if isinstance(translation, Exception):
+                raise translation
+        return join_segments(segments, translations)
+
+    def _segmented_translate_batch(
+        self, texts: list[str], destination_language: str, source_language: str, workers: int
+    ) -> list:
+        """
+        Calls `_translate_batch`, except for the texts longer than `_max_text_length`
+        which are translated with `_segmented_translate`.
+        """
+        if self._max_text_length is None:
+            return self._translate_batch(texts, destination_language, source_language, workers)
+        long = [index for index, text in enumerate(texts) if self._is_long(text)]
+        if not long:
+            return self._translate_batch(texts, destination_language, source_language, workers)
+
+        short = [index for index, text in enumerate(texts) if not self._is_long(text)]
+        results = [None] * len(texts)
+        translations = self._translate_batch(
+            [texts[index] for index in short], destination_language, source_language, workers
+        )
+        for index, translation in zip(short, translations):
+            results[index] = translation
+        translations = concurrent_map(
+            lambda text: self._segmented_translate(text, destination_language, source_language),
+            [texts[index] for index in long],
+            workers,
+        )
+        for index, translation in zip(long, translations):
+            results[index] = translation
+        return results
+
+    async def _segmented_translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Asynchronous version of `_segmented_translate`
+        """
+        if not self._is_long(text):
+            return await self._limited_translate_async(text, destination_language, source_language)
+
+        from asyncio import gather
+
+        segments = split_text(text, self._max_text_length, self._text_length)
+        translations = await gather(
+            *(
+                self._limited_translate_async(segment, destination_language, source_language)
+                for leading, segment, trailing in segments
+                if segment
+            )
+        )
+        return join_segments(segments, translations)
+
+    def _limited_translate(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Calls `_translate` within the limits of the rate limiter, retrying when the service throttles it.
+        """
+        if METRICS.enabled or tracing():
+            return self.rate_limiter.call(
+                self._measured_call,
+                self._translate,
+                text,
+                destination_language,
+                source_language,
+                characters=len(text),
+                on_retry=self._on_retry,
+            )
+        return self.rate_limiter.call(
+            self._translate, text, destination_language, source_language, characters=len(text)
+        )
+
+    async def _limited_translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Asynchronous version of `_limited_translate`
+        """
+        if METRICS.enabled or tracing():
+            return await self.rate_limiter.call_async(
+                self._measured_call_async,
+                self._translate_async,
+                text,
+                destination_language,
+                source_language,
+                characters=len(text),
+                on_retry=self._on_retry,
+            )
+        return await self.rate_limiter.call_async(
+            self._translate_async, text, destination_language, source_language, characters=len(text)
+        )
+
+    def _measured_call(self, function, *args):
+        """
+        Calls `function(*args)`, a request to the service, recording it in the metrics and the hooks.
+        """
+        started_at = monotonic()
+        try:
+            result = function(*args)
+        except Exception as exc:
+            self._record_attempt(started_at, exc)
+            raise
+        self._record_attempt(started_at)
+        return result
+
+    async def _measured_call_async(self, function, *args):
+        """
+        Asynchronous version of `_measured_call`
+        """
+        started_at = monotonic()
+        try:
+            result = await function(*args)
+        except Exception as exc:
+            self._record_attempt(started_at, exc)
+            raise
+        self._record_attempt(started_at)
+        return result
+
+    def _record_attempt(self, started_at: float, exception: Exception = None) -> None:
+        duration = monotonic() - started_at
+        if METRICS.enabled:
+            record_request(str(self), duration, exception)
+        if tracing():
+            emit(ATTEMPT, str(self), started_at, duration=duration, exception=exception)
+
+    def _on_retry(self, exception: Exception, delay: float) -> None:
+        if tracing():
+            emit(RETRY, str(self), exception=exception, delay=delay)
+
+    @property
+    def _cache_namespace(self) -> str:
+        """
+        The part of the cache keys (and single-flight keys) identifying the translator:
+        the translators giving different translations must have different namespaces.
+        """
+        return str(self)
+
+    def _cache_key(self, text: str, destination_language: str, source_language: str) -> tuple:
+        return (self._cache_namespace, source_language, destination_language, text)
+
+    def _cached_translate(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Calls `_translate` (segmented and rate limited), unless the translation is already in the cache,
+        or is already being requested by another caller (see `single_flight`).
+        """
+        key = self._cache_key(text, destination_language, source_language)
+        if self.cache is not None:
+            translation = self.cache.get(key)
+            if METRICS.enabled:
+                record_cache_lookups(str(self), int(translation is not None), int(translation is None))
+            if translation is not None:
+                return translation
+
+        if self.single_flight is None:
+            return self._request_translation(key, text, destination_language, source_language)
+        return self.single_flight.do(
+            key, self._request_translation, key, text, destination_language, source_language
+        )
+
+    def _request_translation(
+        self, key: tuple, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Calls `_translate` (segmented and rate limited), and caches the translation under `key`.
+        """
+        translation = self._segmented_translate(text, destination_language, source_language)
+        if translation is not None and self.cache is not None:
+            self.cache.set(key, translation)
+        return translation
+
+    async def _cached_translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Calls `_translate_async` (segmented and rate limited), unless the translation is already in the cache,
+        or is already being requested by another task (see `single_flight`).
+        """
+        key = self._cache_key(text, destination_language, source_language)
+        if self.cache is not None:
+            translation = self.cache.get(key)
+            if METRICS.enabled:
+                record_cache_lookups(str(self), int(translation is not None), int(translation is None))
+            if translation is not None:
+                return translation
+
+        if self.single_flight is None:
+            return await self._request_translation_async(key, text, destination_language, source_language)
+        return await self.single_flight.do_async(
+            key, self._request_translation_async, key, text, destination_language, source_language
+        )
+
+    async def _request_translation_async(
+        self, key: tuple, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Asynchronous version of `_request_translation`
+        """
+        translation = await self._segmented_translate_async(text, destination_language, source_language)
+        if translation is not None and self.cache is not None:
+            self.cache.set(key, translation)
+        return translation
+
+    def _cached_translate_batch(
+        self, texts: list[str], destination_language: str, source_language: str, workers: int
+    ) -> list:
+        """
+        Calls `_translate_batch` (segmented) with the texts which are not already in the cache.
+        """
+        if self.cache is None:
+            return self._segmented_translate_batch(texts, destination_language, source_language, workers)
+
+        keys = [self._cache_key(text, destination_language, source_language) for text in texts]
+        results = [self.cache.get(key) for key in keys]
+        missing = [index for index, translation in enumerate(results) if translation is None]
+        if METRICS.enabled:
+            record_cache_lookups(str(self), len(texts) - len(missing), len(missing))
+        if missing:
+            translations = self._segmented_translate_batch(
+                [texts[index] for index in missing], destination_language, source_language, workers
+            )
+            for index, translation in zip(missing, translations):
+                results[index] = translation
+                if translation is not None and not isinstance(translation, Exception):
+                    self.cache.set(keys[index], translation)
+        return results
+
+    def _cached_translate_multi(
+        self, text: str, destination_languages: list[str], source_language: str, workers: int
+    ) -> list:
+        """
+        Calls `_translate_multi` with the destination languages whose translation is not already in the cache.
+        """
+        if self.cache is None:
+            return self._translate_multi(text, destination_languages, source_language, workers)
+
+        keys = [
+            self._cache_key(text, destination_language, source_language)
+            for destination_language in destination_languages
+        ]
+        results = [self.cache.get(key) for key in keys]
+        missing = [index for index, translation in enumerate(results) if translation is None]
+        if METRICS.enabled:
+            record_cache_lookups(str(self), len(keys) - len(missing), len(missing))
+        if missing:
+            translations = self._translate_multi(
+                text, [destination_languages[index] for index in missing], source_language, workers
+            )
+            for index, translation in zip(missing, translations):
+                results[index] = translation
+                if translation is not None and not isinstance(translation, Exception):
+                    self.cache.set(keys[index], translation)
+        return results
+
     def __str__(self) -> str:
         """
         String representation of a translator.
@@ -85,126 +819,22 @@ class BaseTranslator(ABC):
     @property
     def _codes(self):
         """
-        Property that returns a `dict` containing all the possible languages.
-        The values are the language name, and the keys are the language code.
+        Property that returns a mapping containing all the possible languages.
+        The keys are the language name, and the values are the language code.
         """
-        return {
-            "automatic": "auto",
-            "afrikaans": "af",
-            "albanian": "sq",
-            "amharic": "am",
-            "arabic": "ar",
-            "armenian": "hy",
-            "azerbaijani": "az",
-            "basque": "eu",
-            "belarusian": "be",
-            "bengali": "bn",
-            "bosnian": "bs",
-            "bulgarian": "bg",
-            "catalan": "ca",
-            "cebuano": "ceb",
-            "chichewa": "ny",
-            "chinese": "zh-CN",
-            "chinese (simplified)": "zh-CN",
-            "chinese (traditional)": "zh-TW",
-            "corsican": "co",
-            "croatian": "hr",
-            "czech": "cs",
-            "danish": "da",
-            "dutch": "nl",
-            "english": "en",
-            "esperanto": "eo",
-            "estonian": "et",
-            "filipino": "tl",
-            "finnish": "fi",
-            "french": "fr",
-            "frisian": "fy",
-            "galician": "gl",
-            "georgian": "ka",
-            "german": "de",
-            "greek": "el",
-            "gujarati": "gu",
-            "haitian": "ht",
-            "creole": "ht",
-            "haitian creole": "ht",
-            "hausa": "ha",
-            "hawaiian": "haw",
-            "hebrew": "iw",
-            "hindi": "hi",
-            "hmong": "hmn",
-            "hungarian": "hu",
-            "icelandic": "is",
-            "igbo": "ig",
-            "indonesian": "id",
-            "irish": "ga",
-            "italian": "it",
-            "japanese": "ja",
-            "javanese": "jw",
-            "kannada": "kn",
-            "kazakh": "kk",
-            "khmer": "km",
-            "korean": "ko",
-            "kurdish": "ku",
-            "kurdish (kurmanji)": "ku",
-            "kyrgyz": "ky",
-            "lao": "lo",
-            "latin": "la",
-            "latvian": "lv",
-            "lithuanian": "lt",
-            "luxembourgish": "lb",
-            "macedonian": "mk",
-            "malagasy": "mg",
-            "malay": "ms",
-            "malayalam": "ml",
-            "maltese": "mt",
-            "maori": "mi",
-            "marathi": "mr",
-            "mongolian": "mn",
-            "myanmar": "my",
-            "burmese": "my",
-            "myanmar (burmese)": "my",
-            "nepali": "ne",
-            "norwegian": "no",
-            "odia": "or",
-            "pashto": "ps",
-            "persian": "fa",
-            "polish": "pl",
-            "portuguese": "pt",
-            "punjabi": "pa",
-            "romanian": "ro",
-            "russian": "ru",
-            "samoan": "sm",
-            "scots": "gd",
-            "gaelic": "gd",
-            "scots gaelic": "gd",
-            "serbian": "sr",
-            "sesotho": "st",
-            "shona": "sn",
-            "sindhi": "sd",
-            "sinhala": "si",
-            "slovak": "sk",
-            "slovenian": "sl",
-            "somali": "so",
-            "spanish": "es",
-            "sundanese": "su",
-            "swahili": "sw",
-            "swedish": "sv",
-            "tajik": "tg",
-            "tamil": "ta",
-            "telugu": "te",
-            "thai": "th",
-            "turkish": "tr",
-            "ukrainian": "uk",
-            "urdu": "ur",
-            "uyghur": "ug",
-            "uzbek": "uz",
-            "vietnamese": "vi",
-            "welsh": "cy",
-            "xhosa": "xh",
-            "yiddish": "yi",
-            "yoruba": "yo",
-            "zulu": "zu",
-        }
+        return LANGUAGE_CODES
+
+    @property
+    def _language_index(self) -> LanguageIndex:
+        """
+        The precomputed language lookups of the translator, built once per class.
+        """
+        # Look in the class' own `__dict__`, so that subclasses get their own index
+        index = type(self).__dict__.get("_cached_language_index")
+        if index is None:
+            index = LanguageIndex(self.supported_languages, getattr(self, "_language_fixes", None))
+            type(self)._cached_language_index = index
+        return index
 
     @abstractproperty
     def supported_languages(self) -> list[str]:
@@ -216,39 +846,51 @@ class BaseTranslator(ABC):
         """
         return self._codes.keys()
 
-    def get_language(self, language: str) -> LanguageSearch:
+    def get_language(self, language: str, top_k: int = None) -> LanguageSearch:
         """
         Given a `language` name searches for the most similar
         language of the **supported languages**, of the concrete `Translator`.
 
         Uses the `Levenshtein` distance for finding the closest match.
+        The searches are indexed and remembered, so repeated queries are cheap.
 
         Parameters
         ----------
         language: str
-            The language name.
+            The language name (or code).
+        top_k: int, optional
+            If given, returns the `top_k` closest matches instead of only the closest one.
 
         Returns
         -------
         LanguageSearch
             A `LanguageSearch` object populated with the closest match.
+            If `top_k` is given, a list of `LanguageSearch`, sorted from the closest match.
         """
+        index = self._language_index
+
         # First check if already a language code (instead of a name)
-        if language in self._codes.values():
-            return language
+        if language in index.code_to_name:
+            result = LanguageSearch(
+                input=language,
+                name=index.code_to_name[language],
+                code=language,
+                similarity=1.0,
+            )
+            return result if top_k is None else [result]
 
-        # Otherwise find the languag with highest Levenshein similarity ratio,
+        # Otherwise find the languages with highest Levenshein similarity ratio,
         # inside the Translator supported languages
-        matching_key = max(
-            self.supported_languages, key=lambda k: Levenshtein.ratio(language, k)
-        )
-        # Return a Language object
-        return LanguageSearch(
-            input=language,
-            name=matching_key,
-            code=self._codes[matching_key],
-            similarity=round(Levenshtein.ratio(language, matching_key), 2),
-        )
+        results = [
+            LanguageSearch(
+                input=language,
+                name=name,
+                code=index.name_to_code[name],
+                similarity=round(similarity, 2),
+            )
+            for name, similarity in index.search(language, top_k or 1)
+        ]
+        return results[0] if top_k is None else results
 
     def _validate_and_fix_lang(self, language) -> str:
 
@@ -258,27 +900,19 @@ class BaseTranslator(ABC):
             # If so extract the real language code
             language = language.code
 
+        index = self._language_index
+
         # Then check if languages codes are valid codes
-        if not language in self._codes.values():
+        if language not in index.code_to_name:
             raise UnknownLanguage(f"Unknown language code '{language}'")
 
         # Then check if languages codes correspond
-        # to valid supported languages of translator
-
-        # 1. Get the name of language corresponding to the code
-        lang_name = get_key(self._codes, language)
-
-        # 2. Check if the name is in supported languages, except 'auto'
-        if not lang_name in self.supported_languages and language != "auto":
-            # Check if we are dealing with `source_language`, and
-            # it's value is 'auto'. In this case we allow it
+        # to valid supported languages of translator ('auto' is always supported),
+        # and apply the language patching: the codes are transformed
+        # so they are compatible with the API that the concrete Translator uses
+        try:
+            return index.service_codes[language]
+        except KeyError:
             raise UnknownLanguage(
                 f"The language code '{language}' does not match with any supported language of the {str(self)} Translator. Please check supported languages with `.supported_languages`."
-            )
-
-        # Now we check if must apply language patching.
-        # This means transforming the language codes
-        # so they are compatible with the API that the
-        # concrete Translator uses
-        fixing_method = getattr(self, "_language_fixes", None)
-        return fixing_method(language) if fixing_method else language
+            ) from None
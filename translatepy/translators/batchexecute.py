@@ -0,0 +1,409 @@
+"""
+Google Translate through the `batchexecute` endpoint of its web interface,
+which accepts many translation RPCs in a single request.
+
+https://kovatch.medium.com/deciphering-google-batchexecute-74991e4e446c
+"""
+from itertools import count
+from json import JSONDecodeError, JSONDecoder, dumps, loads
+from random import randint
+from threading import Lock
+from time import monotonic
+
+from translatepy.utils.hooks import tracing
+from translatepy.utils.metrics import METRICS
+from translatepy.utils.utils import concurrent_map
+
+from .google import BaseGoogleTranslator
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.104 Safari/537.36",
+    "Content-Type": "application/x-www-form-urlencoded;charset=utf-8",
+}
+
+# The id of the translation RPC
+RPC_ID = "MkEWBc"
+# The prefix protecting the responses from being run as JavaScript
+RESPONSE_PREFIX = ")]}'"
+# The number of seconds the WIZ globals (session id, build label...) are reused for
+WIZ_TTL = 3600
+# The page of the web interface holding the WIZ globals
+WIZ_URL = "https://translate.google.com/"
+
+
+class BatchExecuteParser:
+    """
+    A parser of the chunked `batchexecute` responses (`rt=c`).
+
+    A response looks like:
+
+        )]}'
+
+        123
+        [["wrb.fr","MkEWBc","<json payload>",null,null,null,"1"]]
+        25
+        [["e",4,null,null,187]]
+
+    `feed` returns the `wrb.fr` frames (the RPC results) which have been completely received,
+    and keeps the rest for the next call. The translator feeds it the complete response:
+    the results of a request are all returned once the whole response has been read.
+    """
+
+    _decoder = JSONDecoder()
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._started = False
+        # Whether a new line arrived since the last incomplete envelope:
+        # envelopes end with a new line, so it's not worth trying to decode them before
+        self._complete = False
+
+    def feed(self, data: str) -> list:
+        """
+        Adds `data` to the received data, and returns the new `wrb.fr` frames.
+        """
+        self._buffer += data
+        if "\n" in data:
+            self._complete = True
+        frames = []
+        while self._complete:
+            envelope = self._next_envelope()
+            if envelope is None:
+                break
+            frames.extend(
+                item for item in envelope if isinstance(item, list) and item[:1] == ["wrb.fr"]
+            )
+        return frames
+
+    def close(self) -> None:
+        """
+        Checks that the response was complete.
+        """
+        self._complete = True
+        if self._next_envelope() is not None or self._buffer.strip():
+            raise ValueError("Incomplete batchexecute response: {!r}".format(self._buffer[:100]))
+
+    def _next_envelope(self):
+        """
+        Removes the next envelope (the list of frames) from the buffer and returns it,
+        or returns `None` if it hasn't been completely received.
+        """
+        buffer = self._buffer.lstrip()
+        if not self._started:
+            if len(buffer) < len(RESPONSE_PREFIX):
+                return None
+            if buffer.startswith(RESPONSE_PREFIX):
+                buffer = buffer[len(RESPONSE_PREFIX) :].lstrip()
+            self._started = True
+        # Skip the length line: the length isn't reliable (it is counted in UTF-16 code units)
+        length_end = 0
+        while length_end < len(buffer) and buffer[length_end].isdigit():
+            length_end += 1
+        buffer = buffer[length_end:].lstrip()
+        self._buffer = buffer
+        if not buffer:
+            return None
+        try:
+            envelope, end = self._decoder.raw_decode(buffer)
+        except JSONDecodeError:
+            # Wait for more data
+            self._complete = False
+            return None
+        self._buffer = buffer[end:]
+        return envelope
+
+
+class GoogleBatchExecuteTranslator(BaseGoogleTranslator):
+    """
+    Google Translation Implementation using the `batchexecute` endpoint of translate.google.com.
+
+    Multiple texts are translated in a single request, each one being a separate RPC.
+    """
+
+    # The texts are sent in the body of the requests: the limit is on their number of characters
+    _max_text_length = 1800
+    # The maximum number of texts sent in a single request by `translate_batch`
+    # (their total length being limited by `_max_text_length` too)
+    _max_batch_size = 20
+
+    # The WIZ globals of the web interface, shared by all the instances
+    _wiz = None
+    _wiz_expiration = 0.0
+    _wiz_lock = Lock()
+
+    # The request ids must increase from one request to the next
+    _request_ids = count(randint(1000, 9999), 100000)
+
+    def _text_length(self, text: str) -> int:
+        return len(text)
+
+    def _translate(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        translation = self._translate_group([text], destination_language, source_language)[0]
+        if isinstance(translation, Exception):
+            raise translation
+        return translation
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        wiz = await self._get_wiz_async()
+
+        # Make the API request
+        response = await self.async_session.post(
+            self._request_url(wiz),
+            params=self._request_params(wiz),
+            data=self._request_data([text], destination_language, source_language),
+            headers=HEADERS,
+        )
+        # Raise error if not sucess
+        self._raise_for_status(response)
+
+        # Extract the translation
+        parser = BatchExecuteParser()
+        frames = parser.feed(response.text)
+        parser.close()
+        translation = self._extract_translations(frames, 1)[0]
+        if isinstance(translation, Exception):
+            raise translation
+        return translation
+
+    def _translate_batch(
+        self, texts: list[str], destination_language: str, source_language: str, workers: int
+    ) -> list:
+        # Each group of texts is translated in a single request
+        groups = self._batch_groups(texts)
+
+        results = []
+        translations = concurrent_map(
+            lambda group: self._limited_translate_group(group, destination_language, source_language),
+            groups,
+            workers,
+        )
+        for group, group_translations in zip(groups, translations):
+            if isinstance(group_translations, Exception):
+                # The whole request failed
+                results.extend([group_translations] * len(group))
+            else:
+                results.extend(group_translations)
+        return results
+
+    def _translate_multi(
+        self, text: str, destination_languages: list[str], source_language: str, workers: int
+    ) -> list:
+        if self._is_long(text):
+            return super()._translate_multi(text, destination_languages, source_language, workers)
+
+        # Each RPC of a request can have its own destination language:
+        # each group of destinations is translated in a single request
+        groups = []
+        for group in self._batch_groups([text] * len(destination_languages)):
+            start = sum(len(destinations) for destinations in groups)
+            groups.append(destination_languages[start : start + len(group)])
+        results = []
+        translations = concurrent_map(
+            lambda group: self._limited_translate_group([text] * len(group), group, source_language),
+            groups,
+            workers,
+        )
+        for group, group_translations in zip(groups, translations):
+            if isinstance(group_translations, Exception):
+                results.extend([group_translations] * len(group))
+            else:
+                results.extend(group_translations)
+        return results
+
+    def _limited_translate_group(self, texts: list[str], destination_language, source_language: str) -> list:
+        """
+        Calls `_translate_group`, through the rate limiter
+        """
+        if METRICS.enabled or tracing():
+            return self.rate_limiter.call(
+                self._measured_call,
+                self._translate_group,
+                texts,
+                destination_language,
+                source_language,
+                characters=sum(len(text) for text in texts),
+                on_retry=self._on_retry,
+            )
+        return self.rate_limiter.call(
+            self._translate_group,
+            texts,
+            destination_language,
+            source_language,
+            characters=sum(len(text) for text in texts),
+        )
+
+    def _translate_group(
+        self, texts: list[str], destination_language, source_language: str
+    ) -> list:
+        """
+        Translates `texts` in a single request, and returns, for each text,
+        its translation (str) or the exception that occurred.
+
+        `destination_language` can also be a list, with the destination language of each text.
+        """
+        wiz = self._get_wiz()
+
+        # Make the API request
+        response = self.session.post(
+            self._request_url(wiz),
+            params=self._request_params(wiz),
+            data=self._request_data(texts, destination_language, source_language),
+            headers=HEADERS,
+        )
+        # Raise error if not sucess
+        self._raise_for_status(response)
+
+        # Extract the translations
+        parser = BatchExecuteParser()
+        frames = parser.feed(response.text)
+        parser.close()
+        return self._extract_translations(frames, len(texts))
+
+    def _get_wiz(self) -> dict:
+        """
+        Returns the WIZ globals of the web interface, reloading them when they expire
+        """
+        cls = GoogleBatchExecuteTranslator
+        if cls._wiz is None or monotonic() >= cls._wiz_expiration:
+            with cls._wiz_lock:
+                # Check again, another thread might have reloaded them in the meantime
+                if cls._wiz is None or monotonic() >= cls._wiz_expiration:
+                    cls._wiz = self._load_wiz()
+                    cls._wiz_expiration = monotonic() + WIZ_TTL
+        return cls._wiz
+
+    async def _get_wiz_async(self) -> dict:
+        """
+        Returns the WIZ globals like `_get_wiz`, reloading them with `async_session` without blocking the event loop
+        """
+        cls = GoogleBatchExecuteTranslator
+        wiz = cls._wiz
+        if wiz is None or monotonic() >= cls._wiz_expiration:
+            # Concurrent coroutines might all reload them: they all get valid globals
+            response = await self.async_session.get(WIZ_URL, headers={"User-Agent": HEADERS["User-Agent"]})
+            response.raise_for_status()
+            wiz = self._parse_wiz(response.text)
+            cls._wiz = wiz
+            cls._wiz_expiration = monotonic() + WIZ_TTL
+        return wiz
+
+    def _load_wiz(self) -> dict:
+        """
+        Scrapes the WIZ globals from the web interface
+        """
+        response = self.session.get(WIZ_URL, headers={"User-Agent": HEADERS["User-Agent"]})
+        response.raise_for_status()
+        return self._parse_wiz(response.text)
+
+    def _parse_wiz(self, page: str) -> dict:
+        """
+        Extracts the WIZ globals from the page of the web interface
+        """
+        start = page.find("window.WIZ_global_data = ")
+        if start < 0:
+            raise ValueError("Could not find the WIZ globals of Google Translate")
+        wiz, _ = JSONDecoder().raw_decode(page, start + len("window.WIZ_global_data = "))
+        return {
+            "ui_path": wiz.get("qwAQke") or "TranslateWebserverUi",
+            "f.sid": wiz.get("FdrFJe"),
+            "bl": wiz.get("cfb2h"),
+        }
+
+    def _raise_for_status(self, response) -> None:
+        """
+        Raises an error if the request failed, forgetting the WIZ globals if they were rejected
+        """
+        if response.status_code in (400, 401):
+            # The session id or the build label might have expired
+            GoogleBatchExecuteTranslator._wiz = None
+        response.raise_for_status()
+
+    def _request_url(self, wiz: dict) -> str:
+        """
+        Returns the URL of the batchexecute endpoint
+        """
+        return "https://translate.google.com/_/" + wiz["ui_path"] + "/data/batchexecute"
+
+    def _request_params(self, wiz: dict) -> dict:
+        """
+        Returns the query parameters of the API request
+        """
+        return {
+            "rpcids": RPC_ID,
+            "f.sid": wiz["f.sid"],
+            "bl": wiz["bl"],
+            "hl": "en",
+            "_reqid": next(self._request_ids),
+            "rt": "c",
+        }
+
+    def _request_data(
+        self, texts: list[str], destination_language, source_language: str
+    ) -> dict:
+        """
+        Returns the form data of the API request, with one RPC per text.
+        The RPCs are identified by the position of their text, starting from 1.
+
+        `destination_language` can also be a list, with the destination language of each text.
+        """
+        if isinstance(destination_language, str):
+            destination_languages = [destination_language] * len(texts)
+        else:
+            destination_languages = destination_language
+        rpcs = [
+            [
+                RPC_ID,
+                dumps([[text, source_language, destination, True], [None]], separators=(",", ":")),
+                None,
+                str(index + 1),
+            ]
+            for index, (text, destination) in enumerate(zip(texts, destination_languages))
+        ]
+        return {"f.req": dumps([rpcs], separators=(",", ":"))}
+
+    def _extract_frame(self, frame: list, size: int) -> tuple:
+        """
+        Returns `(index, translation)` for a `wrb.fr` frame, the translation being an exception
+        if the RPC failed. The index is `None` if the frame doesn't belong to any text.
+        """
+        try:
+            # A single RPC can be identified as "generic"
+            identifier = frame[6] if len(frame) > 6 and frame[6] != "generic" else 1
+            index = int(identifier) - 1
+        except (TypeError, ValueError):
+            return None, None
+        if not 0 <= index < size:
+            return None, None
+        try:
+            return index, self._extract_translation(loads(frame[2]))
+        except Exception as exc:
+            return index, exc
+
+    def _extract_translations(self, frames: list, size: int) -> list:
+        """
+        Extracts the translation of each of the `size` texts from the `wrb.fr` frames
+        """
+        results = [
+            ValueError("Google didn't send the translation of the text {}".format(index))
+            for index in range(size)
+        ]
+        for frame in frames:
+            index, translation = self._extract_frame(frame, size)
+            if index is not None:
+                results[index] = translation
+        return results
+
+    def _extract_translation(self, data) -> str:
+        """
+        Extracts the translation from the payload of a RPC result
+        """
+        sentences = data[1][0][0]
+        # The sentences are separated by spaces unless the language doesn't use them
+        separator = " " if sentences[3] else ""
+        if sentences[5]:
+            return separator.join(part[0] for part in sentences[5])
+        return sentences[0]
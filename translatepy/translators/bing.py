@@ -1,12 +1,29 @@
-import requests
 from .base import BaseTranslator
 
+HEADERS = {
+    "Host": "www.bing.com",
+    "User-Agent": "Mozilla/5.0 (Windows NT 6.1; WOW64; rv:52.0) Gecko/20100101 Firefox/52.0",
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Referer": "https://www.bing.com/",
+    "Content-Type": "application/x-www-form-urlencoded",
+    "Connection": "keep-alive",
+}
+
+PARAMS = {
+    "IG": "839D27F8277F4AA3B0EDB83C255D0D70",
+    "IID": "translator.5033.3",
+}
+
 
 class BingTranslator(BaseTranslator):
     """
     Microsoft Bing Translation's APIs Implementation
     """
 
+    _max_text_length = 1000
+
     @property
     def supported_languages(self) -> list[str]:
         """
@@ -20,34 +37,50 @@ class BingTranslator(BaseTranslator):
     ) -> str:
 
         # Make API request
-        response = requests.post(
+        response = self.session.post(
+            "https://www.bing.com/ttranslatev3",
+            headers=HEADERS,
+            params=PARAMS,
+            data=self._request_data(text, destination_language, source_language),
+        )
+        # Raise error if not successful
+        response.raise_for_status()
+        # Extract the translation
+        return self._extract_translation(response.json())
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+
+        # Make API request
+        response = await self.async_session.post(
             "https://www.bing.com/ttranslatev3",
-            headers={
-                "Host": "www.bing.com",
-                "User-Agent": "Mozilla/5.0 (Windows NT 6.1; WOW64; rv:52.0) Gecko/20100101 Firefox/52.0",
-                "Accept": "*/*",
-                "Accept-Language": "en-US,en;q=0.5",
-                "Accept-Encoding": "gzip, deflate",
-                "Referer": "https://www.bing.com/",
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Connection": "keep-alive",
-            },
-            params={
-                "IG": "839D27F8277F4AA3B0EDB83C255D0D70",
-                "IID": "translator.5033.3",
-            },
-            data={
-                "text": str(text),
-                "fromLang": source_language,
-                "to": destination_language,
-            },
+            headers=HEADERS,
+            params=PARAMS,
+            data=self._request_data(text, destination_language, source_language),
         )
         # Raise error if not successful
         response.raise_for_status()
         # Extract the translation
-        translation = response.json()[0]["translations"][0]["text"]
-        # Return the translation
-        return translation
+        return self._extract_translation(response.json())
+
+    def _request_data(
+        self, text: str, destination_language: str, source_language: str
+    ) -> dict:
+        """
+        Returns the form data of the API request
+        """
+        return {
+            "text": str(text),
+            "fromLang": source_language,
+            "to": destination_language,
+        }
+
+    def _extract_translation(self, data) -> str:
+        """
+        Extracts the translation from the API response
+        """
+        return data[0]["translations"][0]["text"]
 
     def _language_fixes(self, language: str) -> str:
         """
@@ -1,5 +1,8 @@
 from time import time
-import requests
+
+from translatepy.utils.hooks import tracing
+from translatepy.utils.metrics import METRICS
+from translatepy.utils.utils import concurrent_map
 
 from .base import BaseTranslator, Translation
 
@@ -9,12 +12,115 @@ class DeepLTranslator(BaseTranslator):
     A DeepL API Implementation
     """
 
+    _max_text_length = 5000
+    # The maximum number of texts sent in a single request by `translate_batch`
+    # (their total length being limited by `_max_text_length` too)
+    _max_batch_size = 25
+
     def _translate(
         self, text: str, destination_language: str, source_language: str
     ) -> str:
 
-        # Prepare the API payload
-        payload = {
+        # Make the API request
+        response = self.session.post(
+            "https://www2.deepl.com/jsonrpc",
+            json=self._request_payload([text], destination_language, source_language),
+        )
+
+        # Raise error if not sucess
+        response.raise_for_status()
+
+        # Extract the translation
+        return self._extract_translations(response.json())[0]
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+
+        # Make the API request
+        response = await self.async_session.post(
+            "https://www2.deepl.com/jsonrpc",
+            json=self._request_payload([text], destination_language, source_language),
+        )
+
+        # Raise error if not sucess
+        response.raise_for_status()
+
+        # Extract the translation
+        return self._extract_translations(response.json())[0]
+
+    def _translate_batch(
+        self, texts: list[str], destination_language: str, source_language: str, workers: int
+    ) -> list:
+        # DeepL handles multiple jobs in a single request,
+        # so we only need one request per group of texts
+        groups = self._batch_groups(texts)
+
+        results = []
+        translations = concurrent_map(
+            lambda group: self._limited_translate_group(group, destination_language, source_language),
+            groups,
+            workers,
+        )
+        for group, group_translations in zip(groups, translations):
+            if isinstance(group_translations, Exception):
+                # The whole group failed
+                results.extend([group_translations] * len(group))
+            else:
+                results.extend(group_translations)
+        return results
+
+    def _limited_translate_group(
+        self, texts: list[str], destination_language: str, source_language: str
+    ) -> list[str]:
+        """
+        Calls `_translate_group`, through the rate limiter
+        """
+        if METRICS.enabled or tracing():
+            return self.rate_limiter.call(
+                self._measured_call,
+                self._translate_group,
+                texts,
+                destination_language,
+                source_language,
+                characters=sum(len(text) for text in texts),
+                on_retry=self._on_retry,
+            )
+        return self.rate_limiter.call(
+            self._translate_group,
+            texts,
+            destination_language,
+            source_language,
+            characters=sum(len(text) for text in texts),
+        )
+
+    def _translate_group(
+        self, texts: list[str], destination_language: str, source_language: str
+    ) -> list[str]:
+        """
+        Translates `texts` in a single request
+        """
+        # Make the API request
+        response = self.session.post(
+            "https://www2.deepl.com/jsonrpc",
+            json=self._request_payload(texts, destination_language, source_language),
+        )
+        # Raise error if not sucess
+        response.raise_for_status()
+        # Extract the translations
+        translations = self._extract_translations(response.json())
+        if len(translations) != len(texts):
+            # The translations can't be matched with their texts
+            raise ValueError("DeepL sent {} translations for {} texts".format(len(translations), len(texts)))
+        return translations
+
+    def _request_payload(
+        self, texts: list[str], destination_language: str, source_language: str
+    ) -> dict:
+        """
+        Returns the JSON-RPC payload of the API request, with one job per text
+        """
+        return {
             "jsonrpc": "2.0",
             "method": "LMT_handle_jobs",
             "params": {
@@ -27,6 +133,7 @@ class DeepLTranslator(BaseTranslator):
                         "preferred_num_beams": 4,
                         "quality": "fast",
                     }
+                    for text in texts
                 ],
                 "lang": {
                     "user_preferred_langs": ["JA", "FR", "EN"],
@@ -39,23 +146,16 @@ class DeepLTranslator(BaseTranslator):
             },
             "id": 63710028,
         }
-        # Make the API request
-        response = requests.post(
-            "https://www2.deepl.com/jsonrpc",
-            json=payload,
-        )
-
-        # Raise error if not sucess
-        response.raise_for_status()
 
-        # Extract the translation
-        translation = response.json()["result"]["translations"][0]["beams"][0][
-            "postprocessed_sentence"
+    def _extract_translations(self, data) -> list[str]:
+        """
+        Extracts the translations of every job from the API response
+        """
+        return [
+            translation["beams"][0]["postprocessed_sentence"]
+            for translation in data["result"]["translations"]
         ]
 
-        # Return the translation
-        return translation
-
     @property
     def supported_languages(self) -> list[str]:
         """
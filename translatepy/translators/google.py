@@ -1,4 +1,4 @@
-import requests
+from urllib.parse import quote
 
 from .base import BaseTranslator, Translation
 
@@ -8,6 +8,14 @@ class BaseGoogleTranslator(BaseTranslator):
     Base abstract Google Translator
     """
 
+    # The text is sent in the URL, which can't be too long:
+    # the limit is on the length of the percent-encoded text (see `_text_length`)
+    _max_text_length = 2000
+
+    def _text_length(self, text: str) -> int:
+        # A non-ASCII character takes up to 12 characters once encoded
+        return len(quote(text))
+
     @property
     def supported_languages(self):
         return super().supported_languages
@@ -23,20 +31,47 @@ class GoogleTranslator(BaseGoogleTranslator):
     ) -> str:
 
         # Make API requests
-        response = requests.get(
+        response = self.session.get(
+            self._request_url(text, destination_language, source_language)
+        )
+        # Raise error if not sucess
+        response.raise_for_status()
+        # Extract translation
+        return self._extract_translation(response.json())
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+
+        # Make API requests
+        response = await self.async_session.get(
+            self._request_url(text, destination_language, source_language)
+        )
+        # Raise error if not sucess
+        response.raise_for_status()
+        # Extract translation
+        return self._extract_translation(response.json())
+
+    def _request_url(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Returns the URL of the API request
+        """
+        return (
             "https://translate.googleapis.com/translate_a/single?client=gtx&dt=t&sl="
             + str(source_language)
             + "&tl="
             + str(destination_language)
             + "&q="
-            + text
+            + quote(text)
         )
-        # Raise error if not sucess
-        response.raise_for_status()
-        # Extract translation
-        translation = "".join([sentence[0] for sentence in response.json()[0]])
-        # Return the translation
-        return translation
+
+    def _extract_translation(self, data) -> str:
+        """
+        Extracts the translation from the API response
+        """
+        return "".join([sentence[0] for sentence in data[0]])
 
 
 class GoogleV2Translator(BaseGoogleTranslator):
@@ -49,20 +84,46 @@ class GoogleV2Translator(BaseGoogleTranslator):
         self, text: str, destination_language: str, source_language: str
     ) -> str:
         # Make API request
-        response = requests.get(
+        response = self.session.get(
+            self._request_url(text, destination_language, source_language)
+        )
+        # Raise error if not sucess
+        response.raise_for_status()
+        # Extract translation
+        return self._extract_translation(response.json())
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        # Make API request
+        response = await self.async_session.get(
+            self._request_url(text, destination_language, source_language)
+        )
+        # Raise error if not sucess
+        response.raise_for_status()
+        # Extract translation
+        return self._extract_translation(response.json())
+
+    def _request_url(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Returns the URL of the API request
+        """
+        return (
             "https://clients5.google.com/translate_a/t?client=dict-chrome-ex&sl="
             + str(source_language)
             + "&tl="
             + str(destination_language)
             + "&q="
-            + text,
+            + quote(text)
         )
-        # Raise error if not sucess
-        response.raise_for_status()
-        # Extract translation
-        translation = "".join(
+
+    def _extract_translation(self, data) -> str:
+        """
+        Extracts the translation from the API response
+        """
+        return "".join(
             (sentence["trans"] if "trans" in sentence else "")
-            for sentence in response.json()["sentences"]
+            for sentence in data["sentences"]
         )
-        # Return the translation
-        return translation
@@ -0,0 +1,96 @@
+"""
+The registry of the translators, which are only imported when first used.
+
+Other packages can provide translators with the `translatepy.translators` entry point group,
+for example in their `setup.py`:
+
+    entry_points={"translatepy.translators": ["MyService = my_package.my_module:MyServiceTranslator"]}
+"""
+from importlib import import_module
+from threading import Lock
+
+from translatepy.exceptions import UnknownTranslator
+
+# The entry point group of the translators provided by other packages
+ENTRY_POINT_GROUP = "translatepy.translators"
+
+# The built-in translators: class name -> module (relative to `translatepy.translators`)
+BUILTIN_TRANSLATORS = {
+    "GoogleTranslator": ".google",
+    "GoogleV2Translator": ".google",
+    "GoogleBatchExecuteTranslator": ".batchexecute",
+    "BingTranslator": ".bing",
+    "DeepLTranslator": ".deepl",
+    "ReversoTranslator": ".reverso",
+    "YandexTranslator": ".yandex",
+    "Translator": ".translator",
+}
+
+
+def normalize_name(name: str) -> str:
+    """
+    Returns the lookup key of a translator name: 'GoogleTranslator', 'Google' and 'google' are the same translator.
+    """
+    name = name.strip().lower()
+    if name.endswith("translator") and name != "translator":
+        name = name[: -len("translator")]
+    return name
+
+
+# normalized name -> class name
+_builtin_names = {normalize_name(class_name): class_name for class_name in BUILTIN_TRANSLATORS}
+
+_plugins = None
+_plugins_lock = Lock()
+
+
+def load_builtin(class_name: str):
+    """
+    Imports and returns the built-in translator class `class_name`.
+    """
+    return getattr(import_module(BUILTIN_TRANSLATORS[class_name], __package__), class_name)
+
+
+def plugins() -> dict:
+    """
+    Returns the translators provided by other packages, as a mapping of name -> entry point (not loaded yet).
+    """
+    global _plugins
+    if _plugins is None:
+        with _plugins_lock:
+            if _plugins is None:
+                from importlib.metadata import entry_points
+
+                try:
+                    found = entry_points(group=ENTRY_POINT_GROUP)
+                except TypeError:
+                    # Python < 3.10
+                    found = entry_points().get(ENTRY_POINT_GROUP, [])
+                _plugins = {entry_point.name: entry_point for entry_point in found}
+    return _plugins
+
+
+def get_translator(name: str):
+    """
+    Returns the translator class named `name` (like 'Google', 'google' or 'GoogleTranslator'),
+    importing it on first use.
+
+    The built-in translators come first, then the ones provided by other packages.
+    Raises `UnknownTranslator` if no translator has this name.
+    """
+    key = normalize_name(name)
+    class_name = _builtin_names.get(key)
+    if class_name is not None:
+        return load_builtin(class_name)
+    for plugin_name, entry_point in plugins().items():
+        if normalize_name(plugin_name) == key:
+            return entry_point.load()
+    raise UnknownTranslator("Unknown translator '{}'".format(name))
+
+
+def available_translators() -> list[str]:
+    """
+    Returns the names of all the translators, without importing them.
+    """
+    names = [class_name[: -len("Translator")] or class_name for class_name in BUILTIN_TRANSLATORS]
+    return names + [name for name in plugins() if normalize_name(name) not in _builtin_names]
@@ -1,10 +1,30 @@
-import requests
+from hashlib import sha1
 
 from translatepy.translators.base import (
     BaseTranslator,
 )
 from translatepy.exceptions import TranslationError
 from translatepy.models import Language
+from translatepy.utils.cache import LRUCache
+
+# The language codes used by Reverso
+LANGUAGE_CODES = {
+    "de": "ger",  # German
+    "ar": "arab",  # Arabic
+    "zh-CN": "chi",  # Chinese
+    "es": "spa",  # Spanish
+    "fr": "fra",  # French
+    "iw": "heb",  # Hebrew
+    "nl": "dut",  # Dutch
+    "en": "eng",  # English
+    "it": "ita",  # Italian
+    "ja": "jpn",  # Japanese
+    "pl": "pol",  # Polish
+    "pt": "por",  # Portuguese
+    "ro": "rum",  # Romanian
+    "ru": "rus",  # Russian
+    "tr": "tur",  # Turkish
+}
 
 
 class ReversoTranslator(BaseTranslator):
@@ -12,37 +32,132 @@ class ReversoTranslator(BaseTranslator):
     Reverso Translation Implementation
     """
 
+    _max_text_length = 2000
+
+    # The detected languages are remembered in `detection_cache`
+    _remembers_detection = True
+
+    # The languages detected by Reverso, keyed by the hash of the texts,
+    # so that the texts translated again don't need to be detected
+    detection_cache = LRUCache(max_size=1024 * 1024, max_entries=10000)
+    # The language of the last detected text, used as a guess for the next ones
+    _last_detected_language = "eng"
+
     def _translate(
         self, text: str, destination_language: str, source_language: str
     ) -> str:
 
         # Check if source language is 'auto'
-        # If so use the Reverso API to detect the language first
+        # If so, guess it, and let Reverso detect the language in the same request
         if source_language == "auto":
-            source_language = self.detect_language(text)
+            source_language, detected = self._guess_source_language(text, destination_language)
+            data = self._request(text, destination_language, source_language)
+            if not detected:
+                detected_language = self._read_detection(text, data)
+                if detected_language not in (None, source_language):
+                    # The guess was wrong: translate again from the detected language
+                    data = self._request(text, destination_language, detected_language)
+        else:
+            data = self._request(text, destination_language, source_language)
 
-        # Make the API request
-        response = requests.post(
+        # Extract translation
+        return data["translation"][0]
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+
+        # Check if source language is 'auto'
+        # If so, guess it, and let Reverso detect the language in the same request
+        if source_language == "auto":
+            source_language, detected = self._guess_source_language(text, destination_language)
+            data = await self._request_async(text, destination_language, source_language)
+            if not detected:
+                detected_language = self._read_detection(text, data)
+                if detected_language not in (None, source_language):
+                    # The guess was wrong: translate again from the detected language
+                    data = await self._request_async(text, destination_language, detected_language)
+        else:
+            data = await self._request_async(text, destination_language, source_language)
+
+        # Extract translation
+        return data["translation"][0]
+
+    def _request(self, text: str, destination_language: str, source_language: str) -> dict:
+        """
+        Makes the API request, and returns its JSON response
+        """
+        response = self.session.post(
             "https://api.reverso.net/translate/v1/translation",
-            json={
-                "format": "text",
-                "from": source_language,
-                "to": destination_language,
-                "input": text,
-                "options": {
-                    "origin": "reversodesktop",
-                    "sentenceSplitter": False,
-                    "contextResults": False,
-                    "languageDetection": True,
-                },
-            },
+            json=self._request_payload(text, destination_language, source_language),
         )
         # Raise error if not sucess
         response.raise_for_status()
-        # Extract translation
-        translation = response.json()["translation"][0]
-        # Return the translation
-        return translation
+        return response.json()
+
+    async def _request_async(self, text: str, destination_language: str, source_language: str) -> dict:
+        """
+        Asynchronous version of `_request`
+        """
+        response = await self.async_session.post(
+            "https://api.reverso.net/translate/v1/translation",
+            json=self._request_payload(text, destination_language, source_language),
+        )
+        # Raise error if not sucess
+        response.raise_for_status()
+        return response.json()
+
+    def _detection_key(self, text: str) -> bytes:
+        return sha1(text.encode("utf-8", "surrogatepass")).digest()
+
+    def _guess_source_language(self, text: str, destination_language: str) -> tuple:
+        """
+        Returns the language `text` is most likely written in, and whether it has already been detected.
+
+        Texts which haven't been detected yet are guessed to be in the language of the last detected text.
+        """
+        if self.detection_cache is not None:
+            detected_language = self.detection_cache.get(self._detection_key(text))
+            if detected_language is not None:
+                return detected_language, True
+        guess = self._last_detected_language
+        if guess == destination_language:
+            # Reverso doesn't translate a language to itself
+            guess = "fra" if guess == "eng" else "eng"
+        return guess, False
+
+    def _read_detection(self, text: str, data: dict) -> str:
+        """
+        Returns (and remembers) the language detected by Reverso in its response, if any
+        """
+        try:
+            detected_language = data["languageDetection"]["detectedLanguage"]
+        except (KeyError, TypeError):
+            return None
+        if detected_language in LANGUAGE_CODES.values():
+            self._last_detected_language = detected_language
+        if self.detection_cache is not None:
+            self.detection_cache.set(self._detection_key(text), detected_language)
+        return detected_language
+
+    def _request_payload(
+        self, text: str, destination_language: str, source_language: str
+    ) -> dict:
+        """
+        Returns the JSON payload of the API request
+        """
+        return {
+            "format": "text",
+            "from": source_language,
+            "to": destination_language,
+            "input": str(text),
+            "options": {
+                "origin": "reversodesktop",
+                "sentenceSplitter": False,
+                "contextResults": False,
+                "languageDetection": True,
+            },
+        }
 
     @property
     def supported_languages(self):
@@ -77,24 +192,28 @@ class ReversoTranslator(BaseTranslator):
             str --> the language code
             None --> when an error occurs
         """
+        if self.detection_cache is not None:
+            detected_language = self.detection_cache.get(self._detection_key(text))
+            if detected_language is not None:
+                return detected_language
+        try:
+            detected_language = self._read_detection(text, self._request(text, "fra", "eng"))
+        except Exception as ex:
+            raise TranslationError from ex
+
+        return detected_language
+
+    async def detect_language_async(self, text: str) -> Language:
+        """
+        Asynchronous version of `detect_language`
+        """
+        if self.detection_cache is not None:
+            detected_language = self.detection_cache.get(self._detection_key(text))
+            if detected_language is not None:
+                return detected_language
         try:
-            response = requests.post(
-                "https://api.reverso.net/translate/v1/translation",
-                json={
-                    "input": str(text),
-                    "from": "eng",
-                    "to": "fra",
-                    "format": "text",
-                    "options": {
-                        "origin": "reversodesktop",
-                        "sentenceSplitter": False,
-                        "contextResults": False,
-                        "languageDetection": True,
-                    },
-                },
-            )
-            response.raise_for_status()
-            detected_language = response.json()["languageDetection"]["detectedLanguage"]
+            data = await self._request_async(text, "fra", "eng")
+            detected_language = self._read_detection(text, data)
         except Exception as ex:
             raise TranslationError from ex
 
@@ -108,50 +227,8 @@ class ReversoTranslator(BaseTranslator):
         if language == "auto":
             return language
         # Now check for all the Reverso languages
-        # German
-        if language == "de":
-            return "ger"
-        # Arabic
-        if language == "ar":
-            return "arab"
-        # Chinese
-        if language == "ch":
-            return "chi"
-        # Spanish
-        if language == "es":
-            return "spa"
-        # French
-        if language == "fr":
-            return "fra"
-        # Hebrew
-        if language == "iw":
-            return "heb"
-        # Dutch
-        if language == "nl":
-            return "dut"
-        # English
-        if language == "en":
-            return "eng"
-        # Italian
-        if language == "it":
-            return "ita"
-        # Japanase
-        if language == "ja":
-            return "jpn"
-        # Polish
-        if language == "pl":
-            return "pol"
-        # Portuguese
-        if language == "pt":
-            return "por"
-        # Romanian
-        if language == "ro":
-            return "rum"
-        # Russian
-        if language == "ru":
-            return "rus"
-        # Turkish
-        if language == "tr":
-            return "tur"
-        # If got here, raise Error
-        raise ValueError(language)
\ No newline at end of file
+        try:
+            return LANGUAGE_CODES[language]
+        except KeyError:
+            # If got here, raise Error
+            raise ValueError(language) from None
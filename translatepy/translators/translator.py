@@ -1,9 +1,59 @@
+from contextvars import copy_context
+from threading import Thread
+from time import perf_counter
+
+from translatepy.exceptions import ServiceUnavailable, TranslationError, UnknownLanguage
+from translatepy.utils.health import OPEN, ServiceHealth
+from translatepy.utils.metrics import METRICS, record_fallback
+from translatepy.utils.utils import percentile
+
 from .base import BaseTranslator
-from .google import GoogleTranslator, GoogleV2Translator
-from .bing import BingTranslator
-from .deepl import DeepLTranslator
-from .reverso import ReversoTranslator
-from .yandex import YandexTranslator
+from .registry import get_translator
+
+# Tries the translators one after another
+SEQUENTIAL = "sequential"
+# Fires all the translators at once, and takes the first success
+RACE = "race"
+# Launches the next translator when the current one is slower than usual (or failed)
+HEDGE = "hedge"
+
+# The number of latencies needed before using the observed percentile to hedge
+MIN_LATENCY_SAMPLES = 10
+
+# The translators used by default, imported on first use
+DEFAULT_TRANSLATORS = (
+    "Google",
+    "GoogleV2",
+    "Bing",
+    "DeepL",
+    "Reverso",
+    # "Yandex",
+)
+
+
+def _start(function, *args) -> "Future":
+    """
+    Calls `function(*args)` in a new thread, and returns the `Future` of its result.
+
+    The `race` and `hedge` strategies don't wait for the requests they ignore: with a thread
+    per request (instead of a bounded pool), those requests never delay the next calls.
+    """
+    from concurrent.futures import Future
+
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = function(*args)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    Thread(target=run, name="translatepy", daemon=True).start()
+    return future
 
 
 class Translator(BaseTranslator):
@@ -20,14 +70,14 @@ class Translator(BaseTranslator):
 
     def __init__(
         self,
-        translators: list[BaseTranslator] = [
-            GoogleTranslator,
-            GoogleV2Translator,
-            BingTranslator,
-            DeepLTranslator,
-            ReversoTranslator,
-            # YandexTranslator,
-        ],
+        translators: list[BaseTranslator] = DEFAULT_TRANSLATORS,
+        strategy: str = SEQUENTIAL,
+        hedge_delay: float = 1.0,
+        hedge_percentile: float = 95,
+        reorder: bool = True,
+        health_window: int = 50,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
     ) -> None:
         """
         Initializes a generic `Translator`.
@@ -35,20 +85,395 @@ class Translator(BaseTranslator):
         Parameters
         ----------
         translators: list of Translators
-            A list of Translators classes to sequentially try to execute (stops on the first sucess)
+            A list of Translators classes (or instances, or names like 'Google') to try to execute
+            (stops on the first sucess). The instances are kept and reused for all the translations.
+        strategy: str, optional, default='sequential'
+            How the translators are tried:
+                - `sequential`: one after another, in order.
+                - `race`: all at once, the first success wins and the other requests are ignored.
+                - `hedge`: in order, but the next translator is launched as soon as the current one
+                  fails or takes longer than its usual latency (see `hedge_percentile`).
+        hedge_delay: float, optional
+            With the `hedge` strategy, the number of seconds to wait before launching the next
+            translator, while not enough latencies have been observed for the current one.
+        hedge_percentile: float, optional
+            With the `hedge` strategy, the percentile of the observed latencies of the
+            current translator after which the next translator is launched.
+        reorder: bool, optional
+            Whether to try the healthiest translators first (highest success rate, then lowest latency),
+            instead of following the order of `translators`.
+        health_window: int, optional
+            The number of recent requests used to compute the health of each translator.
+        failure_threshold: int, optional
+            The number of consecutive failures after which a translator is not tried anymore,
+            until `recovery_time` seconds passed and a probe request succeeds (circuit breaker).
+        recovery_time: float, optional
+            The number of seconds before a failing translator is probed again.
         """
-        self.translators = translators
+        if strategy not in (SEQUENTIAL, RACE, HEDGE):
+            raise ValueError("Unknown strategy '{}'".format(strategy))
+        self.translators = []
+        for translator in translators:
+            if isinstance(translator, str):
+                translator = get_translator(translator)
+            self.translators.append(translator() if isinstance(translator, type) else translator)
+        self.strategy = strategy
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.reorder = reorder
+        self.health = {
+            translator: ServiceHealth(health_window, failure_threshold, recovery_time)
+            for translator in self.translators
+        }
 
     def _translate(
         self, text: str, destination_language: str, source_language: str
     ) -> str:
+        if self.strategy in (RACE, HEDGE):
+            return self._translate_concurrently(
+                text, destination_language, source_language, hedge=self.strategy == HEDGE
+            )
+
+        # Iterate over each translator to try to translate
+        errors = []
+        for translator in self._route(destination_language, source_language):
+            try:
+                return self._translate_with(
+                    translator, text, destination_language, source_language
+                )
+            except Exception as exc:
+                # If an error ocurred, move to the next translator
+                errors.append(exc)
+                if METRICS.enabled:
+                    record_fallback(str(translator))
+                continue
+        raise self._all_failed(destination_language, source_language, errors)
+
+    async def _translate_async(
+        self, text: str, destination_language: str, source_language: str
+    ) -> str:
+        if self.strategy in (RACE, HEDGE):
+            return await self._translate_concurrently_async(
+                text, destination_language, source_language, hedge=self.strategy == HEDGE
+            )
+
         # Iterate over each translator to try to translate
-        for translator_class in self.translators:
+        errors = []
+        for translator in self._route(destination_language, source_language):
             try:
-                # Intantiate translator, and try to translate
-                return translator_class()._translate(
-                    text, destination_language, source_language
+                # Try to translate without blocking
+                return await self._translate_with_async(
+                    translator, text, destination_language, source_language
                 )
-            except Exception:
+            except Exception as exc:
                 # If an error ocurred, move to the next translator
-                continue
\ No newline at end of file
+                errors.append(exc)
+                if METRICS.enabled:
+                    record_fallback(str(translator))
+                continue
+        raise self._all_failed(destination_language, source_language, errors)
+
+    def _translate_multi(
+        self, text: str, destination_languages: list[str], source_language: str, workers: int
+    ) -> list:
+        if self.strategy != SEQUENTIAL:
+            return super()._translate_multi(text, destination_languages, source_language, workers)
+
+        # Each translator gets all the remaining destinations it supports at once,
+        # so that the services translating to multiple languages in a single request can do it
+        results = [None] * len(destination_languages)
+        pending = list(range(len(destination_languages)))
+        tried = set()
+        while pending:
+            route = [
+                translator
+                for translator in self._route(destination_languages[pending[0]], source_language)
+                if translator not in tried
+            ]
+            if not route:
+                # No translator left for this destination
+                index = pending.pop(0)
+                if results[index] is None:
+                    # None of them was tried
+                    results[index] = self._unroutable(destination_languages[index], source_language)
+                continue
+            translator = route[0]
+            tried.add(translator)
+            indices = [
+                index
+                for index in pending
+                if destination_languages[index] in translator._language_index.supported_codes
+            ]
+            translations = self._translate_multi_with(
+                translator, text, [destination_languages[index] for index in indices], source_language, workers
+            )
+            failed = False
+            for index, translation in zip(indices, translations):
+                results[index] = translation
+                if isinstance(translation, Exception):
+                    failed = True
+                else:
+                    pending.remove(index)
+            if failed and METRICS.enabled:
+                record_fallback(str(translator))
+        return results
+
+    def _unroutable(self, destination_language: str, source_language: str) -> Exception:
+        """
+        Returns the error of a destination which no translator can be tried for
+        """
+        if any(
+            destination_language in translator._language_index.supported_codes
+            and source_language in translator._language_index.supported_codes
+            for translator in self.translators
+        ):
+            return ServiceUnavailable(
+                "The circuit breakers of all the translators to '{}' are open".format(destination_language)
+            )
+        return UnknownLanguage(
+            "No translator can translate from '{}' to '{}'".format(source_language, destination_language)
+        )
+
+    def _all_failed(self, destination_language: str, source_language: str, errors: list) -> Exception:
+        """
+        Returns the error of a translation which no translator made, `errors` being the ones of the translators tried
+        """
+        if not errors:
+            return self._unroutable(destination_language, source_language)
+        if all(isinstance(error, ServiceUnavailable) for error in errors):
+            error = ServiceUnavailable(
+                "The circuit breakers of all the translators to '{}' are open".format(destination_language)
+            )
+        else:
+            error = TranslationError("All the translators failed to translate to '{}'".format(destination_language))
+        error.__cause__ = errors[-1]
+        return error
+
+    def _translate_multi_with(
+        self,
+        translator: BaseTranslator,
+        text: str,
+        destination_languages: list[str],
+        source_language: str,
+        workers: int,
+    ) -> list:
+        """
+        Translates to `destination_languages` with `translator` (see `_translate_with`).
+        """
+        destination_languages = [translator._validate_and_fix_lang(language) for language in destination_languages]
+        source_language = translator._validate_and_fix_lang(source_language)
+        try:
+            self._check_health(translator)
+        except ServiceUnavailable as exc:
+            return [exc] * len(destination_languages)
+        start = perf_counter()
+        try:
+            translations = translator._translate_multi(text, destination_languages, source_language, workers)
+        except Exception as exc:
+            translations = [exc] * len(destination_languages)
+        if all(isinstance(translation, Exception) for translation in translations):
+            self.health[translator].record_failure(perf_counter() - start)
+        else:
+            self.health[translator].record_success(perf_counter() - start)
+        return translations
+
+    @property
+    def _cache_namespace(self) -> str:
+        # Translators built with different services don't share their translations
+        return "Translator({})".format(",".join(translator._cache_namespace for translator in self.translators))
+
+    def _measured_call(self, function, *args):
+        # The requests (and their attempts) are recorded by the translators used
+        return function(*args)
+
+    async def _measured_call_async(self, function, *args):
+        return await function(*args)
+
+    def _route(self, destination_language: str, source_language: str) -> list[BaseTranslator]:
+        """
+        Returns the translators to try, in order.
+
+        The translators which don't support the languages, or whose circuit breaker is open, are left out.
+        Only reads the state of the circuit breakers: the half-open ones are given their probe request
+        by `_check_health`, just before the request is made.
+        """
+        translators = [
+            translator
+            for translator in self.translators
+            if destination_language in translator._language_index.supported_codes
+            and source_language in translator._language_index.supported_codes
+            and self.health[translator].state != OPEN
+        ]
+        if self.reorder:
+            # `sorted` is stable: translators with the same health keep their order
+            translators.sort(
+                key=lambda translator: (
+                    -round(self.health[translator].success_rate, 1),
+                    self.health[translator].latency,
+                )
+            )
+        return translators
+
+    def _check_health(self, translator: BaseTranslator) -> None:
+        """
+        Raises `ServiceUnavailable` if the circuit breaker of `translator` doesn't let a request through
+        (when it is open, or half-open with its probe request already made).
+        """
+        if not self.health[translator].allow_request():
+            raise ServiceUnavailable("The circuit breaker of {} is open".format(translator))
+
+    def _translate_with(
+        self, translator: BaseTranslator, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Translates with `translator`, converting the language codes to the ones of its API,
+        and records the outcome in its health.
+        """
+        destination_language = translator._validate_and_fix_lang(destination_language)
+        source_language = translator._validate_and_fix_lang(source_language)
+        self._check_health(translator)
+        start = perf_counter()
+        try:
+            translation = translator._segmented_translate(text, destination_language, source_language)
+        except Exception:
+            self.health[translator].record_failure(perf_counter() - start)
+            raise
+        self.health[translator].record_success(perf_counter() - start)
+        return translation
+
+    async def _translate_with_async(
+        self, translator: BaseTranslator, text: str, destination_language: str, source_language: str
+    ) -> str:
+        """
+        Asynchronous version of `_translate_with`
+        """
+        import asyncio
+
+        destination_language = translator._validate_and_fix_lang(destination_language)
+        source_language = translator._validate_and_fix_lang(source_language)
+        self._check_health(translator)
+        start = perf_counter()
+        try:
+            translation = await translator._segmented_translate_async(
+                text, destination_language, source_language
+            )
+        except asyncio.CancelledError:
+            # Lost a race: this is not the translator's fault
+            raise
+        except Exception:
+            self.health[translator].record_failure(perf_counter() - start)
+            raise
+        self.health[translator].record_success(perf_counter() - start)
+        return translation
+
+    def _get_hedge_delay(self, translator: BaseTranslator) -> float:
+        """
+        Returns the number of seconds to wait for `translator` before launching the next translator.
+        """
+        latencies = self.health[translator].latencies
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return self.hedge_delay
+        return percentile(latencies, self.hedge_percentile)
+
+    def _record_fallbacks(self, launched: dict, done: set, remaining: list) -> None:
+        """
+        Records the translators which failed, or the one which was too slow when the next one is hedged.
+        """
+        if done:
+            for future in done:
+                record_fallback(str(launched[future]))
+        elif remaining:
+            # The hedging delay of the last launched translator expired
+            record_fallback(str(list(launched.values())[-1]))
+
+    def _translate_concurrently(
+        self, text: str, destination_language: str, source_language: str, hedge: bool
+    ) -> str:
+        """
+        Implements the `race` (all the translators launched at once)
+        and `hedge` (translators launched when the previous ones are slow or failed) strategies.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        remaining = self._route(destination_language, source_language)
+        # future -> translator
+        launched = {}
+        pending = set()
+        errors = []
+        while remaining or pending:
+            # Launch the next translator(s)
+            timeout = None
+            while remaining:
+                translator = remaining.pop(0)
+                # Run in a copy of the context, so that the attempts are traced with the call
+                future = _start(
+                    copy_context().run,
+                    self._translate_with,
+                    translator,
+                    text,
+                    destination_language,
+                    source_language,
+                )
+                launched[future] = translator
+                pending.add(future)
+                if hedge:
+                    timeout = self._get_hedge_delay(translator) if remaining else None
+                    break
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # Cancel the requests which didn't start yet, and ignore the others
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                errors.append(future.exception())
+            # Either the timeout expired or the translator(s) failed: move to the next translator
+            if METRICS.enabled:
+                self._record_fallbacks(launched, done, remaining)
+        raise self._all_failed(destination_language, source_language, errors)
+
+    async def _translate_concurrently_async(
+        self, text: str, destination_language: str, source_language: str, hedge: bool
+    ) -> str:
+        """
+        Asynchronous version of `_translate_concurrently`, which cancels the losing requests.
+        """
+        import asyncio
+
+        remaining = self._route(destination_language, source_language)
+        # task -> translator
+        launched = {}
+        pending = set()
+        errors = []
+        try:
+            while remaining or pending:
+                # Launch the next translator(s)
+                timeout = None
+                while remaining:
+                    translator = remaining.pop(0)
+                    task = asyncio.ensure_future(
+                        self._translate_with_async(
+                            translator, text, destination_language, source_language
+                        )
+                    )
+                    launched[task] = translator
+                    pending.add(task)
+                    if hedge:
+                        timeout = self._get_hedge_delay(translator) if remaining else None
+                        break
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                # Either the timeout expired or the translator(s) failed: move to the next translator
+                if METRICS.enabled:
+                    self._record_fallbacks(launched, done, remaining)
+            raise self._all_failed(destination_language, source_language, errors)
+        finally:
+            for task in pending:
+                task.cancel()
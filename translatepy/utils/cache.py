@@ -0,0 +1,316 @@
+"""
+Caches used to avoid making the same translation requests over and over.
+"""
+from collections import OrderedDict
+from json import dumps
+from os import makedirs, path
+from sys import getsizeof
+from threading import Lock, local
+from time import monotonic, time
+from zlib import compress, decompress
+
+# The approximate memory used by an entry of the `OrderedDict` itself
+ENTRY_OVERHEAD = 100
+
+
+def sizeof(obj) -> int:
+    """
+    Returns the approximate memory size (in bytes) of `obj`, including the elements of tuples and lists.
+    """
+    size = getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(sizeof(element) for element in obj)
+    return size
+
+
+class LRUCache:
+    """
+    A thread-safe Least Recently Used cache, bounded by the memory size of its entries.
+
+    Entries can also expire after a given Time To Live.
+    """
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024, ttl: float = None, max_entries: int = None) -> None:
+        """
+        Parameters
+        ----------
+        max_size: int
+            The maximum memory size (in bytes) of the cached keys and values.
+        ttl: float, optional
+            The number of seconds after which an entry expires. Never expires by default.
+        max_entries: int, optional
+            The maximum number of entries. Unbounded by default.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (value, size, expiration time)
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for `key`, or `default` if it's not cached (or expired).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expiration = entry
+            if expiration is not None and expiration <= monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value) -> None:
+        """
+        Caches `value` for `key`, evicting the least recently used entries if needed.
+        """
+        size = sizeof(key) + sizeof(value) + ENTRY_OVERHEAD
+        if size > self.max_size:
+            # Would evict everything else, and still not fit
+            return
+        expiration = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expiration)
+            self.size += size
+            while self.size > self.max_size or (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key) -> None:
+        # Must be called with the lock held
+        value, size, expiration = self._entries.pop(key)
+        self.size -= size
+
+    def clear(self) -> None:
+        """
+        Removes all the entries, and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the statistics of the cache.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_size": self.max_size,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    A persistent cache of translations, stored in a SQLite database.
+
+    The database uses Write-Ahead Logging, so that multiple threads and processes
+    can read and write the same cache concurrently. The texts are compressed, and
+    the least recently used entries are evicted when the database grows bigger than `max_size`.
+
+    Has the same interface as `LRUCache`, but only caches `str` values.
+    """
+
+    # Only compress the values bigger than this (in bytes)
+    COMPRESSION_THRESHOLD = 64
+    # Only record that an entry has been used if its last use is older than this (in seconds)
+    ACCESS_RESOLUTION = 60
+    # Check the size of the database every N writes
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, filename: str = None, max_size: int = 256 * 1024 * 1024, ttl: float = None) -> None:
+        """
+        Parameters
+        ----------
+        filename: str, optional
+            The path of the database. Defaults to `~/.cache/translatepy/translations.sqlite3`.
+        max_size: int
+            The maximum size (in bytes) of the stored values.
+        ttl: float, optional
+            The number of seconds after which an entry expires. Never expires by default.
+        """
+        if filename is None:
+            filename = path.join(path.expanduser("~"), ".cache", "translatepy", "translations.sqlite3")
+        directory = path.dirname(path.abspath(filename))
+        makedirs(directory, exist_ok=True)
+        self.filename = filename
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = Lock()
+        # Each thread gets its own connection
+        self._local = local()
+        connection = self._connect()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key BLOB PRIMARY KEY, value BLOB NOT NULL, compressed INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, expiration REAL, accessed REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+
+    def _connect(self) -> "sqlite3.Connection":
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only imported when a persistent cache is used
+            import sqlite3
+
+            # `isolation_level=None`: every statement is committed right away
+            connection = sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _hash(self, key) -> bytes:
+        from hashlib import sha256
+
+        return sha256(dumps(key, ensure_ascii=False).encode("utf-8")).digest()
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for `key`, or `default` if it's not cached (or expired).
+        """
+        hashed = self._hash(key)
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT value, compressed, expiration, accessed FROM translations WHERE key = ?", (hashed,)
+        ).fetchone()
+        now = time()
+        if row is None or (row[2] is not None and row[2] <= now):
+            with self._lock:
+                self.misses += 1
+            return default
+
+        value, compressed, expiration, accessed = row
+        if now - accessed > self.ACCESS_RESOLUTION:
+            connection.execute("UPDATE translations SET accessed = ? WHERE key = ?", (now, hashed))
+        with self._lock:
+            self.hits += 1
+        return (decompress(value) if compressed else value).decode("utf-8")
+
+    def set(self, key, value: str) -> None:
+        """
+        Caches `value` for `key`, evicting the least recently used entries if needed.
+        """
+        value = value.encode("utf-8")
+        compressed = len(value) > self.COMPRESSION_THRESHOLD
+        if compressed:
+            value = compress(value)
+        now = time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO translations (key, value, compressed, size, expiration, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self._hash(key),
+                value,
+                int(compressed),
+                len(value),
+                None if self.ttl is None else now + self.ttl,
+                now,
+            ),
+        )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICTION_INTERVAL == 0
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the expired entries, then the least recently used ones until the database fits in `max_size`.
+        """
+        connection = self._connect()
+        connection.execute("DELETE FROM translations WHERE expiration <= ?", (time(),))
+        size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+        excess = size - self.max_size
+        if excess <= 0:
+            return
+        keys = []
+        for key, entry_size in connection.execute("SELECT key, size FROM translations ORDER BY accessed"):
+            if excess <= 0:
+                break
+            keys.append((key,))
+            excess -= entry_size
+        # Delete them in a single transaction
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany("DELETE FROM translations WHERE key = ?", keys)
+        with self._lock:
+            self.evictions += len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes all the entries, and resets the statistics.
+        """
+        self._connect().execute("DELETE FROM translations")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def close(self) -> None:
+        """
+        Closes the connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the statistics of the cache.
+        The hits and misses are the ones of this instance, the size is the one of the whole database.
+        """
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM translations"
+        ).fetchone()
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size": size,
+                "max_size": self.max_size,
+            }
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+
+# The cache shared by all the translators, unless they are given their own
+TRANSLATION_CACHE = LRUCache()
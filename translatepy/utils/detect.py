@@ -0,0 +1,508 @@
+"""
+Offline language detection, with a character n-gram model.
+
+The model is a compact binary file, memory-mapped when loaded:
+
+    header      "TPLD", version (uint16), max n-gram size (uint16), languages count L (uint16),
+                scale (uint16), table size S (uint32)
+    languages   L codes, 8 bytes each (ASCII, NUL padded)
+    keys        S uint32: the CRC-32 of the n-grams (0 for an empty slot), in an open addressing table
+    weights     S + 1 records of L uint16: the weight of the n-gram in each language,
+                the last record being the weights of the n-grams missing from the table
+
+A weight is the quantized negative log-probability of the n-gram in the language (`-log(p) * scale`),
+so the most likely language of a text is the one with the lowest sum of weights.
+A record is read as a single integer, the weights being 16-bit lanes of it: adding the records of
+the n-grams of a text adds up the weights of all the languages at once.
+
+Texts written in a script used by a single language (Japanese kana, Hangul, Thai...)
+are detected from their script only. The model only answers for the scripts whose languages
+are all in it: a text in a language it doesn't know would otherwise get the closest one it knows.
+"""
+import mmap
+import re
+import struct
+import sys
+from bisect import bisect_right
+from collections import Counter
+from json import load
+from math import exp, log
+from os import path, replace
+from tempfile import TemporaryDirectory
+from threading import Lock
+from zlib import crc32
+
+from translatepy.utils.languages import LANGUAGE_CODES
+
+# The model shipped with translatepy, built from `language_samples.json` by `build_model`
+MODEL_FILE = path.join(path.dirname(path.dirname(path.abspath(__file__))), "data", "languages.ngrams")
+SAMPLES_FILE = path.join(path.dirname(MODEL_FILE), "language_samples.json")
+
+MAGIC = b"TPLD"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHI")
+CODE_SIZE = 8
+# The sizes of the n-grams used
+MAX_NGRAM_SIZE = 3
+# Only the beginning of the texts is looked at
+MAX_TEXT_LENGTH = 1000
+# The number of records which can be added before a 16-bit lane overflows
+LANE_CAPACITY = 0xFFFF // 0xFF
+# The number of n-grams whose weights are kept in memory by each detector
+MEMO_SIZE = 16384
+# The minimum number of letters of a text to detect its language with the model:
+# the shorter texts ("Cancel", "I love Paris"...) get confident but wrong guesses
+MIN_LETTERS = 20
+# The minimum probability of the most likely language to return it.
+# Calibrated with `held_out_results`: with `MIN_LETTERS`, 95% of the languages returned are right
+MIN_CONFIDENCE = 0.9
+# The maximum average surprisal (negative log-probability, in nats) of the n-grams of a text
+# in its most likely language: above it, the text doesn't look like any language of the model.
+# Calibrated with `held_out_results`: 99% of the held-out texts of at least `MIN_LETTERS` letters fit
+MAX_SURPRISAL = 5.9
+
+# (first code point, last code point, script)
+SCRIPT_RANGES = sorted(
+    [
+        (0x0370, 0x03FF, "greek"),
+        (0x0400, 0x052F, "cyrillic"),
+        (0x0530, 0x058F, "armenian"),
+        (0x0590, 0x05FF, "hebrew"),
+        (0x0600, 0x06FF, "arabic"),
+        (0x0750, 0x077F, "arabic"),
+        (0x0900, 0x097F, "devanagari"),
+        (0x0980, 0x09FF, "bengali"),
+        (0x0A00, 0x0A7F, "gurmukhi"),
+        (0x0A80, 0x0AFF, "gujarati"),
+        (0x0B00, 0x0B7F, "oriya"),
+        (0x0B80, 0x0BFF, "tamil"),
+        (0x0C00, 0x0C7F, "telugu"),
+        (0x0C80, 0x0CFF, "kannada"),
+        (0x0D00, 0x0D7F, "malayalam"),
+        (0x0D80, 0x0DFF, "sinhala"),
+        (0x0E00, 0x0E7F, "thai"),
+        (0x0E80, 0x0EFF, "lao"),
+        (0x1000, 0x109F, "myanmar"),
+        (0x10A0, 0x10FF, "georgian"),
+        (0x1100, 0x11FF, "hangul"),
+        (0x1200, 0x139F, "ethiopic"),
+        (0x1780, 0x17FF, "khmer"),
+        (0x1F00, 0x1FFF, "greek"),
+        (0x3040, 0x309F, "kana"),
+        (0x30A0, 0x30FF, "kana"),
+        (0x3130, 0x318F, "hangul"),
+        (0x3400, 0x4DBF, "han"),
+        (0x4E00, 0x9FFF, "han"),
+        (0xAC00, 0xD7AF, "hangul"),
+        (0xF900, 0xFAFF, "han"),
+        (0xFB50, 0xFDFF, "arabic"),
+        (0xFE70, 0xFEFF, "arabic"),
+        (0xFF66, 0xFF9F, "kana"),
+    ]
+)
+_SCRIPT_STARTS = [start for start, end, script in SCRIPT_RANGES]
+
+# The scripts of the languages (of `LANGUAGE_CODES`) which are not written in the latin script
+LANGUAGE_SCRIPTS = {
+    "am": "ethiopic",
+    "ar": "arabic",
+    "be": "cyrillic",
+    "bg": "cyrillic",
+    "bn": "bengali",
+    "el": "greek",
+    "fa": "arabic",
+    "gu": "gujarati",
+    "hi": "devanagari",
+    "hy": "armenian",
+    "iw": "hebrew",
+    "ja": "kana",
+    "ka": "georgian",
+    "kk": "cyrillic",
+    "km": "khmer",
+    "kn": "kannada",
+    "ko": "hangul",
+    "ky": "cyrillic",
+    "lo": "lao",
+    "mk": "cyrillic",
+    "ml": "malayalam",
+    "mn": "cyrillic",
+    "mr": "devanagari",
+    "my": "myanmar",
+    "ne": "devanagari",
+    "or": "oriya",
+    "pa": "gurmukhi",
+    "ps": "arabic",
+    "ru": "cyrillic",
+    "sd": "arabic",
+    "si": "sinhala",
+    "sr": "cyrillic",
+    "ta": "tamil",
+    "te": "telugu",
+    "tg": "cyrillic",
+    "th": "thai",
+    "ug": "arabic",
+    "uk": "cyrillic",
+    "ur": "arabic",
+    "yi": "hebrew",
+    "zh-CN": "han",
+    "zh-TW": "han",
+}
+
+
+def _by_script(languages) -> dict:
+    """
+    Groups language codes by script
+    """
+    scripts = {}
+    for language in languages:
+        scripts.setdefault(LANGUAGE_SCRIPTS.get(language, "latin"), set()).add(language)
+    return scripts
+
+
+def script_of(character: str) -> str:
+    """
+    Returns the script of a letter: 'latin' or one of `SCRIPT_RANGES`
+    """
+    code_point = ord(character)
+    if code_point < 0x0370:
+        return "latin"
+    index = bisect_right(_SCRIPT_STARTS, code_point) - 1
+    if index >= 0:
+        start, end, script = SCRIPT_RANGES[index]
+        if code_point <= end:
+            return script
+    return "latin"
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercases `text` and replaces everything which is not a letter by a single space.
+    """
+    text = "".join(character if character.isalpha() else " " for character in text.lower())
+    return " ".join(text.split())
+
+
+def ngrams(text: str) -> list:
+    """
+    Returns the character n-grams (from 1 to `MAX_NGRAM_SIZE` characters) of a normalized text,
+    the words being padded with spaces.
+    """
+    results = []
+    for word in text.split(" "):
+        word = " " + word + " "
+        for size in range(1, MAX_NGRAM_SIZE + 1):
+            results += [word[index : index + size] for index in range(len(word) - size + 1)]
+    return results
+
+
+def _hash(ngram: str) -> int:
+    # 0 marks the empty slots
+    return crc32(ngram.encode("utf-8")) or 1
+
+
+def build_model(
+    samples: dict, filename: str = MODEL_FILE, scale: int = 16, min_count: int = 2
+) -> None:
+    """
+    Builds a model from `samples` (language code -> sample text) and writes it to `filename`.
+
+    The n-grams seen less than `min_count` times in all the samples are left out of the table.
+    """
+    codes = sorted(samples)
+    counts = {code: Counter(ngrams(normalize(samples[code]))) for code in codes}
+    vocabulary = sorted(set().union(*counts.values()))
+    occurrences = Counter()
+    for code in codes:
+        occurrences.update(counts[code])
+
+    # Add-one smoothing, for each n-gram size separately
+    weights = {}
+    unseen = []
+    for code in codes:
+        totals = Counter()
+        for ngram, count in counts[code].items():
+            totals[len(ngram)] += count
+        sizes = Counter(len(ngram) for ngram in vocabulary)
+
+        def weight(count, size):
+            probability = (count + 1) / (totals[size] + sizes[size])
+            return min(255, round(-log(probability) * scale))
+
+        # An n-gram missing from the table gets the weight of an unseen trigram
+        unseen.append(weight(0, MAX_NGRAM_SIZE))
+        weights[code] = {ngram: weight(counts[code][ngram], len(ngram)) for ngram in vocabulary}
+
+    # Open addressing table, at most 3/4 full
+    vocabulary = [ngram for ngram in vocabulary if occurrences[ngram] >= min_count]
+    size = 1
+    while size * 3 < 4 * len(vocabulary):
+        size *= 2
+    keys = [0] * size
+    records = [unseen] * (size + 1)
+    for ngram in vocabulary:
+        key = _hash(ngram)
+        slot = key & (size - 1)
+        while keys[slot] not in (0, key):
+            slot = (slot + 1) & (size - 1)
+        keys[slot] = key
+        records[slot] = [weights[code][ngram] for code in codes]
+
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, MAX_NGRAM_SIZE, len(codes), scale, size))
+        for code in codes:
+            f.write(code.encode("ascii").ljust(CODE_SIZE, b"\0"))
+        f.write(struct.pack("<{}I".format(size), *keys))
+        for record in records:
+            f.write(struct.pack("<{}H".format(len(codes)), *record))
+    replace(temporary, filename)
+
+
+def held_out_results(samples: dict, folds: int = 5) -> list:
+    """
+    Returns `(letters, confidence, surprisal, correct)` for each prefix (in words) of each sentence of `samples`,
+    detected with a model built without the sentence: the sentences are split into `folds` folds,
+    each one being detected with a model built from the others.
+
+    Used to calibrate `MIN_LETTERS`, `MIN_CONFIDENCE` and `MAX_SURPRISAL`.
+    """
+    sentences = {code: re.split(r"(?<=[.!?\u061f])\s+", text.strip()) for code, text in samples.items()}
+    results = []
+    with TemporaryDirectory() as directory:
+        for fold in range(folds):
+            filename = path.join(directory, str(fold))
+            build_model(
+                {
+                    code: " ".join(sentence for index, sentence in enumerate(texts) if index % folds != fold)
+                    for code, texts in sentences.items()
+                },
+                filename,
+            )
+            detector = LanguageDetector(filename)
+            for code, texts in sentences.items():
+                candidates = detector._model_languages[LANGUAGE_SCRIPTS.get(code, "latin")]
+                for sentence in texts[fold::folds]:
+                    words = sentence.split()
+                    for size in range(1, len(words) + 1):
+                        prefix = " ".join(words[:size])
+                        probabilities, surprisal = detector._evaluate(prefix, candidates)
+                        if probabilities:
+                            language = max(probabilities, key=probabilities.get)
+                            letters = sum(character.isalpha() for character in prefix)
+                            results.append((letters, probabilities[language], surprisal, language == code))
+            # Unmaps the model before it's deleted
+            del detector
+    return results
+
+
+class LanguageDetector:
+    """
+    Detects the language of texts offline, with a character n-gram model.
+
+    The model file is memory-mapped, so that multiple processes share its memory.
+    """
+
+    def __init__(self, filename: str = MODEL_FILE, languages=None) -> None:
+        """
+        Parameters
+        ----------
+        filename: str, optional
+            The model built by `build_model`. Defaults to the model shipped with translatepy.
+        languages: iterable of str, optional
+            The codes of the languages the texts can be written in. Defaults to all the languages
+            of `LANGUAGE_CODES`. A script is only detected with the model if all its languages are in the model.
+        """
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._mmap)
+        magic, version, max_ngram_size, count, scale, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or max_ngram_size != MAX_NGRAM_SIZE:
+            raise ValueError("{} is not a language detection model".format(filename))
+        offset = HEADER.size
+        self.languages = tuple(
+            bytes(data[start : start + CODE_SIZE]).rstrip(b"\0").decode("ascii")
+            for start in range(offset, offset + count * CODE_SIZE, CODE_SIZE)
+        )
+        offset += count * CODE_SIZE
+        if sys.byteorder == "little":
+            self._keys = data[offset : offset + 4 * size].cast("I")
+        else:  # pragma: no cover
+            self._keys = struct.unpack_from("<{}I".format(size), data, offset)
+        offset += 4 * size
+        self._records = data[offset : offset + (size + 1) * count * 2]
+        self._record_size = count * 2
+        self._count = count
+        self._size = size
+        # n-gram -> record, for the most common n-grams
+        self._memo = {}
+        if languages is None:
+            languages = set(LANGUAGE_CODES.values()) - {"auto"}
+        # script -> the languages written with it
+        self._script_languages = _by_script(languages)
+        # script -> the languages of the model written with it
+        self._model_languages = _by_script(self.languages)
+        self._mask = size - 1
+        self._scale = scale
+
+    def _record(self, ngram: str) -> int:
+        """
+        Returns the weights of `ngram` in each language, as 16-bit lanes of an integer.
+        """
+        record = self._memo.get(ngram)
+        if record is not None:
+            return record
+        key = _hash(ngram)
+        slot = key & self._mask
+        while True:
+            found = self._keys[slot]
+            if found == key:
+                break
+            if found == 0:
+                slot = self._size
+                break
+            slot = (slot + 1) & self._mask
+        start = slot * self._record_size
+        record = int.from_bytes(self._records[start : start + self._record_size], "little")
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[ngram] = record
+        return record
+
+    def _scores(self, text: str) -> list:
+        """
+        Returns the sum of the weights of the n-grams of `text`, for each language.
+        """
+        memo, record = self._memo.get, self._record
+        records = [memo(ngram) or record(ngram) for ngram in ngrams(text)]
+        scores = [0] * self._count
+        for start in range(0, len(records), LANE_CAPACITY):
+            scores = self._add_lanes(scores, sum(records[start : start + LANE_CAPACITY]))
+        return scores
+
+    def _add_lanes(self, scores: list, total: int) -> list:
+        return [score + ((total >> (16 * index)) & 0xFFFF) for index, score in enumerate(scores)]
+
+    def probabilities(self, text: str, candidates=None) -> dict:
+        """
+        Returns the probability of each language of the model (or of `candidates`) for `text`.
+        """
+        return self._evaluate(text, candidates)[0]
+
+    def _evaluate(self, text: str, candidates=None) -> tuple:
+        """
+        Returns the probabilities of the languages (see `probabilities`), and the average surprisal
+        (in nats) of the n-grams of `text` in the most likely one.
+        """
+        text = normalize(text[:MAX_TEXT_LENGTH])
+        if not text:
+            return {}, None
+        scores = {
+            language: score
+            for language, score in zip(self.languages, self._scores(text))
+            if candidates is None or language in candidates
+        }
+        if not scores:
+            return {}, None
+        best = min(scores.values())
+        likelihoods = {
+            language: exp((best - score) / self._scale) for language, score in scores.items()
+        }
+        total = sum(likelihoods.values())
+        surprisal = best / self._scale / len(ngrams(text))
+        return {language: likelihood / total for language, likelihood in likelihoods.items()}, surprisal
+
+    def detect(self, text: str, min_confidence: float = MIN_CONFIDENCE, min_letters: int = MIN_LETTERS) -> str:
+        """
+        Returns the code of the language `text` is written in, or `None` if it can't be detected:
+        if its script is used by multiple languages, and some of them are not in the model,
+        or if it has less than `min_letters` letters, or doesn't fit the model (`MAX_SURPRISAL`),
+        or if its most likely language has a probability lower than `min_confidence`.
+        """
+        text = text[:MAX_TEXT_LENGTH]
+
+        if text and max(text) < "\u0370":
+            # Only latin letters
+            script = "latin"
+        else:
+            # Count the letters of each script
+            scripts = Counter(script_of(character) for character in text if character.isalpha())
+            if not scripts:
+                return None
+            script, letters = scripts.most_common(1)[0]
+            if script in ("han", "kana") and scripts["kana"]:
+                # Japanese mixes kanjis and kanas
+                script = "kana"
+
+        candidates = self._script_languages.get(script, ())
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        if not candidates or not candidates <= self._model_languages.get(script, set()):
+            # The model would give a language it knows to the texts written in the ones it doesn't
+            return None
+
+        if sum(character.isalpha() for character in text) < min_letters:
+            return None
+        probabilities, surprisal = self._evaluate(text, candidates)
+        if not probabilities or surprisal > MAX_SURPRISAL:
+            return None
+        language = max(probabilities, key=probabilities.get)
+        return language if probabilities[language] >= min_confidence else None
+
+    def detect_many(self, texts, min_confidence: float = MIN_CONFIDENCE, min_letters: int = MIN_LETTERS) -> list:
+        """
+        Returns the language of each text (see `detect`).
+        """
+        return [self.detect(text, min_confidence, min_letters) for text in texts]
+
+
+_default_detector = None
+_default_detector_lock = Lock()
+
+
+def get_detector() -> LanguageDetector:
+    """
+    Returns the `LanguageDetector` using the model shipped with translatepy.
+    """
+    global _default_detector
+    if _default_detector is None:
+        with _default_detector_lock:
+            if _default_detector is None:
+                _default_detector = LanguageDetector()
+    return _default_detector
+
+
+def detect(text: str, min_confidence: float = MIN_CONFIDENCE, min_letters: int = MIN_LETTERS) -> str:
+    """
+    Returns the code of the language `text` is written in, or `None` if it can't be detected.
+    """
+    return get_detector().detect(text, min_confidence, min_letters)
+
+
+def detect_many(texts, min_confidence: float = MIN_CONFIDENCE, min_letters: int = MIN_LETTERS) -> list:
+    """
+    Returns the code of the language of each text (`None` if it can't be detected).
+    """
+    return get_detector().detect_many(texts, min_confidence, min_letters)
+
+
+if __name__ == "__main__":
+    with open(SAMPLES_FILE, encoding="utf-8") as f:
+        samples = load(f)
+    if sys.argv[1:] == ["calibrate"]:
+        # The precision and the coverage of the thresholds on held-out text
+        results = [
+            (confidence, surprisal, correct)
+            for letters, confidence, surprisal, correct in held_out_results(samples)
+            if letters >= MIN_LETTERS
+        ]
+        kept = [
+            correct
+            for confidence, surprisal, correct in results
+            if confidence >= MIN_CONFIDENCE and surprisal <= MAX_SURPRISAL
+        ]
+        print("precision {:.3f}, coverage {:.3f}".format(sum(kept) / len(kept), len(kept) / len(results)))
+        fitting = sum(surprisal <= MAX_SURPRISAL for confidence, surprisal, correct in results)
+        print("{:.3f} of the texts fit the model".format(fitting / len(results)))
+    else:
+        # Rebuilds the model shipped with translatepy
+        build_model(samples)
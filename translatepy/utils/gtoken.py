@@ -36,11 +36,16 @@ LICENSE:
 """
 
 import ast
+import re
+from functools import lru_cache
+from json import dump, load
+from os import fdopen, makedirs, path, remove, replace
+from tempfile import mkstemp
+from threading import Lock
 from time import time
 from math import floor
-from re import compile, DOTALL
 
-from requests import get
+from translatepy.utils.request import get_session
 
 HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -53,6 +58,58 @@ HEADERS = {
     "Connection": "keep-alive"
 }
 
+# The file sharing the TKK between the processes, in a directory of the user
+# (not in the shared temporary directory, where anyone could create it first)
+TKK_CACHE_FILE = path.join(path.expanduser("~"), ".cache", "translatepy", "google_tkk.json")
+# The number of tokens remembered
+TOKEN_MEMO_SIZE = 4096
+
+
+def _current_hour() -> int:
+    return floor(int(time() * 1000) / 3600000.0)
+
+
+def _is_valid(tkk) -> bool:
+    """
+    The first part of the TKK is the hour it was generated at, and it is valid for this hour only.
+    """
+    try:
+        return int(tkk.split('.')[0]) == _current_hour()
+    except (AttributeError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=TOKEN_MEMO_SIZE)
+def _token(tkk: str, text: str) -> str:
+    """
+    Computes the token of `text` for the seed `tkk`.
+
+    Specialised version of the original algorithm: the text is UTF-8 encoded (the surrogates
+    being encoded separately, like the original JavaScript does), and the `_xr` operation strings
+    '+-a^+6' and '+-3^+b+-f' are unrolled into plain arithmetic.
+    """
+    d = tkk.split('.') if tkk != '0' else ['']
+    b = int(d[0]) if len(d) > 1 else 0
+
+    a = b
+    for value in text.encode('utf-8', 'surrogatepass'):
+        a += value
+        # '+-a^+6'
+        a = (a + (a << 10)) & 4294967295
+        a ^= a >> 6
+    # '+-3^+b+-f'
+    a = (a + (a << 3)) & 4294967295
+    a ^= a >> 11
+    a = (a + (a << 15)) & 4294967295
+
+    a ^= int(d[1]) if len(d) > 1 else 0
+    if a < 0:  # pragma: nocover
+        a = (a & 2147483647) + 2147483648
+    a %= 1000000  # int(1E6)
+
+    return '{}.{}'.format(a, a ^ b)
+
+
 class TokenAcquirer:
     """Google Translate API token generator
 
@@ -79,8 +136,12 @@ class TokenAcquirer:
         950629.577246
     """
 
-    RE_TKK = compile(r'tkk:\'(.+?)\'', DOTALL)
-    RE_RAWTKK = compile(r'tkk:\'(.+?)\'', DOTALL)
+    RE_TKK = re.compile(r'tkk:\'(.+?)\'', re.DOTALL)
+    RE_RAWTKK = re.compile(r'tkk:\'(.+?)\'', re.DOTALL)
+
+    # The TKK shared by all the instances
+    _shared_tkk = '0'
+    _shared_tkk_lock = Lock()
 
     def __init__(self, host='translate.google.com'):
         self.tkk = '0'
@@ -90,16 +151,57 @@ class TokenAcquirer:
         """update tkk
         """
         # we don't need to update the base TKK value when it is still valid
-        now = floor(int(time() * 1000) / 3600000.0)
-        if self.tkk and int(self.tkk.split('.')[0]) == now:
+        if _is_valid(self.tkk):
+            return
+
+        with self._shared_tkk_lock:
+            # another instance, or another process, might already have the current TKK
+            if not _is_valid(TokenAcquirer._shared_tkk):
+                tkk = self._read_shared_tkk()
+                if not _is_valid(tkk):
+                    tkk = self._fetch_tkk()
+                    self._write_shared_tkk(tkk)
+                TokenAcquirer._shared_tkk = tkk
+            self.tkk = TokenAcquirer._shared_tkk
+
+    def _read_shared_tkk(self):
+        """reads the tkk shared between the processes
+        """
+        try:
+            with open(TKK_CACHE_FILE, encoding='utf-8') as f:
+                return load(f).get('tkk')
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _write_shared_tkk(self, tkk):
+        """shares the tkk with the other processes
+        """
+        directory = path.dirname(TKK_CACHE_FILE)
+        try:
+            makedirs(directory, mode=0o700, exist_ok=True)
+            # a new file with an unpredictable name, which can't be a link planted by someone else
+            descriptor, temporary = mkstemp(prefix='.google_tkk.', dir=directory)
+        except OSError:
             return
+        try:
+            with fdopen(descriptor, 'w', encoding='utf-8') as f:
+                dump({'tkk': tkk}, f)
+            # atomic, so that the other processes never read a partial file
+            replace(temporary, TKK_CACHE_FILE)
+        except OSError:
+            try:
+                remove(temporary)
+            except OSError:
+                pass
 
-        r = get(self.host, headers=HEADERS)
+    def _fetch_tkk(self):
+        """fetches the current tkk from translate.google.com
+        """
+        r = get_session().get(self.host, headers=HEADERS)
 
         raw_tkk = self.RE_TKK.search(r.text)
         if raw_tkk:
-            self.tkk = raw_tkk.group(1)
-            return
+            return raw_tkk.group(1)
 
         try:
             # this will be the same as python code after stripping out a reserved word 'var'
@@ -150,7 +252,8 @@ class TokenAcquirer:
             value = eval(clause, dict(__builtin__={}))
             result = '{}.{}'.format(n, value)
 
-            self.tkk = result
+            return result
+        return self.tkk
 
     def _lazy(self, value):
         """like lazy evaluation, this method returns a lambda function that
@@ -183,60 +286,7 @@ class TokenAcquirer:
         return a
 
     def acquire(self, text):
-        a = []
-        # Convert text to ints
-        for i in text:
-            val = ord(i)
-            if val < 0x10000:
-                a += [val]
-            else:
-                # Python doesn't natively use Unicode surrogates, so account for those
-                a += [
-                    floor((val - 0x10000) / 0x400 + 0xD800),
-                    floor((val - 0x10000) % 0x400 + 0xDC00)
-                ]
-
-        b = self.tkk if self.tkk != '0' else ''
-        d = b.split('.')
-        b = int(d[0]) if len(d) > 1 else 0
-
-        # assume e means char code array
-        e = []
-        g = 0
-        size = len(a)
-        while g < size:
-            l = a[g]
-            # just append if l is less than 128(ascii: DEL)
-            if l < 128:
-                e.append(l)
-            # append calculated value if l is less than 2048
-            else:
-                if l < 2048:
-                    e.append(l >> 6 | 192)
-                else:
-                    # append calculated value if l matches special condition
-                    if (l & 64512) == 55296 and g + 1 < size and \
-                            a[g + 1] & 64512 == 56320:
-                        g += 1
-                        l = 65536 + ((l & 1023) << 10) + (a[g] & 1023)  # This bracket is important
-                        e.append(l >> 18 | 240)
-                        e.append(l >> 12 & 63 | 128)
-                    else:
-                        e.append(l >> 12 | 224)
-                    e.append(l >> 6 & 63 | 128)
-                e.append(l & 63 | 128)
-            g += 1
-        a = b
-        for i, value in enumerate(e):
-            a += value
-            a = self._xr(a, '+-a^+6')
-        a = self._xr(a, '+-3^+b+-f')
-        a ^= int(d[1]) if len(d) > 1 else 0
-        if a < 0:  # pragma: nocover
-            a = (a & 2147483647) + 2147483648
-        a %= 1000000  # int(1E6)
-
-        return '{}.{}'.format(a, a ^ b)
+        return _token(self.tkk, text)
 
     def do(self, text):
         self._update()
@@ -0,0 +1,126 @@
+"""
+Health tracking of the translation services, with circuit breakers.
+"""
+from collections import deque
+from threading import Lock
+from time import monotonic
+
+from translatepy.utils.utils import percentile
+
+# The circuit breaker lets the requests through
+CLOSED = "closed"
+# The circuit breaker blocks the requests
+OPEN = "open"
+# The circuit breaker lets a single probe request through
+HALF_OPEN = "half-open"
+
+
+class ServiceHealth:
+    """
+    Tracks the outcome and latency of the last requests made to a service,
+    and blocks the requests with a circuit breaker when the service keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens: no request is allowed
+    for `recovery_time` seconds. Then a single probe request is allowed (half-open):
+    the circuit closes again if it succeeds, and reopens if it fails.
+    """
+
+    def __init__(self, window: int = 50, failure_threshold: int = 5, recovery_time: float = 30.0) -> None:
+        """
+        Parameters
+        ----------
+        window: int
+            The number of recent requests taken into account.
+        failure_threshold: int
+            The number of consecutive failures opening the circuit.
+        recovery_time: float
+            The number of seconds the circuit stays open before allowing a probe request.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        # (success, latency) of the last requests
+        self._results = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        The state of the circuit breaker: `closed`, `open` or `half-open`.
+        """
+        with self._lock:
+            if self._state == OPEN and monotonic() - self._opened_at >= self.recovery_time:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Returns whether a request can be made to the service.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = monotonic()
+            if self._state == OPEN:
+                if now - self._opened_at < self.recovery_time:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started_at = None
+            # Half-open: only let one probe through at a time.
+            # A probe which never reported back is replaced after `recovery_time`.
+            if self._probe_started_at is None or now - self._probe_started_at >= self.recovery_time:
+                self._probe_started_at = now
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._results.append((True, latency))
+            self._consecutive_failures = 0
+            self._state = CLOSED
+            self._probe_started_at = None
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._results.append((False, latency))
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = monotonic()
+                self._probe_started_at = None
+
+    @property
+    def success_rate(self) -> float:
+        """
+        The ratio of successful requests in the window (1 when nothing has been recorded).
+        """
+        results = list(self._results)
+        if not results:
+            return 1.0
+        return sum(1 for success, latency in results if success) / len(results)
+
+    @property
+    def latencies(self) -> list:
+        """
+        The latencies of the successful requests in the window.
+        """
+        return [latency for success, latency in list(self._results) if success]
+
+    @property
+    def latency(self) -> float:
+        """
+        The median latency of the successful requests in the window (0 when nothing has been recorded).
+        """
+        latencies = self.latencies
+        return percentile(latencies, 50) if latencies else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "success_rate": self.success_rate,
+            "latency": self.latency,
+            "requests": len(self._results),
+        }
@@ -0,0 +1,210 @@
+"""
+Tracing hooks: events emitted along the translation calls, to see where the time goes.
+
+A call to `translate` emits:
+    - `start`: when the call begins (before the validation of the languages)
+    - `attempt`: after each request to a service (with its duration, and its exception if it failed).
+      The `Translator` class makes an attempt for each service it tries.
+    - `retry`: when a throttled request is going to be retried (with the delay before the retry)
+    - `success` or `failure`: when the call ends (with its duration, and its exception if it failed)
+
+The timestamps come from `time.monotonic`.
+
+    from translatepy.utils.hooks import HOOKS
+    HOOKS.add(print)
+"""
+from contextvars import ContextVar
+from threading import Lock
+from time import monotonic
+
+START = "start"
+ATTEMPT = "attempt"
+RETRY = "retry"
+SUCCESS = "success"
+FAILURE = "failure"
+
+
+class Event:
+    """
+    Something which happened during a translation call.
+    """
+
+    __slots__ = ("type", "service", "timestamp", "duration", "exception", "delay")
+
+    def __init__(
+        self,
+        type: str,
+        service: str,
+        timestamp: float,
+        duration: float = None,
+        exception: Exception = None,
+        delay: float = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        type: str
+            `start`, `attempt`, `retry`, `success` or `failure`.
+        service: str
+            The name of the translator (like 'Google').
+        timestamp: float
+            When the event started (the attempt or call for `attempt`, `success` and `failure`), from `time.monotonic`.
+        duration: float, optional
+            The number of seconds the attempt or the call took.
+        exception: Exception, optional
+            The exception which made the attempt (or the call) fail.
+        delay: float, optional
+            For `retry`, the number of seconds waited before retrying.
+        """
+        self.type = type
+        self.service = service
+        self.timestamp = timestamp
+        self.duration = duration
+        self.exception = exception
+        self.delay = delay
+
+    def as_dict(self) -> dict:
+        """
+        Returns the event as a dict, with the exception as its representation.
+        """
+        result = {name: getattr(self, name) for name in self.__slots__}
+        if self.exception is not None:
+            result["exception"] = repr(self.exception)
+        return result
+
+    def __repr__(self) -> str:
+        details = [
+            "{}={!r}".format(name, getattr(self, name)) for name in self.__slots__ if getattr(self, name) is not None
+        ]
+        return "Event({})".format(", ".join(details))
+
+
+class Hooks:
+    """
+    The callbacks called with every `Event`.
+    """
+
+    def __init__(self) -> None:
+        # Replaced (not modified) when a callback is added or removed, so that it can be read without locking
+        self._callbacks = ()
+        self._lock = Lock()
+
+    def add(self, callback) -> None:
+        """
+        Calls `callback(event)` for every event. The callbacks are called in the thread
+        of the translation, so they should be quick.
+        """
+        with self._lock:
+            self._callbacks += (callback,)
+
+    def remove(self, callback) -> None:
+        with self._lock:
+            callbacks = list(self._callbacks)
+            callbacks.remove(callback)
+            self._callbacks = tuple(callbacks)
+
+    def emit(self, event: Event) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception:
+                # A broken hook must not break the translations
+                pass
+
+    def __bool__(self) -> bool:
+        return bool(self._callbacks)
+
+
+# The hooks called for the events of all the translators
+HOOKS = Hooks()
+
+# The call being traced in the current context
+_current_call = ContextVar("translatepy_call", default=None)
+
+
+def tracing() -> bool:
+    """
+    Returns whether the events are needed: hooks were added, or the current call records its attempts.
+    """
+    return bool(HOOKS) or _current_call.get() is not None
+
+
+def emit(type: str, service: str, timestamp: float = None, **details) -> None:
+    """
+    Emits an event to the hooks, and to the current call.
+    """
+    event = Event(type, service, monotonic() if timestamp is None else timestamp, **details)
+    call = _current_call.get()
+    if call is not None:
+        call.add(event)
+    HOOKS.emit(event)
+
+
+class CallTrace:
+    """
+    Traces a translation call, emitting its `start` event when entered
+    and its `success` or `failure` event when exited.
+
+    Used as a context manager. The events emitted in between (in the same context) are
+    attributed to the call, and its attempts are kept if `record` is set.
+    """
+
+    def __init__(self, service: str, record: bool = False) -> None:
+        self.service = service
+        self.attempts = [] if record else None
+        self.started_at = None
+        self._token = None
+
+    def add(self, event: Event) -> None:
+        if self.attempts is not None and event.type in (ATTEMPT, RETRY):
+            self.attempts.append(event)
+
+    def attach(self, translation):
+        """
+        Attaches the recorded attempts to `translation` (a `Translation`) and returns it.
+        """
+        if self.attempts is not None:
+            translation.attempts = list(self.attempts)
+        return translation
+
+    def __enter__(self):
+        self.started_at = monotonic()
+        self._token = _current_call.set(self)
+        emit(START, self.service, self.started_at)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        _current_call.reset(self._token)
+        duration = monotonic() - self.started_at
+        if exc is None:
+            emit(SUCCESS, self.service, self.started_at, duration=duration)
+        else:
+            emit(FAILURE, self.service, self.started_at, duration=duration, exception=exc)
+        return False
+
+
+class _NoTrace:
+    """
+    Stands for `CallTrace` when nothing needs the events.
+    """
+
+    def attach(self, translation):
+        return translation
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+NO_TRACE = _NoTrace()
+
+
+def trace_call(service: str, record: bool = False):
+    """
+    Returns the context manager tracing a call to `service` (see `CallTrace`).
+    """
+    if not record and not HOOKS:
+        return NO_TRACE
+    return CallTrace(service, record)
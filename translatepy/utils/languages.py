@@ -0,0 +1,223 @@
+"""
+The languages known by the translators, and precomputed lookups between their names and codes.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+# The size of the n-grams used to prefilter the fuzzy searches
+NGRAM_SIZE = 3
+# The number of fuzzy searches remembered by each index
+SEARCH_MEMO_SIZE = 2048
+
+
+def ngrams(text: str) -> set:
+    """
+    Returns the set of character n-grams of `text`, padded with spaces.
+    """
+    text = " " + text + " "
+    return {text[index : index + NGRAM_SIZE] for index in range(len(text) - NGRAM_SIZE + 1)}
+
+# The language names (keys) and their codes (values).
+# Some languages have multiple names (aliases), the first one is the canonical name.
+LANGUAGE_CODES = MappingProxyType(
+    {
+        "automatic": "auto",
+        "afrikaans": "af",
+        "albanian": "sq",
+        "amharic": "am",
+        "arabic": "ar",
+        "armenian": "hy",
+        "azerbaijani": "az",
+        "basque": "eu",
+        "belarusian": "be",
+        "bengali": "bn",
+        "bosnian": "bs",
+        "bulgarian": "bg",
+        "catalan": "ca",
+        "cebuano": "ceb",
+        "chichewa": "ny",
+        "chinese": "zh-CN",
+        "chinese (simplified)": "zh-CN",
+        "chinese (traditional)": "zh-TW",
+        "corsican": "co",
+        "croatian": "hr",
+        "czech": "cs",
+        "danish": "da",
+        "dutch": "nl",
+        "english": "en",
+        "esperanto": "eo",
+        "estonian": "et",
+        "filipino": "tl",
+        "finnish": "fi",
+        "french": "fr",
+        "frisian": "fy",
+        "galician": "gl",
+        "georgian": "ka",
+        "german": "de",
+        "greek": "el",
+        "gujarati": "gu",
+        "haitian": "ht",
+        "creole": "ht",
+        "haitian creole": "ht",
+        "hausa": "ha",
+        "hawaiian": "haw",
+        "hebrew": "iw",
+        "hindi": "hi",
+        "hmong": "hmn",
+        "hungarian": "hu",
+        "icelandic": "is",
+        "igbo": "ig",
+        "indonesian": "id",
+        "irish": "ga",
+        "italian": "it",
+        "japanese": "ja",
+        "javanese": "jw",
+        "kannada": "kn",
+        "kazakh": "kk",
+        "khmer": "km",
+        "korean": "ko",
+        "kurdish": "ku",
+        "kurdish (kurmanji)": "ku",
+        "kyrgyz": "ky",
+        "lao": "lo",
+        "latin": "la",
+        "latvian": "lv",
+        "lithuanian": "lt",
+        "luxembourgish": "lb",
+        "macedonian": "mk",
+        "malagasy": "mg",
+        "malay": "ms",
+        "malayalam": "ml",
+        "maltese": "mt",
+        "maori": "mi",
+        "marathi": "mr",
+        "mongolian": "mn",
+        "myanmar": "my",
+        "burmese": "my",
+        "myanmar (burmese)": "my",
+        "nepali": "ne",
+        "norwegian": "no",
+        "odia": "or",
+        "pashto": "ps",
+        "persian": "fa",
+        "polish": "pl",
+        "portuguese": "pt",
+        "punjabi": "pa",
+        "romanian": "ro",
+        "russian": "ru",
+        "samoan": "sm",
+        "scots": "gd",
+        "gaelic": "gd",
+        "scots gaelic": "gd",
+        "serbian": "sr",
+        "sesotho": "st",
+        "shona": "sn",
+        "sindhi": "sd",
+        "sinhala": "si",
+        "slovak": "sk",
+        "slovenian": "sl",
+        "somali": "so",
+        "spanish": "es",
+        "sundanese": "su",
+        "swahili": "sw",
+        "swedish": "sv",
+        "tajik": "tg",
+        "tamil": "ta",
+        "telugu": "te",
+        "thai": "th",
+        "turkish": "tr",
+        "ukrainian": "uk",
+        "urdu": "ur",
+        "uyghur": "ug",
+        "uzbek": "uz",
+        "vietnamese": "vi",
+        "welsh": "cy",
+        "xhosa": "xh",
+        "yiddish": "yi",
+        "yoruba": "yo",
+        "zulu": "zu",
+        }
+)
+
+# The code of every language (values), with its canonical name (keys)
+CODE_TO_NAME = MappingProxyType(
+    {code: name for name, code in reversed(list(LANGUAGE_CODES.items()))}
+)
+
+
+class LanguageIndex:
+    """
+    Precomputed language lookups of a translator.
+
+    Contains:
+        - `name_to_code`: every known language name -> language code.
+        - `code_to_name`: every known language code -> canonical language name.
+        - `supported_codes`: the codes of the languages supported by the translator (and 'auto').
+        - `service_codes`: every supported code -> the code used by the translator's API.
+        - `supported_names`: the names of the languages supported by the translator.
+
+    Also holds an n-gram index of `supported_names`, used by `search`.
+    """
+
+    def __init__(self, supported_languages, language_fixes=None) -> None:
+        """
+        Parameters
+        ----------
+        supported_languages: iterable of str
+            The names of the languages supported by the translator.
+        language_fixes: callable, optional
+            The function transforming a language code into the code used by the translator's API.
+        """
+        self.name_to_code = LANGUAGE_CODES
+        self.code_to_name = CODE_TO_NAME
+        self.supported_names = tuple(name for name in supported_languages if name in LANGUAGE_CODES)
+        codes = {LANGUAGE_CODES[name] for name in self.supported_names}
+        codes.add("auto")
+
+        service_codes = {}
+        for code in codes:
+            if language_fixes is None:
+                service_codes[code] = code
+                continue
+            try:
+                service_codes[code] = language_fixes(code)
+            except (KeyError, ValueError):
+                # The translator's API doesn't know this language
+                continue
+        self.service_codes = MappingProxyType(service_codes)
+        self.supported_codes = frozenset(service_codes)
+
+        # name -> position in the supported languages, to break ties
+        self._name_order = {name: position for position, name in enumerate(self.supported_names)}
+        # n-gram -> names containing it
+        self._ngram_index = {}
+        for name in self.supported_names:
+            for ngram in ngrams(name):
+                self._ngram_index.setdefault(ngram, []).append(name)
+        # Remember the searches
+        self.search = lru_cache(maxsize=SEARCH_MEMO_SIZE)(self.search)
+
+    def search(self, query: str, top_k: int = 1) -> tuple:
+        """
+        Returns the `top_k` supported language names most similar to `query`,
+        as `(name, similarity)` pairs sorted from the most similar.
+
+        Uses the `Levenshtein` ratio on the names sharing at least one n-gram with `query`
+        (or on every name if there are not enough of them), and remembers the results.
+        """
+        # Only imported when a language name needs to be searched
+        import Levenshtein
+
+        normalized = query.lower().strip()
+        candidates = set()
+        for ngram in ngrams(normalized):
+            candidates.update(self._ngram_index.get(ngram, ()))
+        if len(candidates) < top_k:
+            candidates = self.supported_names
+
+        # Sort by similarity, then by the order of the supported languages
+        scored = sorted(
+            ((Levenshtein.ratio(normalized, name), name) for name in candidates),
+            key=lambda pair: (-pair[0], self._name_order[pair[1]]),
+        )
+        return tuple((name, similarity) for similarity, name in scored[:top_k])
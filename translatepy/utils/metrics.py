@@ -0,0 +1,305 @@
+"""
+Metrics of the translators (requests, failures, fallbacks, cache lookups, bytes transferred, latencies),
+exportable in the Prometheus text format or as a dict.
+
+The metrics are disabled by default, and cost a single attribute lookup per call until enabled:
+
+    from translatepy.utils.metrics import METRICS
+    METRICS.enable()
+    ...
+    print(METRICS.export())
+"""
+from bisect import bisect_left
+from threading import Lock
+
+# The upper bounds (in seconds) of the buckets of the latency histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    labels = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        labels.append('{}="{}"'.format(name, value))
+    return "{" + ",".join(labels) + "}"
+
+
+class Metric:
+    """
+    A metric, with a value for each combination of its labels.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        # label values -> value
+        self._values = {}
+        self._lock = Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> list:
+        """
+        Returns the values of the metric, as dicts with their labels.
+        """
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            dict(labels=dict(zip(self.labels, labels)), **self._sample(value))
+            for labels, value in values
+        ]
+
+    def _sample(self, value) -> dict:
+        return {"value": value}
+
+    def export(self) -> str:
+        """
+        Returns the metric in the Prometheus text format.
+        """
+        lines = [
+            "# HELP {} {}".format(self.name, self.documentation.replace("\\", "\\\\").replace("\n", "\\n")),
+            "# TYPE {} {}".format(self.name, self.type),
+        ]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            lines.extend(self._export_lines(labels, value))
+        return "\n".join(lines) + "\n"
+
+    def _export_lines(self, labels: tuple, value) -> list:
+        return ["{}{} {}".format(self.name, _format_labels(self.labels, labels), _format_value(value))]
+
+
+class Counter(Metric):
+    """
+    A value which only goes up (number of requests, bytes sent...).
+    """
+
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        """
+        Adds `amount` to the value of `labels` (given in the order of the label names).
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Histogram(Metric):
+    """
+    The distribution of observed values (latencies...), counted in buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        """
+        Records `value` for `labels` (given in the order of the label names).
+        """
+        # The values lower than or equal to an upper bound go in its bucket
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [count per bucket (the last one being +Inf), sum, count]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _cumulative(self, counts: list) -> dict:
+        cumulative = {}
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            cumulative[bound] = total
+        return cumulative
+
+    def samples(self) -> list:
+        # Copy the mutable states while holding the lock
+        with self._lock:
+            values = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items()]
+        return [
+            dict(labels=dict(zip(self.labels, labels)), **self._sample(value))
+            for labels, value in values
+        ]
+
+    def _sample(self, value) -> dict:
+        counts, total, count = value
+        return {"buckets": self._cumulative(counts), "sum": total, "count": count}
+
+    def _export_lines(self, labels: tuple, value) -> list:
+        counts, total, count = value
+        lines = []
+        for bound, cumulative in self._cumulative(counts).items():
+            lines.append(
+                "{}_bucket{} {}".format(
+                    self.name,
+                    _format_labels(self.labels + ("le",), labels + (_format_value(bound),)),
+                    cumulative,
+                )
+            )
+        formatted_labels = _format_labels(self.labels, labels)
+        lines.append("{}_sum{} {}".format(self.name, formatted_labels, _format_value(total)))
+        lines.append("{}_count{} {}".format(self.name, formatted_labels, count))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    A set of metrics, which can be enabled or disabled as a whole.
+
+    The code reporting the metrics checks `enabled` first, so that a disabled registry costs nothing more.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        # name -> Metric
+        self._metrics = {}
+        self._lock = Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def _register(self, metric_class, name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError("The metric '{}' is already registered as a {}".format(name, metric.type))
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        """
+        Returns the counter named `name`, creating it if needed.
+        """
+        return self._register(Counter, name, documentation, labels)
+
+    def histogram(
+        self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Returns the histogram named `name`, creating it if needed.
+        """
+        return self._register(Histogram, name, documentation, labels, buckets)
+
+    def reset(self) -> None:
+        """
+        Resets the values of all the metrics.
+        """
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current values of the metrics, as a dict:
+
+            {
+                "translatepy_requests_total": {
+                    "type": "counter",
+                    "help": "...",
+                    "samples": [{"labels": {"service": "Google"}, "value": 12}]
+                },
+                ...
+            }
+
+        The samples of the histograms have `buckets` (upper bound -> cumulative count), `sum` and `count`.
+        """
+        return {
+            name: {"type": metric.type, "help": metric.documentation, "samples": metric.samples()}
+            for name, metric in list(self._metrics.items())
+        }
+
+    def export(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        return "".join(metric.export() for metric in list(self._metrics.values()))
+
+
+# The registry all the translators report into
+METRICS = MetricsRegistry()
+
+REQUESTS = METRICS.counter(
+    "translatepy_requests_total", "Number of requests made to the translation services.", ("service",)
+)
+FAILURES = METRICS.counter(
+    "translatepy_failures_total",
+    "Number of requests to the translation services which failed, by exception class.",
+    ("service", "exception"),
+)
+REQUEST_DURATION = METRICS.histogram(
+    "translatepy_request_duration_seconds", "Duration of the requests made to the translation services.", ("service",)
+)
+FALLBACKS = METRICS.counter(
+    "translatepy_fallbacks_total",
+    "Number of times a Translator moved on to the next service because this one failed or was too slow.",
+    ("service",),
+)
+CACHE_LOOKUPS = METRICS.counter(
+    "translatepy_cache_lookups_total", "Number of translations looked up in the cache.", ("service", "result")
+)
+HTTP_RESPONSES = METRICS.counter(
+    "translatepy_http_responses_total", "Number of HTTP responses received, by status code.", ("host", "status")
+)
+SENT_BYTES = METRICS.counter(
+    "translatepy_http_sent_bytes_total",
+    "Number of bytes sent in the HTTP requests (request lines, headers and bodies).",
+    ("host",),
+)
+RECEIVED_BYTES = METRICS.counter(
+    "translatepy_http_received_bytes_total", "Number of bytes received in the bodies of the HTTP responses.", ("host",)
+)
+
+
+def record_request(service: str, duration: float, exception: Exception = None) -> None:
+    """
+    Records a request made to `service`, which took `duration` seconds and raised `exception` if it failed.
+    """
+    REQUESTS.inc(service)
+    REQUEST_DURATION.observe(duration, service)
+    if exception is not None:
+        FAILURES.inc(service, type(exception).__name__)
+
+
+def record_cache_lookups(service: str, hits: int, misses: int) -> None:
+    if hits:
+        CACHE_LOOKUPS.inc(service, "hit", amount=hits)
+    if misses:
+        CACHE_LOOKUPS.inc(service, "miss", amount=misses)
+
+
+def record_fallback(service: str) -> None:
+    FALLBACKS.inc(service)
+
+
+def record_transfer(host: str, status: int, sent: int, received: int) -> None:
+    """
+    Records an HTTP exchange with `host`.
+    """
+    HTTP_RESPONSES.inc(host, status)
+    SENT_BYTES.inc(host, amount=sent)
+    RECEIVED_BYTES.inc(host, amount=received)
@@ -0,0 +1,236 @@
+"""
+Per-service rate limiting, with backoff when the services answer with "429 Too Many Requests".
+"""
+from random import uniform
+from threading import Lock
+from time import monotonic, sleep, time
+
+# The HTTP status codes meaning that the service is throttling us
+THROTTLING_STATUS_CODES = (429,)
+
+
+def parse_retry_after(value) -> float:
+    """
+    Returns the number of seconds to wait given by a `Retry-After` header value
+    (either a number of seconds or an HTTP date), or `None` if it can't be parsed.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Only imported when a service sends a date
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: `rate` tokens are added every second, up to `capacity`.
+
+    Tokens are reserved right away, even if the bucket doesn't hold enough of them:
+    the caller then waits for the returned delay. This keeps the callers in order,
+    and lets threads and asyncio tasks share the same bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = monotonic()
+        self._lock = Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes `tokens` from the bucket, and returns the number of seconds to wait before using them.
+        """
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Limits the requests made to a service, with optional request and character budgets.
+
+    When a request is throttled (HTTP 429), all the requests to the service are paused for the
+    delay given by the `Retry-After` header, or an exponential backoff with jitter, then the request
+    is retried (up to `max_retries` times).
+
+    Can be shared between threads and asyncio tasks.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = None,
+        burst: int = None,
+        characters_per_second: float = None,
+        character_burst: int = None,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        requests_per_second: float, optional
+            The sustained number of requests per second. Unlimited by default.
+        burst: int, optional
+            The number of requests which can be made at once. Defaults to `requests_per_second`.
+        characters_per_second: float, optional
+            The sustained number of characters sent per second. Unlimited by default.
+        character_burst: int, optional
+            The number of characters which can be sent at once. Defaults to `characters_per_second`.
+        max_retries: int
+            The number of times a throttled request is retried.
+        backoff_base: float
+            The delay (in seconds) before the first retry, when the service doesn't give one.
+            It doubles at each retry.
+        backoff_max: float
+            The maximum delay (in seconds) before a retry. A throttled request whose `Retry-After`
+            is longer is not retried.
+        """
+        self.requests = None if requests_per_second is None else TokenBucket(requests_per_second, burst)
+        self.characters = (
+            None if characters_per_second is None else TokenBucket(characters_per_second, character_burst)
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._paused_until = 0.0
+        self._lock = Lock()
+
+    def reserve(self, characters: int = 0) -> float:
+        """
+        Reserves a request sending `characters` characters, and returns the number of seconds to wait before making it.
+        """
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.characters is not None and characters:
+            delay = max(delay, self.characters.reserve(characters))
+        with self._lock:
+            return max(delay, self._paused_until - monotonic())
+
+    def acquire(self, characters: int = 0) -> None:
+        """
+        Waits until a request sending `characters` characters can be made.
+        """
+        delay = self.reserve(characters)
+        if delay > 0:
+            sleep(delay)
+
+    async def acquire_async(self, characters: int = 0) -> None:
+        """
+        Waits, without blocking the event loop, until a request sending `characters` characters can be made.
+        """
+        delay = self.reserve(characters)
+        if delay > 0:
+            # Only imported by the asynchronous API
+            import asyncio
+
+            await asyncio.sleep(delay)
+
+    def pause(self, delay: float) -> None:
+        """
+        Pauses all the requests to the service for `delay` seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, monotonic() + delay)
+
+    def retry_delay(self, exception: Exception, attempt: int) -> float:
+        """
+        If `exception` means that the request was throttled and can be retried,
+        pauses the service and returns the number of seconds until the retry. Otherwise returns `None`.
+
+        A `Retry-After` delay given by the service is never shortened: if it is longer than `backoff_max`,
+        the request is not retried (but the service is still paused).
+        """
+        if attempt >= self.max_retries:
+            return None
+        response = getattr(exception, "response", None)
+        if getattr(response, "status_code", None) not in THROTTLING_STATUS_CODES:
+            return None
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            # Exponential backoff with jitter
+            delay = uniform(0.5, 1.0) * min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        self.pause(delay)
+        if delay > self.backoff_max:
+            # Too long to wait for: give up
+            return None
+        return delay
+
+    def call(self, function, *args, characters: int = 0, on_retry=None):
+        """
+        Calls `function(*args)` within the limits, retrying it when it is throttled.
+
+        `on_retry(exception, delay)` is called before each retry.
+        """
+        attempt = 0
+        while True:
+            self.acquire(characters)
+            try:
+                return function(*args)
+            except Exception as exc:
+                delay = self.retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(exc, delay)
+                attempt += 1
+
+    async def call_async(self, function, *args, characters: int = 0, on_retry=None):
+        """
+        Awaits `function(*args)` within the limits, retrying it when it is throttled.
+
+        `on_retry(exception, delay)` is called before each retry.
+        """
+        attempt = 0
+        while True:
+            await self.acquire_async(characters)
+            try:
+                return await function(*args)
+            except Exception as exc:
+                delay = self.retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(exc, delay)
+                attempt += 1
+
+
+_rate_limiters = {}
+_rate_limiters_lock = Lock()
+
+
+def get_rate_limiter(service: str) -> RateLimiter:
+    """
+    Returns the rate limiter of `service` (the name of a translator, like 'Google').
+
+    Services which have not been given one with `set_rate_limiter` get a rate limiter
+    without budgets, which only backs off when the service throttles the requests.
+    """
+    limiter = _rate_limiters.get(service)
+    if limiter is None:
+        with _rate_limiters_lock:
+            limiter = _rate_limiters.setdefault(service, RateLimiter())
+    return limiter
+
+
+def set_rate_limiter(service: str, limiter: RateLimiter) -> None:
+    """
+    Sets the rate limiter shared by all the translators of `service` (the name of a translator, like 'Google').
+    """
+    with _rate_limiters_lock:
+        _rate_limiters[service] = limiter
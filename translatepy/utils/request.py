@@ -0,0 +1,277 @@
+"""
+HTTP sessions with keep-alive connection pooling, shared by the translators.
+"""
+from asyncio import get_running_loop
+from json import dumps, loads
+from threading import Lock
+from urllib.parse import urlencode, urlsplit
+from weakref import WeakKeyDictionary
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from translatepy.utils.metrics import METRICS, record_transfer
+
+# (connect, read) timeouts, in seconds
+DEFAULT_TIMEOUT = (5, 15)
+# Number of hosts to keep a pool for
+DEFAULT_POOL_CONNECTIONS = 10
+# Number of keep-alive connections kept per host
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class Session(requests.Session):
+    """
+    A `requests.Session` which keeps warm connections to each host
+    and applies default connect/read timeouts to every request.
+
+    The underlying connection pools are thread-safe, so one `Session` can be
+    shared between translators and threads. Pools should be configured
+    (with `set_pool_size`) before the session is shared.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT,
+        pool_sizes: dict = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        pool_connections: int
+            The number of hosts to keep a connection pool for.
+        pool_maxsize: int
+            The default number of connections kept alive for each host.
+        timeout: float or tuple
+            The default `(connect, read)` timeout used when a request doesn't specify one.
+        pool_sizes: dict, optional
+            A mapping of host -> number of connections kept alive for this host.
+        """
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        for host, size in (pool_sizes or {}).items():
+            self.set_pool_size(host, size)
+
+    def set_pool_size(self, host: str, pool_maxsize: int) -> None:
+        """
+        Gives `host` its own connection pool, keeping up to `pool_maxsize` connections alive.
+        """
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        # `requests` picks the adapter with the longest matching prefix
+        self.mount("https://" + host + "/", adapter)
+        self.mount("http://" + host + "/", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+    def send(self, request, **kwargs):
+        if not METRICS.enabled:
+            return super().send(request, **kwargs)
+        # Read the host first: the adapters may change the URL
+        host = urlsplit(request.url).hostname
+        response = super().send(request, **kwargs)
+        # Don't read the streamed responses: rely on their announced length
+        if kwargs.get("stream"):
+            received = int(response.headers.get("Content-Length") or 0)
+        else:
+            received = len(response.content)
+        sent = _head_size(request.method, request.url, request.headers) + _body_size(request.body)
+        record_transfer(host, response.status_code, sent, received)
+        return response
+
+
+def _head_size(method: str, url: str, headers) -> int:
+    """
+    Returns the approximate size (in bytes) of the request line and the headers of a request to `url`
+    (the texts sent in the query string included)
+    """
+    parts = urlsplit(url)
+    target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+    size = len("{} {} HTTP/1.1\r\nHost: {}\r\n\r\n".format(method, target, parts.netloc).encode("utf-8"))
+    for name, value in (headers or {}).items():
+        size += len("{}: {}\r\n".format(name, value).encode("utf-8"))
+    return size
+
+
+def _body_size(body) -> int:
+    """
+    Returns the size (in bytes) of a request body
+    """
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    # A file or a generator: unknown
+    return 0
+
+
+_default_session = None
+_default_session_lock = Lock()
+
+
+def get_session() -> Session:
+    """
+    Returns the default `Session`, shared by all the translators.
+    """
+    global _default_session
+    if _default_session is None:
+        with _default_session_lock:
+            # Check again, another thread might have created it in the meantime
+            if _default_session is None:
+                _default_session = Session()
+    return _default_session
+
+
+def _request_size(method: str, url: str, kwargs: dict) -> int:
+    """
+    Returns the approximate size (in bytes) of a request made with `AsyncSession.request`
+    """
+    params = kwargs.get("params")
+    if params:
+        url += ("&" if urlsplit(url).query else "?") + urlencode(params)
+    size = _head_size(method, url, kwargs.get("headers"))
+    if kwargs.get("json") is not None:
+        return size + _body_size(dumps(kwargs["json"]))
+    data = kwargs.get("data")
+    if isinstance(data, dict):
+        return size + _body_size(urlencode(data))
+    return size + _body_size(data)
+
+
+class AsyncResponse:
+    """
+    The response to a request made with an `AsyncSession`.
+
+    Mimics the parts of `requests.Response` used by the translators.
+    """
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes, encoding: str = None) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return loads(self.text)
+
+    def raise_for_status(self) -> None:
+        """
+        Raises a `requests.HTTPError` if the request was not successful.
+        """
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(
+                "{} Error for url: {}".format(self.status_code, self.url), response=self
+            )
+
+
+class AsyncSession:
+    """
+    A non-blocking HTTP session with keep-alive connection pooling, backed by `aiohttp`.
+
+    An `AsyncSession` is bound to the event loop it is first used in.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = DEFAULT_POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        limit: int
+            The total number of simultaneous connections.
+        limit_per_host: int
+            The number of simultaneous connections to a single host.
+        timeout: float or tuple
+            The `(connect, read)` timeout of the requests.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None or self._client.closed:
+            # `aiohttp` is an optional dependency, only needed for the async API
+            import aiohttp
+
+            if isinstance(self.timeout, tuple):
+                connect, read = self.timeout
+            else:
+                connect = read = self.timeout
+            self._client = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=None, connect=connect, sock_read=read),
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        Makes a request and reads its whole body.
+
+        Accepts the `params`, `data`, `json` and `headers` keyword arguments.
+        """
+        async with self._get_client().request(method, url, **kwargs) as response:
+            content = await response.read()
+            if METRICS.enabled:
+                record_transfer(urlsplit(url).hostname, response.status, _request_size(method, url, kwargs), len(content))
+            return AsyncResponse(
+                url=str(response.url),
+                status_code=response.status,
+                headers=response.headers,
+                content=content,
+                encoding=response.charset,
+            )
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_async_sessions = WeakKeyDictionary()
+
+
+def get_async_session() -> AsyncSession:
+    """
+    Returns the default `AsyncSession` of the running event loop, shared by all the translators.
+
+    Must be called from a coroutine.
+    """
+    loop = get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None:
+        session = _async_sessions[loop] = AsyncSession()
+    return session
+
+
+async def close_async_session() -> None:
+    """
+    Closes the default `AsyncSession` of the running event loop.
+
+    Should be awaited before the event loop is closed.
+    """
+    session = _async_sessions.pop(get_running_loop(), None)
+    if session is not None:
+        await session.close()
@@ -0,0 +1,119 @@
+"""
+Splits long texts into segments which can be translated separately, and puts them back together.
+"""
+from re import compile
+
+# The boundaries to split on, from the most to the least preferred.
+# The whitespace following a boundary belongs to it.
+BOUNDARIES = [
+    # Paragraphs
+    compile(r"\n[ \t]*\n\s*"),
+    # Lines
+    compile(r"\n\s*"),
+    # Sentences
+    compile(r"[.!?…]+[\"'”’»)\]]*\s+|[。！？]+\s*"),
+    # Clauses
+    compile(r"[,;:、，；：]\s+|[、，；：]"),
+    # Words
+    compile(r"\s+"),
+]
+
+
+def _hard_cut(text: str, max_length: int, length) -> list[str]:
+    """
+    Cuts `text` into pieces of at most `max_length` (measured with `length`), wherever needed.
+    """
+    if length is len:
+        return [text[index : index + max_length] for index in range(0, len(text), max_length)]
+    pieces = []
+    current = ""
+    current_length = 0
+    for character in text:
+        character_length = length(character)
+        if current and current_length + character_length > max_length:
+            pieces.append(current)
+            current = ""
+            current_length = 0
+        current += character
+        current_length += character_length
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split(text: str, max_length: int, length=len, level: int = 0) -> list[str]:
+    """
+    Returns the pieces of `text`, each at most `max_length` long (measured with `length`), cut on the best possible boundaries.
+    """
+    if length(text) <= max_length:
+        return [text]
+    if level >= len(BOUNDARIES):
+        # No boundary left: hard cut
+        return _hard_cut(text, max_length, length)
+
+    # Cut after each boundary
+    pieces = []
+    start = 0
+    for match in BOUNDARIES[level].finditer(text):
+        if match.end() > start:
+            pieces.append(text[start : match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+
+    # Put the pieces back together, as long as they fit
+    chunks = []
+    current = ""
+    current_length = 0
+    for piece in pieces:
+        piece_length = length(piece)
+        if current_length + piece_length <= max_length:
+            current += piece
+            current_length += piece_length
+            continue
+        if current:
+            chunks.append(current)
+        if piece_length <= max_length:
+            current = piece
+            current_length = piece_length
+        else:
+            chunks.extend(_split(piece, max_length, length, level + 1))
+            current = ""
+            current_length = 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text: str, max_length: int, length=len) -> list[tuple]:
+    """
+    Splits `text` on paragraph, line, sentence, clause and word boundaries (in this order of preference)
+    into segments of at most `max_length` characters.
+
+    The segments can be measured with another `length` function (like the length of the percent-encoded text),
+    as long as the length of a concatenation is the sum of the lengths.
+
+    Returns a list of `(leading whitespace, segment, trailing whitespace)`, so that the whitespace of the
+    original text can be put back around the translated segments (see `join_segments`).
+    """
+    results = []
+    for chunk in _split(text, max_length, length):
+        stripped = chunk.strip()
+        if not stripped:
+            results.append((chunk, "", ""))
+            continue
+        start = chunk.index(stripped)
+        results.append((chunk[:start], stripped, chunk[start + len(stripped) :]))
+    return results
+
+
+def join_segments(segments: list[tuple], translations: list[str]) -> str:
+    """
+    Puts the `translations` of the non-empty segments given by `split_text` back together,
+    with the whitespace of the original text.
+    """
+    translations = iter(translations)
+    return "".join(
+        leading + (next(translations) if segment else "") + trailing
+        for leading, segment, trailing in segments
+    )
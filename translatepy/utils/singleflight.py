@@ -0,0 +1,126 @@
+"""
+Coalescing of identical requests made at the same time ("single-flight").
+
+When multiple threads (or asyncio tasks) ask for the same key at the same time, only the first one
+makes the call: the others wait for its result, or its exception.
+"""
+from threading import Event, Lock
+
+
+class _Call:
+    """
+    A call in flight.
+    """
+
+    def __init__(self) -> None:
+        self.result = None
+        self.exception = None
+        # Only created when another caller waits for this call
+        self.done = None
+
+
+class SingleFlight:
+    """
+    Coalesces the concurrent calls sharing the same key.
+
+    Nothing is remembered once a call returns: the callers arriving afterwards make a new call
+    (caching the results is left to the caller).
+    """
+
+    def __init__(self) -> None:
+        # key -> _Call
+        self._calls = {}
+        # (event loop, key) -> asyncio.Future
+        self._async_calls = {}
+        self._lock = Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, function, *args):
+        """
+        Returns `function(*args)`, unless a call with the same `key` is in flight,
+        in which case its result is returned (or its exception raised) once it finishes.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                if call.done is None:
+                    call.done = Event()
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = function(*args)
+        except BaseException as exc:
+            call.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                done = call.done
+            if done is not None:
+                done.set()
+        return call.result
+
+    async def do_async(self, key, function, *args):
+        """
+        Asynchronous version of `do`: awaits `function(*args)`, unless a call with the same `key`
+        is in flight in the same event loop.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        while True:
+            future = self._async_calls.get(flight_key)
+            if future is None:
+                break
+            with self._lock:
+                self.coalesced += 1
+            try:
+                # A waiter being cancelled must not cancel the call it waits for
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The call was cancelled, not this waiter: try again
+
+        future = self._async_calls[flight_key] = loop.create_future()
+        with self._lock:
+            self.calls += 1
+        try:
+            result = await function(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Don't log the exception if nobody was waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[flight_key]
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the number of calls made, and of calls which waited for another one instead.
+        """
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls) + len(self._async_calls)}
+
+
+# Shared by all the translators, unless they are given their own
+SINGLE_FLIGHT = SingleFlight()
@@ -1,3 +1,5 @@
+from contextvars import copy_context
+from math import ceil
 from re import compile
 
 POSITIVE_FLOAT_REGEX = compile("[^0-9.]")
@@ -21,4 +23,39 @@ def get_key(dictionary: dict, val):
     for key, value in dictionary.items():
         if value == val:
             return key
-    return None
\ No newline at end of file
+    return None
+
+def concurrent_map(function, iterable, workers: int) -> list:
+    """
+    Applies `function` to every element of `iterable`, using up to `workers` threads.
+
+    The results keep the input order, and a call which failed
+    gives back the raised exception instead of its result.
+    The calls run in a copy of the caller's context (see `contextvars`).
+    """
+    def call(element):
+        try:
+            return function(element)
+        except Exception as exc:
+            return exc
+
+    elements = list(iterable)
+    if workers <= 1 or len(elements) <= 1:
+        return [call(element) for element in elements]
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Copied here: in the worker threads, `copy_context` would copy their own (empty) context
+    context = copy_context()
+    with ThreadPoolExecutor(max_workers=min(workers, len(elements))) as executor:
+        return list(executor.map(lambda element: context.copy().run(call, element), elements))
+
+
+def percentile(values, percent: float) -> float:
+    """
+    Returns the `percent` percentile (between 0 and 100) of `values`, using the nearest-rank method.
+    """
+    values = sorted(values)
+    if not values:
+        raise ValueError("percentile of an empty sequence")
+    rank = max(0, min(len(values) - 1, ceil(percent / 100 * len(values)) - 1))
+    return values[rank]